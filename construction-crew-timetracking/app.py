@@ -28,10 +28,14 @@ from flask_jwt_extended import (
 )
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
+from markupsafe import Markup
+from sqlalchemy import event
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import os
 import csv
 import io
+import threading
 from enum import Enum
 
 app = Flask(__name__)
@@ -42,6 +46,7 @@ app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "jwt-secret-string")
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=8)
+app.config["FRAGMENT_CACHE_SIZE"] = int(os.environ.get("FRAGMENT_CACHE_SIZE", 1024))
 
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
@@ -71,6 +76,88 @@ def admin_required(f):
     return decorated_function
 
 
+# Fragment cache
+class FragmentCache:
+    """Thread-safe LRU cache of rendered template fragments.
+
+    Keys must capture everything the fragment depends on (for timesheets:
+    id, version and status), so entries never need explicit invalidation
+    and simply age out once the bound is reached.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Render outside the lock; two concurrent misses render the same output
+        value = render()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            }
+
+
+fragment_cache = FragmentCache(app.config["FRAGMENT_CACHE_SIZE"])
+
+
+def render_fragment(template_name, **context):
+    # Fragments are rendered without request context processors so they
+    # cannot accidentally depend on current_user
+    return Markup(app.jinja_env.get_template(template_name).render(**context))
+
+
+@app.template_global()
+def timesheet_cache_key(timesheet, fragment):
+    return (fragment, timesheet.id, timesheet.version, timesheet.status.value)
+
+
+@app.template_global()
+def cached_fragment(template_name, key, **context):
+    return fragment_cache.get_or_render(
+        (template_name,) + tuple(key),
+        lambda: render_fragment(template_name, **context),
+    )
+
+
+def approved_timesheets_stamp():
+    """Cheap fingerprint that changes whenever a timesheet becomes approved."""
+    count, last_updated = (
+        db.session.query(db.func.count(Timesheet.id), db.func.max(Timesheet.updated_at))
+        .filter(Timesheet.status == TimesheetStatus.APPROVED)
+        .one()
+    )
+    return (count, last_updated.isoformat() if last_updated else None)
+
+
 # Web Routes
 @app.route("/")
 def index():
@@ -543,6 +630,30 @@ def dashboard():
     # Get projects for filter
     projects = Project.query.filter_by(is_active=True).all()
 
+    # The labor summary only counts approved timesheets, so the rendered
+    # table and charts stay valid until another timesheet is approved
+    cache_key = (
+        "dashboard/labor",
+        project_id,
+        date_from,
+        date_to,
+    ) + approved_timesheets_stamp()
+    labor_fragments = fragment_cache.get_or_render(
+        cache_key,
+        lambda: render_labor_fragments(project_id, date_from, date_to),
+    )
+
+    return render_template(
+        "dashboard/index.html",
+        projects=projects,
+        selected_project_id=project_id,
+        date_from=date_from,
+        date_to=date_to,
+        labor_fragments=labor_fragments,
+    )
+
+
+def render_labor_fragments(project_id, date_from, date_to):
     # Get labor summary
     labor_summary = get_labor_summary(project_id, date_from, date_to)
 
@@ -555,19 +666,19 @@ def dashboard():
     budget_hours = [item["budget_hours"] for item in labor_summary]
     actual_hours = [item["actual_hours"] for item in labor_summary]
 
-    return render_template(
-        "dashboard/index.html",
-        projects=projects,
-        selected_project_id=project_id,
-        date_from=date_from,
-        date_to=date_to,
-        labor_summary=labor_summary,
-        cost_code_labels=cost_code_labels,
-        regular_hours=regular_hours,
-        overtime_hours=overtime_hours,
-        budget_hours=budget_hours,
-        actual_hours=actual_hours,
-    )
+    return {
+        "rows": render_fragment(
+            "dashboard/_labor_rows.html", labor_summary=labor_summary
+        ),
+        "charts": render_fragment(
+            "dashboard/_labor_charts.html",
+            cost_code_labels=cost_code_labels,
+            regular_hours=regular_hours,
+            overtime_hours=overtime_hours,
+            budget_hours=budget_hours,
+            actual_hours=actual_hours,
+        ),
+    }
 
 
 @app.route("/timesheets/bulk-upload", methods=["GET", "POST"])
@@ -1074,6 +1185,9 @@ def edit_timesheet(timesheet_id):
         for entry in timesheet.entries:
             db.session.delete(entry)
 
+        # Entries changed, so cached fragments for the old version are stale
+        timesheet.version = (timesheet.version or 1) + 1
+
         # Add new entries
         for i in range(len(user_ids)):
             entry = TimesheetEntry(
@@ -1384,6 +1498,16 @@ class TimesheetVersion(db.Model):
     creator = db.relationship("User")
 
 
+# Fragments also show project, crew, cost code and user names, which are not
+# part of the cache keys; drop everything when one of those is edited
+@event.listens_for(User, "after_update")
+@event.listens_for(Project, "after_update")
+@event.listens_for(Crew, "after_update")
+@event.listens_for(CostCode, "after_update")
+def invalidate_fragment_cache(mapper, connection, target):
+    fragment_cache.clear()
+
+
 # Authentication Routes
 @app.route("/api/auth/login", methods=["POST"])
 def login():
@@ -1593,6 +1717,8 @@ def add_timesheet_entry():
         else None,
     )
 
+    timesheet.version = (timesheet.version or 1) + 1
+
     db.session.add(entry)
     db.session.commit()
 
@@ -1829,6 +1955,13 @@ def get_crew_members(crew_id):
     )
 
 
+@app.route("/api/cache/stats")
+@login_required
+@admin_required
+def fragment_cache_stats():
+    return jsonify(fragment_cache.stats())
+
+
 # Error Handlers
 @app.errorhandler(404)
 def not_found(error):
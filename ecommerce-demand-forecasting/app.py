@@ -7,7 +7,8 @@ from flask import (
     url_for,
     flash,
     jsonify,
-    send_file,
+    Response,
+    stream_with_context,
 )
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -25,27 +26,94 @@ from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 import plotly.graph_objs as go
 import plotly.utils
+import click
+import csv
+import hashlib
+import importlib.util
+import io
 import json
+import math
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import chain, islice
 from datetime import datetime, timedelta
+from sqlalchemy import inspect, text
+from scipy import sparse
+from scipy.sparse.linalg import splu
 import warnings
 
 warnings.filterwarnings("ignore")
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "your-secret-key-here"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///forecasting.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
+    "DATABASE_URL", "sqlite:///forecasting.db"
+)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["UPLOAD_FOLDER"] = "uploads"
+# Rows parsed and inserted per batch when ingesting uploaded CSVs
+app.config["INGEST_CHUNK_ROWS"] = 50_000
+# Forecast rows fetched and written per chunk of a streamed export
+app.config["EXPORT_CHUNK_ROWS"] = 10_000
+# Forecast rows written per commit when saving a forecast run
+app.config["FORECAST_COMMIT_ROWS"] = 50_000
+# Forecast runs kept per SKU for comparing successive forecasts
+app.config["FORECAST_RUNS_KEPT"] = 5
+# Backtest score the "auto" model type picks by: "mape" or "rmse"
+app.config["SELECTION_METRIC"] = "mape"
+# Demand paths simulated per SKU when planning reorders
+app.config["SIMULATION_PATHS"] = 1000
+# Chance of running out before an order arrives that reorders plan for
+app.config["STOCKOUT_RISK"] = 0.05
+# Supplier lead time of SKUs whose inventory data gives none
+app.config["LEAD_TIME_DAYS"] = 7
+# Days of demand after it arrives that an order should cover
+app.config["ORDER_COVER_DAYS"] = 30
+# Raise a reorder alert when an order is due within this many days
+app.config["REORDER_ALERT_DAYS"] = 7
+
+# Sales records a SKU needs before it can be forecast
+MIN_FORECAST_RECORDS = 10
+# Refit from the cached parameters when at most this many days were added
+WARM_START_DAYS = 14
+
+# Models the "auto" model type backtests, by the name stored as model_used
+MODEL_GRID = {
+    "arima(0,1,1)": ("arima", {"order": (0, 1, 1)}),
+    "arima(1,1,1)": ("arima", {"order": (1, 1, 1)}),
+    "arima(2,1,1)": ("arima", {"order": (2, 1, 1)}),
+    "arima(1,1,2)": ("arima", {"order": (1, 1, 2)}),
+    "arima(2,1,2)": ("arima", {"order": (2, 1, 2)}),
+    "ets(none,none)": ("exponential_smoothing", {"trend": None, "seasonal": None}),
+    "ets(add,none)": ("exponential_smoothing", {"trend": "add", "seasonal": None}),
+    "ets(none,weekly)": ("exponential_smoothing", {"trend": None, "seasonal": "add"}),
+    "ets(add,weekly)": ("exponential_smoothing", {"trend": "add", "seasonal": "add"}),
+    # Vectorized baselines, mostly for slow-moving SKUs
+    "moving_average(28)": ("baseline", {"method": "moving_average", "window": 28}),
+    "seasonal_naive(7)": ("baseline", {"method": "seasonal_naive", "period": 7}),
+    "ses(0.2)": ("baseline", {"method": "ses", "alpha": 0.2}),
+    "croston(0.1)": ("baseline", {"method": "croston", "alpha": 0.1}),
+    "tsb(0.1,0.1)": ("baseline", {"method": "tsb", "alpha": 0.1, "beta": 0.1}),
+}
+# The fixed model types offered alongside "auto"
+MODEL_TYPES = {"arima": "arima(1,1,1)", "exponential_smoothing": "ets(add,none)"}
+# The vectorized baselines, cheap enough to backtest inside a web request
+BASELINE_MODELS = [m for m, (family, _) in MODEL_GRID.items() if family == "baseline"]
+# Days of history the baseline models look at
+BASELINE_HISTORY_DAYS = 182
+# SKU x path x day cells simulated at once, bounding the simulator's memory
+SIMULATION_CHUNK_CELLS = 1 << 24
+# Rolling-origin folds per backtest, and the history each fold needs
+BACKTEST_FOLDS = 3
+MIN_TRAIN_DAYS = 28
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
-# Ensure upload directory exists
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-
 
 # Models
 class User(UserMixin, db.Model):
@@ -68,18 +136,29 @@ class DataSource(db.Model):
 
 
 class SalesData(db.Model):
+    # Per-SKU history reads and the rebuild-demand aggregation
+    __table_args__ = (
+        db.Index("ix_sales_data_sku_date", "user_id", "product_sku", "date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     source_id = db.Column(db.Integer, db.ForeignKey("data_source.id"), nullable=False)
     date = db.Column(db.Date, nullable=False)
     product_sku = db.Column(db.String(100), nullable=False)
     product_name = db.Column(db.String(255))
+    category = db.Column(db.String(100))
     quantity_sold = db.Column(db.Integer, nullable=False)
     revenue = db.Column(db.Float)
     cost = db.Column(db.Float)
 
 
 class InventoryData(db.Model):
+    # Latest stock per SKU for reorder alerts
+    __table_args__ = (
+        db.Index("ix_inventory_data_sku_date", "user_id", "product_sku", "date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     source_id = db.Column(db.Integer, db.ForeignKey("data_source.id"), nullable=False)
@@ -88,12 +167,35 @@ class InventoryData(db.Model):
     current_stock = db.Column(db.Integer, nullable=False)
     reorder_point = db.Column(db.Integer)
     max_stock = db.Column(db.Integer)
+    lead_time_days = db.Column(db.Integer)
+
+
+class ForecastRun(db.Model):
+    """One forecast generation: a single SKU from the web or a forecast-all."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    model_type = db.Column(db.String(50), nullable=False)
+    forecast_days = db.Column(db.Integer, nullable=False)
+    sku_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
 class Forecast(db.Model):
+    # A SKU's current forecast is the rows of its latest run; earlier runs
+    # are kept for comparison
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "product_sku", "run_id", "forecast_date", "model_used"
+        ),
+        # Most recent forecasts on the dashboard
+        db.Index("ix_forecast_created", "user_id", "created_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     product_sku = db.Column(db.String(100), nullable=False)
+    run_id = db.Column(db.Integer, db.ForeignKey("forecast_run.id"), nullable=False)
     forecast_date = db.Column(db.Date, nullable=False)
     predicted_demand = db.Column(db.Float, nullable=False)
     confidence_lower = db.Column(db.Float)
@@ -103,6 +205,12 @@ class Forecast(db.Model):
 
 
 class Alert(db.Model):
+    __table_args__ = (
+        # Unread alerts on the dashboard, and the alerts page newest first
+        db.Index("ix_alert_unread", "user_id", "is_read", "created_at"),
+        db.Index("ix_alert_created", "user_id", "created_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     product_sku = db.Column(db.String(100), nullable=False)
@@ -114,6 +222,271 @@ class Alert(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class DemandSeries(db.Model):
+    """Daily units sold for one SKU, packed into a single array.
+
+    Maintained on every sales upload so forecasts and charts read a SKU's
+    whole history with np.frombuffer instead of aggregating SalesData rows.
+    """
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    product_sku = db.Column(db.String(100), primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    # Little-endian int64 units per day, consecutive days from start_date
+    quantities = db.Column(db.LargeBinary, nullable=False)
+    # SalesData rows folded into the series
+    records = db.Column(db.Integer, nullable=False, default=0)
+
+    def daily_quantities(self):
+        values = np.frombuffer(self.quantities, dtype=DEMAND_DTYPE)
+        dates = pd.date_range(self.start_date, periods=len(values), freq="D")
+        return pd.Series(values, index=dates, name="quantity")
+
+
+DEMAND_DTYPE = np.dtype("<i8")
+
+
+class Product(db.Model):
+    """A SKU in a user's catalog with running sales totals.
+
+    Maintained on every sales upload so pages listing or summarising
+    products never scan SalesData.
+    """
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    product_sku = db.Column(db.String(100), primary_key=True)
+    product_name = db.Column(db.String(255))
+    category = db.Column(db.String(100))
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    sales_records = db.Column(db.Integer, nullable=False, default=0)
+    first_sale = db.Column(db.Date, nullable=False)
+    last_sale = db.Column(db.Date, nullable=False)
+    # Days between first_sale and last_sale with units sold
+    sale_days = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def coverage(self):
+        """Share of days in the SKU's sales history with units sold."""
+        return self.sale_days / ((self.last_sale - self.first_sale).days + 1)
+
+
+class SalesSummary(db.Model):
+    """Totals over a user's Product catalog, for the dashboard."""
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    product_count = db.Column(db.Integer, nullable=False, default=0)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    sales_records = db.Column(db.Integer, nullable=False, default=0)
+    first_sale = db.Column(db.Date)
+    last_sale = db.Column(db.Date)
+    # Share of product-days with units sold, across the catalog
+    coverage = db.Column(db.Float)
+
+
+class ForecastCache(db.Model):
+    """Last fitted model for one SKU, model type and horizon.
+
+    ``series_hash`` identifies the daily demand the model was fitted on, so
+    an unchanged series is answered from ``forecast`` without refitting.
+    Uploaded sales change the hash, which invalidates the outputs; the
+    parameters are kept to warm-start the refit.
+    """
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    product_sku = db.Column(db.String(100), primary_key=True)
+    model_type = db.Column(db.String(50), primary_key=True)
+    forecast_days = db.Column(db.Integer, primary_key=True)
+    series_hash = db.Column(db.String(40), nullable=False)
+    series_length = db.Column(db.Integer, nullable=False)
+    # MODEL_GRID name or "moving_average"; fixed by "auto" until a cold refit
+    model_used = db.Column(db.String(50), nullable=False)
+    # JSON list of fitted parameters, NULL if the fallback forecast was used
+    params = db.Column(db.Text)
+    # JSON: first forecast date and one list per forecast_data field
+    forecast = db.Column(db.Text, nullable=False)
+    # ForecastRun whose Forecast rows hold ``forecast``
+    run_id = db.Column(db.Integer, db.ForeignKey("forecast_run.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class BacktestResult(db.Model):
+    """Rolling-origin backtest score of one candidate model for one SKU."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    product_sku = db.Column(db.String(100), nullable=False)
+    model_used = db.Column(db.String(50), nullable=False)
+    horizon = db.Column(db.Integer, nullable=False)
+    folds = db.Column(db.Integer, nullable=False)
+    mape = db.Column(db.Float)
+    rmse = db.Column(db.Float)
+    # The model "auto" chose for the SKU
+    selected = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class HierarchyForecast(db.Model):
+    """Reconciled forecast of one node of a user's product hierarchy.
+
+    Nodes are the total, each category, each SKU and each SKU x channel
+    (DataSource.source_name); the columns below a node's level are NULL.
+    """
+
+    __table_args__ = (db.Index("ix_hierarchy_forecast_run", "user_id", "run_id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    run_id = db.Column(db.Integer, db.ForeignKey("forecast_run.id"), nullable=False)
+    level = db.Column(db.String(20), nullable=False)  # total, category, sku, channel
+    category = db.Column(db.String(100))
+    product_sku = db.Column(db.String(100))
+    channel = db.Column(db.String(50))
+    forecast_date = db.Column(db.Date, nullable=False)
+    # The node's own forecast, before reconciliation
+    base_demand = db.Column(db.Float, nullable=False)
+    predicted_demand = db.Column(db.Float, nullable=False)
+
+
+class SchemaMigration(db.Model):
+    """A MIGRATIONS entry applied to this database."""
+
+    name = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def create_access_indexes(connection):
+    """Indexes for the per-user, per-SKU lookups behind every page."""
+    for model in (SalesData, InventoryData, Forecast, Alert):
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def add_missing_column(connection, column):
+    """Add a model column to its table if the database predates it."""
+    table = column.table.name
+    if column.name not in {c["name"] for c in inspect(connection).get_columns(table)}:
+        connection.exec_driver_sql(
+            f"ALTER TABLE {table} ADD COLUMN {column.name} "
+            f"{column.type.compile(connection.dialect)}"
+        )
+
+
+def add_category_columns(connection):
+    """Product categories, for hierarchical forecasting."""
+    for model in (SalesData, Product):
+        add_missing_column(connection, model.__table__.c.category)
+
+
+def add_lead_time_column(connection):
+    """Supplier lead times, for the inventory simulation."""
+    add_missing_column(connection, InventoryData.__table__.c.lead_time_days)
+
+
+def add_forecast_run_ids(connection):
+    """Forecast runs; forecasts from before them join one legacy run per user."""
+    add_missing_column(connection, Forecast.__table__.c.run_id)
+    add_missing_column(connection, ForecastCache.__table__.c.run_id)
+
+    connection.exec_driver_sql(
+        """
+        INSERT INTO forecast_run (
+            user_id, model_type, forecast_days, sku_count, created_at
+        )
+        SELECT user_id, 'legacy', MAX(days), COUNT(*), MAX(created_at) FROM (
+            SELECT user_id, product_sku, COUNT(DISTINCT forecast_date) AS days,
+                   MAX(created_at) AS created_at
+            FROM forecast WHERE run_id IS NULL
+            GROUP BY user_id, product_sku
+        ) GROUP BY user_id
+    """
+    )
+    connection.exec_driver_sql(
+        """
+        UPDATE forecast SET run_id = (
+            SELECT MAX(id) FROM forecast_run
+            WHERE forecast_run.user_id = forecast.user_id
+                AND model_type = 'legacy'
+        ) WHERE run_id IS NULL
+    """
+    )
+
+    unique = next(
+        constraint
+        for constraint in Forecast.__table__.constraints
+        if isinstance(constraint, db.UniqueConstraint)
+    )
+    key = [column.name for column in unique.columns]
+    columns = ", ".join(key)
+    schema = inspect(connection)
+    existing = schema.get_unique_constraints("forecast") + [
+        index for index in schema.get_indexes("forecast") if index["unique"]
+    ]
+    if not any(entry["column_names"] == key for entry in existing):
+        # Older saves could repeat a SKU's date; the newest row wins
+        connection.exec_driver_sql(
+            f"""
+            DELETE FROM forecast WHERE id NOT IN (
+                SELECT MAX(id) FROM forecast GROUP BY {columns}
+            )
+        """
+        )
+        connection.exec_driver_sql(
+            f"CREATE UNIQUE INDEX uq_forecast_run_row ON forecast ({columns})"
+        )
+
+
+def add_cache_model_used(connection):
+    """The model behind each cached forecast, for per-SKU model selection."""
+    add_missing_column(connection, ForecastCache.__table__.c.model_used)
+    # Entries cached before it are refitted on their next use
+    connection.exec_driver_sql("DELETE FROM forecast_cache WHERE model_used IS NULL")
+
+
+def build_demand_stores(connection):
+    """DemandSeries and the product catalog for sales uploaded before them."""
+    users = connection.execute(
+        text(
+            """
+            SELECT id FROM "user"
+            WHERE EXISTS (SELECT 1 FROM sales_data WHERE user_id = "user".id)
+                AND id NOT IN (SELECT user_id FROM sales_summary)
+        """
+        )
+    ).scalars()
+    for user_id in users.all():
+        rebuild_demand_series(user_id)
+
+
+# Changes create_all cannot make to existing tables, and the data the tables
+# it adds need, in order. Each must be a no-op on a database create_all has
+# just made.
+MIGRATIONS = [
+    ("0001_access_path_indexes", create_access_indexes),
+    ("0002_product_category", add_category_columns),
+    ("0003_inventory_lead_time", add_lead_time_column),
+    ("0004_forecast_run_ids", add_forecast_run_ids),
+    ("0005_forecast_cache_model_used", add_cache_model_used),
+    ("0006_demand_stores", build_demand_stores),
+]
+
+
+def upgrade_database():
+    """Create missing tables and apply pending MIGRATIONS.
+
+    Returns the names of the migrations applied.
+    """
+    db.create_all()
+    applied = {name for (name,) in db.session.query(SchemaMigration.name)}
+    pending = [(name, fn) for name, fn in MIGRATIONS if name not in applied]
+    for name, migrate in pending:
+        migrate(db.session.connection())
+        db.session.add(SchemaMigration(name=name))
+        db.session.commit()
+    return [name for name, _ in pending]
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -180,14 +553,13 @@ def logout():
 @login_required
 def dashboard():
     # Get summary statistics
-    total_products = (
-        db.session.query(SalesData.product_sku)
-        .filter_by(user_id=current_user.id)
-        .distinct()
-        .count()
-    )
+    summary = SalesSummary.query.get(current_user.id)
+    total_products = summary.product_count if summary else 0
     recent_alerts = (
-        Alert.query.filter_by(user_id=current_user.id, is_read=False).limit(5).all()
+        Alert.query.filter_by(user_id=current_user.id, is_read=False)
+        .order_by(Alert.created_at.desc())
+        .limit(5)
+        .all()
     )
 
     # Get recent forecasts
@@ -202,6 +574,7 @@ def dashboard():
     return render_template(
         "dashboard.html",
         total_products=total_products,
+        summary=summary,
         recent_alerts=recent_alerts,
         recent_forecasts=recent_forecasts,
     )
@@ -217,26 +590,13 @@ def upload_data():
 
         if file and file.filename.endswith(".csv"):
             try:
-                df = pd.read_csv(file)
-
-                # Create data source record
-                data_source = DataSource(
-                    user_id=current_user.id,
-                    source_name=source_name,
-                    filename=file.filename,
-                    record_count=len(df),
+                data_source = ingest_csv(
+                    file, current_user.id, source_name, data_type, file.filename
                 )
-                db.session.add(data_source)
-                db.session.flush()
-
-                # Process data based on type
-                if data_type == "sales":
-                    process_sales_data(df, data_source.id)
-                elif data_type == "inventory":
-                    process_inventory_data(df, data_source.id)
-
                 db.session.commit()
-                flash(f"Successfully uploaded {len(df)} records from {source_name}")
+                flash(
+                    f"Successfully uploaded {data_source.record_count} records from {source_name}"
+                )
 
             except Exception as e:
                 db.session.rollback()
@@ -247,56 +607,374 @@ def upload_data():
     return render_template("upload.html")
 
 
-def process_sales_data(df, source_id):
-    """Process sales data CSV and save to database"""
-    # Expected columns: date, product_sku, product_name, quantity_sold, revenue, cost
+def ingest_csv(file, user_id, source_name, data_type, filename):
+    """Stream a sales or inventory CSV into the database.
+
+    The file is read and inserted INGEST_CHUNK_ROWS at a time so memory stays
+    bounded however large the upload. Nothing is committed here; the caller
+    commits, so a bad row anywhere rolls back the whole upload.
+    """
+    data_source = DataSource(
+        user_id=user_id,
+        source_name=source_name,
+        filename=filename,
+        record_count=0,
+    )
+    db.session.add(data_source)
+    db.session.flush()
+
+    record_count = 0
+    daily_sales = []
+    for chunk in pd.read_csv(file, chunksize=app.config["INGEST_CHUNK_ROWS"]):
+        # Process data based on type
+        if data_type == "sales":
+            daily_sales.append(process_sales_data(chunk, data_source.id, user_id))
+        elif data_type == "inventory":
+            process_inventory_data(chunk, data_source.id, user_id)
+        record_count += len(chunk)
+
+    if daily_sales:
+        fold_daily_sales(user_id, pd.concat(daily_sales))
+    data_source.record_count = record_count
+    return data_source
+
+
+def parse_dates(df, column="date"):
+    """Parse a date column to ISO strings in one pass."""
+    dates = pd.to_datetime(df[column], errors="coerce")
+    if dates.isna().any():
+        # Mixed formats defeat format inference; parse per value only then
+        dates = pd.to_datetime(df[column], errors="coerce", format="mixed")
+    require_valid(df, column, dates.notna())
+    return dates.dt.strftime("%Y-%m-%d")
+
+
+def parse_numbers(df, column, default=None, required=False):
+    """Parse a numeric column; a missing optional column becomes ``default``."""
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype="float64")
+    values = pd.to_numeric(df[column], errors="coerce")
+    if required:
+        require_valid(df, column, values.notna())
+    return values
+
+
+def require_valid(df, column, valid):
+    if not valid.all():
+        # Report the first offending line as it appears in the file
+        row = valid.idxmin()
+        value = df.at[row, column]
+        raise ValueError(
+            f"Invalid {column} on line {row + 2}: {'' if pd.isna(value) else value!r}"
+        )
+
+
+def bulk_insert(model, frame, replace=False):
+    """Insert a DataFrame into ``model``'s table with a single executemany.
+
+    Skips ORM objects and per-row type processing, so values must already be
+    in their stored form (dates as ISO strings). ``replace`` overwrites rows
+    with the same primary key.
+    """
+    columns = ", ".join(frame.columns)
+    placeholders = ", ".join("?" * len(frame.columns))
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    db.session.connection().exec_driver_sql(
+        f"{verb} INTO {model.__tablename__} ({columns}) VALUES ({placeholders})",
+        list(frame.itertuples(index=False, name=None)),
+    )
+
+
+def process_sales_data(df, source_id, user_id):
+    """Process sales data CSV and save to database
+
+    Returns the rows' units, revenue, record counts and product name per
+    SKU and day, for fold_daily_sales.
+    """
+    # Expected columns: date, product_sku, product_name, category, quantity_sold,
+    # revenue, cost
     required_columns = ["date", "product_sku", "quantity_sold"]
 
     if not all(col in df.columns for col in required_columns):
         raise ValueError(f"CSV must contain columns: {required_columns}")
 
-    for _, row in df.iterrows():
-        sales_record = SalesData(
-            user_id=current_user.id,
-            source_id=source_id,
-            date=pd.to_datetime(row["date"]).date(),
-            product_sku=row["product_sku"],
-            product_name=row.get("product_name", ""),
-            quantity_sold=int(row["quantity_sold"]),
-            revenue=float(row.get("revenue", 0)),
-            cost=float(row.get("cost", 0)),
+    require_valid(df, "product_sku", df["product_sku"].notna())
+    records = pd.DataFrame(
+        {
+            "user_id": user_id,
+            "source_id": source_id,
+            "date": parse_dates(df),
+            "product_sku": df["product_sku"].astype(str),
+            "product_name": optional_text(df, "product_name"),
+            "category": optional_text(df, "category"),
+            "quantity_sold": parse_numbers(df, "quantity_sold", required=True).astype(
+                "int64"
+            ),
+            "revenue": parse_numbers(df, "revenue", default=0.0),
+            "cost": parse_numbers(df, "cost", default=0.0),
+        }
+    )
+    bulk_insert(SalesData, records)
+    return (
+        records.groupby(["product_sku", "date"])
+        .agg(
+            quantity=("quantity_sold", "sum"),
+            records=("quantity_sold", "count"),
+            revenue=("revenue", "sum"),
+            product_name=("product_name", "last"),
+            category=("category", "last"),
+        )
+        .reset_index()
+    )
+
+
+def optional_text(df, column):
+    """A text column with blanks as None, or "" if the CSV lacks it."""
+    if column not in df.columns:
+        return ""
+    return df[column].astype("object").where(df[column].notna(), None)
+
+
+def fold_daily_sales(user_id, daily):
+    """Fold per-SKU daily sales into DemandSeries and the product catalog."""
+    series = update_demand_series(user_id, daily)
+    update_product_catalog(user_id, daily, series)
+
+
+def update_demand_series(user_id, daily):
+    """Fold per-SKU daily units into the stored DemandSeries arrays.
+
+    ``daily`` has product_sku, date, quantity and records columns; rows for
+    the same SKU and day are summed. Returns ``{product_sku: quantities}``
+    with the merged array of every SKU touched.
+    """
+    daily = daily.groupby(["product_sku", "date"], as_index=False)[
+        ["quantity", "records"]
+    ].sum()
+    daily["date"] = pd.to_datetime(daily["date"])
+    skus = daily["product_sku"].unique().tolist()
+
+    stored = {}
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(skus), 500):
+        for series in DemandSeries.query.filter(
+            DemandSeries.user_id == user_id,
+            DemandSeries.product_sku.in_(skus[start : start + 500]),
+        ):
+            stored[series.product_sku] = series
+            # The merged row is written below; keep the ORM from flushing it
+            db.session.expunge(series)
+
+    rows = []
+    merged = {}
+    for product_sku, group in daily.groupby("product_sku", sort=False):
+        days = group["date"].to_numpy().astype("datetime64[D]")
+        first, last = days.min(), days.max()
+        previous = stored.get(product_sku)
+        if previous is not None:
+            old = np.frombuffer(previous.quantities, dtype=DEMAND_DTYPE)
+            old_start = np.datetime64(previous.start_date, "D")
+            first = min(first, old_start)
+            last = max(last, old_start + len(old) - 1)
+
+        values = np.zeros((last - first).astype(int) + 1, dtype=DEMAND_DTYPE)
+        if previous is not None:
+            offset = (old_start - first).astype(int)
+            values[offset : offset + len(old)] = old
+        values[(days - first).astype(int)] += group["quantity"].to_numpy()
+        merged[product_sku] = values
+
+        rows.append(
+            (
+                user_id,
+                product_sku,
+                str(first),
+                values.tobytes(),
+                int(group["records"].sum())
+                + (previous.records if previous is not None else 0),
+            )
         )
-        db.session.add(sales_record)
 
+    bulk_insert(
+        DemandSeries,
+        pd.DataFrame(
+            rows,
+            columns=["user_id", "product_sku", "start_date", "quantities", "records"],
+        ),
+        replace=True,
+    )
+    return merged
+
+
+def update_product_catalog(user_id, daily, series):
+    """Add daily sales to the Product totals and refresh the SalesSummary.
+
+    ``daily`` is as for update_demand_series, plus revenue, product_name and
+    category columns, and ``series`` is what update_demand_series returned for it.
+    """
+    dates = pd.to_datetime(daily["date"])
+    totals = (
+        daily.assign(date=dates)
+        .groupby("product_sku")
+        .agg(
+            units=("quantity", "sum"),
+            revenue=("revenue", "sum"),
+            records=("records", "sum"),
+            first=("date", "min"),
+            last=("date", "max"),
+            product_name=("product_name", "last"),
+            category=("category", "last"),
+        )
+    )
+    stored = {
+        row.product_sku: row
+        for row in db.session.query(
+            Product.product_sku,
+            Product.product_name,
+            Product.category,
+            Product.units_sold,
+            Product.revenue,
+            Product.sales_records,
+            Product.first_sale,
+            Product.last_sale,
+        ).filter_by(user_id=user_id)
+    }
+
+    rows = []
+    for product_sku, total in totals.iterrows():
+        first, last = total["first"].date(), total["last"].date()
+        # CSVs without a product_name or category column give empty values
+        name = total["product_name"] if pd.notna(total["product_name"]) else None
+        name = name or None
+        category = total["category"] if pd.notna(total["category"]) else None
+        category = category or None
+        units, revenue, records = total["units"], total["revenue"], total["records"]
+        previous = stored.get(product_sku)
+        if previous is not None:
+            first = min(first, previous.first_sale)
+            last = max(last, previous.last_sale)
+            name = name or previous.product_name
+            category = category or previous.category
+            units += previous.units_sold
+            revenue += previous.revenue
+            records += previous.sales_records
+        rows.append(
+            (
+                user_id,
+                product_sku,
+                name,
+                category,
+                int(units),
+                float(revenue),
+                int(records),
+                str(first),
+                str(last),
+                int(np.count_nonzero(series[product_sku])),
+            )
+        )
+    bulk_insert(
+        Product,
+        pd.DataFrame(
+            rows,
+            columns=[
+                "user_id",
+                "product_sku",
+                "product_name",
+                "category",
+                "units_sold",
+                "revenue",
+                "sales_records",
+                "first_sale",
+                "last_sale",
+                "sale_days",
+            ],
+            dtype=object,
+        ),
+        replace=True,
+    )
 
-def process_inventory_data(df, source_id):
+    db.session.execute(
+        text(
+            """
+            INSERT OR REPLACE INTO sales_summary (
+                user_id, product_count, units_sold, revenue, sales_records,
+                first_sale, last_sale, coverage
+            )
+            SELECT user_id, COUNT(*), SUM(units_sold), SUM(revenue),
+                   SUM(sales_records), MIN(first_sale), MAX(last_sale),
+                   1.0 * SUM(sale_days) / SUM(
+                       julianday(last_sale) - julianday(first_sale) + 1
+                   )
+            FROM product
+            WHERE user_id = :user_id
+            GROUP BY user_id
+        """
+        ),
+        {"user_id": user_id},
+    )
+
+
+def rebuild_demand_series(user_id):
+    """Recreate a user's DemandSeries and product catalog from SalesData,
+    e.g. for data loaded before they existed."""
+    DemandSeries.query.filter_by(user_id=user_id).delete()
+    Product.query.filter_by(user_id=user_id).delete()
+    SalesSummary.query.filter_by(user_id=user_id).delete()
+    daily = pd.read_sql_query(
+        text(
+            """
+            SELECT product_sku, date, SUM(quantity_sold) AS quantity,
+                   COUNT(*) AS records, COALESCE(SUM(revenue), 0) AS revenue,
+                   MAX(product_name) AS product_name, MAX(category) AS category
+            FROM sales_data
+            WHERE user_id = :user_id
+            GROUP BY product_sku, date
+        """
+        ),
+        db.session.connection(),
+        params={"user_id": user_id},
+    )
+    if not daily.empty:
+        fold_daily_sales(user_id, daily)
+
+
+def process_inventory_data(df, source_id, user_id):
     """Process inventory data CSV and save to database"""
-    # Expected columns: date, product_sku, current_stock, reorder_point, max_stock
+    # Expected columns: date, product_sku, current_stock, reorder_point, max_stock,
+    # lead_time_days
     required_columns = ["date", "product_sku", "current_stock"]
 
     if not all(col in df.columns for col in required_columns):
         raise ValueError(f"CSV must contain columns: {required_columns}")
 
-    for _, row in df.iterrows():
-        inventory_record = InventoryData(
-            user_id=current_user.id,
-            source_id=source_id,
-            date=pd.to_datetime(row["date"]).date(),
-            product_sku=row["product_sku"],
-            current_stock=int(row["current_stock"]),
-            reorder_point=int(row.get("reorder_point", 0)),
-            max_stock=int(row.get("max_stock", 0)),
-        )
-        db.session.add(inventory_record)
+    require_valid(df, "product_sku", df["product_sku"].notna())
+    records = pd.DataFrame(
+        {
+            "user_id": user_id,
+            "source_id": source_id,
+            "date": parse_dates(df),
+            "product_sku": df["product_sku"].astype(str),
+            "current_stock": parse_numbers(df, "current_stock", required=True).astype(
+                "int64"
+            ),
+            # Blank limits are stored as NULL rather than rejecting the row;
+            # whole floats land as integers thanks to the column affinity
+            "reorder_point": np.trunc(parse_numbers(df, "reorder_point", default=0)),
+            "max_stock": np.trunc(parse_numbers(df, "max_stock", default=0)),
+            # Blank or missing lead times fall back to LEAD_TIME_DAYS
+            "lead_time_days": np.trunc(parse_numbers(df, "lead_time_days")),
+        }
+    )
+    bulk_insert(InventoryData, records)
 
 
 @app.route("/forecast")
 @login_required
 def forecast_view():
     products = (
-        db.session.query(SalesData.product_sku)
+        db.session.query(Product.product_sku)
         .filter_by(user_id=current_user.id)
-        .distinct()
+        .order_by(Product.product_sku)
         .all()
     )
     return render_template("forecast.html", products=[p[0] for p in products])
@@ -308,46 +986,48 @@ def generate_forecast():
     product_sku = request.form["product_sku"]
     forecast_days = int(request.form.get("forecast_days", 30))
     model_type = request.form.get("model_type", "arima")
+    if model_type not in ("auto", *MODEL_TYPES, *MODEL_GRID):
+        flash(f"Unknown forecasting model: {model_type}")
+        return redirect(url_for("forecast_view"))
 
     try:
-        # Get historical sales data
-        sales_data = (
-            db.session.query(SalesData)
-            .filter_by(user_id=current_user.id, product_sku=product_sku)
-            .order_by(SalesData.date)
-            .all()
-        )
+        # Get historical daily demand
+        series = DemandSeries.query.get((current_user.id, product_sku))
 
-        if len(sales_data) < 10:
-            flash("Need at least 10 data points for forecasting")
+        if series is None or series.records < MIN_FORECAST_RECORDS:
+            flash(f"Need at least {MIN_FORECAST_RECORDS} data points for forecasting")
             return redirect(url_for("forecast_view"))
 
-        # Prepare time series data
-        df = pd.DataFrame(
-            [
-                {"date": record.date, "quantity": record.quantity_sold}
-                for record in sales_data
-            ]
+        # Generate forecast, reusing the last fit if no sales were added
+        forecast_data, model_used = cached_forecast(
+            current_user.id,
+            product_sku,
+            series.daily_quantities(),
+            model_type,
+            forecast_days,
+            candidates=quick_candidates(current_user.id, product_sku),
         )
 
-        df["date"] = pd.to_datetime(df["date"])
-        df = df.set_index("date").resample("D").sum().fillna(0)
-
-        # Generate forecast
-        if model_type == "arima":
-            forecast_data = generate_arima_forecast(df["quantity"], forecast_days)
-        else:  # exponential_smoothing
-            forecast_data = generate_exponential_smoothing_forecast(
-                df["quantity"], forecast_days
-            )
-
         # Save forecast to database
-        save_forecast_to_db(product_sku, forecast_data, model_type)
+        record_forecasts(
+            current_user.id,
+            model_type,
+            forecast_days,
+            {product_sku: forecast_data},
+            {product_sku: model_used},
+        )
 
         # Generate alerts
-        generate_reorder_alerts(product_sku, forecast_data)
+        generate_reorder_alerts(current_user.id, {product_sku: forecast_data})
+        db.session.commit()
 
-        flash(f"Forecast generated for {product_sku}")
+        if model_used == "moving_average":
+            flash(
+                f"The {model_type} model could not be fitted to {product_sku}; "
+                f"showing the 7-day average instead"
+            )
+        else:
+            flash(f"Forecast generated for {product_sku} with {model_used}")
         return redirect(url_for("forecast_results", product_sku=product_sku))
 
     except Exception as e:
@@ -355,179 +1035,1419 @@ def generate_forecast():
         return redirect(url_for("forecast_view"))
 
 
-def generate_arima_forecast(ts_data, forecast_days):
-    """Generate ARIMA forecast"""
+def forecast_series(ts_data, model_type, forecast_days):
+    """Forecast daily demand ``forecast_days`` days ahead.
+
+    ``model_type`` is one of MODEL_TYPES or a MODEL_GRID name. Returns
+    ``(forecast_data, model_used, params)``; ``params`` can be passed to
+    fit_forecast to warm-start a later fit of ``model_used``. A model that
+    cannot be fitted is logged and replaced by the 7-day moving average,
+    with model_used "moving_average" and no params.
+    """
+    model_used = MODEL_TYPES.get(model_type, model_type)
     try:
-        # Auto ARIMA parameters (simplified)
-        model = ARIMA(ts_data, order=(1, 1, 1))
+        forecast_data, params = fit_model(ts_data, model_used, forecast_days)
+        return forecast_data, model_used, params
+    except Exception as e:
+        app.logger.warning(
+            "%s failed on %d days of demand, using the moving average: %s",
+            model_used,
+            len(ts_data),
+            e,
+        )
+        return moving_average_forecast(ts_data, forecast_days), "moving_average", None
+
+
+def fit_model(ts_data, model, forecast_days, start_params=None):
+    """Fit one MODEL_GRID model; returns ``(forecast_data, params)``."""
+    family, options = MODEL_GRID[model]
+    if family == "baseline":
+        return baseline_forecasts({model: ts_data}, model, forecast_days)[model], []
+    if family == "arima":
+        return generate_arima_forecast(ts_data, forecast_days, start_params, **options)
+    return generate_exponential_smoothing_forecast(
+        ts_data, forecast_days, start_params, **options
+    )
+
+
+def generate_arima_forecast(ts_data, forecast_days, start_params=None, order=(1, 1, 1)):
+    """Generate ARIMA forecast"""
+    model = ARIMA(ts_data, order=order)
+    fitted_model = model.fit(start_params=start_params)
+
+    # Generate forecast
+    forecast = fitted_model.forecast(steps=forecast_days)
+    conf_int = fitted_model.get_forecast(steps=forecast_days).conf_int()
+
+    # Prepare forecast data
+    start_date = ts_data.index[-1] + timedelta(days=1)
+    forecast_dates = [start_date + timedelta(days=i) for i in range(forecast_days)]
+
+    forecast_data = []
+    for i, date in enumerate(forecast_dates):
+        forecast_data.append(
+            {
+                "date": date,
+                "predicted_demand": max(0, forecast.iloc[i]),
+                "confidence_lower": max(0, conf_int.iloc[i, 0]),
+                "confidence_upper": max(0, conf_int.iloc[i, 1]),
+            }
+        )
+
+    return forecast_data, fitted_model.params.tolist()
+
+
+def generate_exponential_smoothing_forecast(
+    ts_data, forecast_days, start_params=None, trend="add", seasonal=None
+):
+    """Generate Exponential Smoothing forecast
+
+    ``seasonal`` adds a weekly cycle.
+    """
+    model = ExponentialSmoothing(
+        ts_data,
+        trend=trend,
+        seasonal=seasonal,
+        seasonal_periods=7 if seasonal else None,
+    )
+    if start_params is None:
         fitted_model = model.fit()
+    else:
+        # The brute-force grid search is what a warm start saves
+        fitted_model = model.fit(start_params=start_params, use_brute=False)
 
-        # Generate forecast
-        forecast = fitted_model.forecast(steps=forecast_days)
-        conf_int = fitted_model.get_forecast(steps=forecast_days).conf_int()
-
-        # Prepare forecast data
-        start_date = ts_data.index[-1] + timedelta(days=1)
-        forecast_dates = [start_date + timedelta(days=i) for i in range(forecast_days)]
-
-        forecast_data = []
-        for i, date in enumerate(forecast_dates):
-            forecast_data.append(
-                {
-                    "date": date,
-                    "predicted_demand": max(0, forecast.iloc[i]),
-                    "confidence_lower": max(0, conf_int.iloc[i, 0]),
-                    "confidence_upper": max(0, conf_int.iloc[i, 1]),
-                }
-            )
+    forecast = fitted_model.forecast(steps=forecast_days)
 
-        return forecast_data
+    start_date = ts_data.index[-1] + timedelta(days=1)
+    forecast_dates = [start_date + timedelta(days=i) for i in range(forecast_days)]
 
-    except Exception as e:
-        # Fallback to simple moving average
-        avg_demand = ts_data.tail(7).mean()
-        start_date = ts_data.index[-1] + timedelta(days=1)
-
-        forecast_data = []
-        for i in range(forecast_days):
-            date = start_date + timedelta(days=i)
-            forecast_data.append(
-                {
-                    "date": date,
-                    "predicted_demand": max(0, avg_demand),
-                    "confidence_lower": max(0, avg_demand * 0.8),
-                    "confidence_upper": max(0, avg_demand * 1.2),
-                }
+    forecast_data = []
+    for i, date in enumerate(forecast_dates):
+        pred_val = max(0, forecast.iloc[i])
+        forecast_data.append(
+            {
+                "date": date,
+                "predicted_demand": pred_val,
+                "confidence_lower": pred_val * 0.85,
+                "confidence_upper": pred_val * 1.15,
+            }
+        )
+
+    # The estimated parameters, in the order fit() takes start_params
+    params = fitted_model.params
+    values = [params["smoothing_level"]]
+    if trend:
+        values.append(params["smoothing_trend"])
+    if seasonal:
+        values.append(params["smoothing_seasonal"])
+    values.append(params["initial_level"])
+    if trend:
+        values.append(params["initial_trend"])
+    if seasonal:
+        values.extend(params["initial_seasons"])
+    return forecast_data, [float(value) for value in values]
+
+
+def moving_average_forecast(ts_data, forecast_days):
+    """Fallback to simple moving average"""
+    avg_demand = ts_data.tail(7).mean()
+    start_date = ts_data.index[-1] + timedelta(days=1)
+
+    forecast_data = []
+    for i in range(forecast_days):
+        date = start_date + timedelta(days=i)
+        forecast_data.append(
+            {
+                "date": date,
+                "predicted_demand": max(0, avg_demand),
+                "confidence_lower": max(0, avg_demand * 0.8),
+                "confidence_upper": max(0, avg_demand * 1.2),
+            }
+        )
+
+    return forecast_data
+
+
+# Baseline forecasters
+#
+# Cheap models for slow-moving SKUs that forecast a whole SKU x day matrix
+# in one NumPy pass instead of fitting a statsmodels model per SKU.
+
+
+def demand_matrix(series, days):
+    """Stack daily demand series into an SKU x day matrix.
+
+    Each row holds the last ``days`` days of one series, right-aligned on
+    its final day; a shorter history is left-padded with NaN.
+    """
+    matrix = np.full((len(series), days), np.nan)
+    for row, ts_data in enumerate(series.values()):
+        values = ts_data.to_numpy()[-days:]
+        matrix[row, days - len(values) :] = values
+    return matrix
+
+
+def baseline_forecast(matrix, horizon, method, **options):
+    """Forecast every row of a demand matrix ``horizon`` days ahead.
+
+    Returns ``(predicted, lower, upper)`` arrays of SKUs x horizon. The band
+    is 1.96 standard deviations of the last four weeks of demand.
+    """
+    if method == "seasonal_naive":
+        period = options["period"]
+        season = np.nan_to_num(matrix[:, -period:])
+        predicted = np.tile(season, -(-horizon // period))[:, :horizon]
+    else:
+        level = BASELINE_METHODS[method](matrix, **options)
+        predicted = np.repeat(np.nan_to_num(level)[:, None], horizon, axis=1)
+
+    recent = matrix[:, -28:]
+    seen = (~np.isnan(recent)).sum(axis=1)
+    mean = np.nansum(recent, axis=1) / seen
+    spread = 1.96 * np.sqrt(np.nansum((recent - mean[:, None]) ** 2, axis=1) / seen)
+    lower = np.maximum(predicted - spread[:, None], 0)
+    upper = predicted + spread[:, None]
+    return predicted, lower, upper
+
+
+def moving_average_level(matrix, window):
+    recent = matrix[:, -window:]
+    return np.nansum(recent, axis=1) / (~np.isnan(recent)).sum(axis=1)
+
+
+def ses_level(matrix, alpha):
+    """Simple exponential smoothing level, starting from the first day."""
+    first = np.argmax(~np.isnan(matrix), axis=1)
+    level = matrix[np.arange(len(matrix)), first]
+    for day in matrix.T:
+        # NaN padding leaves the level alone
+        level = np.where(np.isnan(day), level, level + alpha * (day - level))
+    return level
+
+
+def croston_level(matrix, alpha):
+    """Croston's method: smoothed demand size over smoothed demand interval."""
+    size = np.full(len(matrix), np.nan)
+    interval = np.full(len(matrix), np.nan)
+    since = np.zeros(len(matrix))
+    for day in matrix.T:
+        since += ~np.isnan(day)
+        sold = day > 0
+        first = sold & np.isnan(size)
+        size = np.where(first, day, np.where(sold, size + alpha * (day - size), size))
+        interval = np.where(
+            first,
+            since,
+            np.where(sold, interval + alpha * (since - interval), interval),
+        )
+        since[sold] = 0
+    # SKUs that never sold forecast zero
+    return size / interval
+
+
+def tsb_level(matrix, alpha, beta):
+    """Teunter-Syntetos-Babai: smoothed demand size times the smoothed
+    probability of a sale, which decays through long runs without one."""
+    seen = ~np.isnan(matrix)
+    sold = matrix > 0
+    with np.errstate(invalid="ignore"):
+        probability = sold.sum(axis=1) / seen.sum(axis=1)
+        size = np.where(sold, matrix, 0).sum(axis=1) / sold.sum(axis=1)
+    for day in matrix.T:
+        sale = day > 0
+        probability = np.where(
+            np.isnan(day), probability, probability + beta * (sale - probability)
+        )
+        size = np.where(sale, size + alpha * (day - size), size)
+    return probability * size
+
+
+BASELINE_METHODS = {
+    "moving_average": moving_average_level,
+    "ses": ses_level,
+    "croston": croston_level,
+    "tsb": tsb_level,
+}
+
+
+def baseline_forecasts(series, model, forecast_days):
+    """Forecast ``{product_sku: ts_data}`` with a baseline MODEL_GRID model.
+
+    Returns ``{product_sku: forecast_data}``.
+    """
+    _, options = MODEL_GRID[model]
+    predicted, lower, upper = baseline_forecast(
+        demand_matrix(series, BASELINE_HISTORY_DAYS), forecast_days, **options
+    )
+    last_days = np.array(
+        [ts_data.index[-1].to_datetime64() for ts_data in series.values()],
+        dtype="datetime64[D]",
+    )
+    dates = (last_days[:, None] + np.arange(1, forecast_days + 1)).astype(
+        "datetime64[us]"
+    )
+    return {
+        product_sku: [
+            {
+                "date": date,
+                "predicted_demand": values[0],
+                "confidence_lower": values[1],
+                "confidence_upper": values[2],
+            }
+            for date, *values in zip(
+                dates[row].tolist(),
+                predicted[row].tolist(),
+                lower[row].tolist(),
+                upper[row].tolist(),
             )
+        ]
+        for row, product_sku in enumerate(series)
+    }
+
+
+# Model selection
+
+
+def backtest_origins(length, horizon):
+    """Training lengths of the rolling-origin folds for a series, oldest first.
+
+    Each of the last BACKTEST_FOLDS windows of ``horizon`` days is forecast
+    from all the days before it. Folds with fewer than MIN_TRAIN_DAYS days
+    to train on are skipped.
+    """
+    return [
+        length - fold * horizon
+        for fold in range(BACKTEST_FOLDS, 0, -1)
+        if length - fold * horizon >= MIN_TRAIN_DAYS
+    ]
+
+
+def backtest(ts_data, model, horizon):
+    """Score a MODEL_GRID model on rolling-origin folds of a series.
+
+    Returns ``{"folds", "mape", "rmse"}``. MAPE (in percent) only counts days
+    with sales and is None if there are none. A model that fails to fit
+    any fold scores infinitely badly.
+    """
+    origins = backtest_origins(len(ts_data), horizon)
+    if not origins:
+        return {"folds": 0, "mape": None, "rmse": None}
+
+    errors = []
+    actuals = []
+    for origin in origins:
+        try:
+            forecast_data, _ = fit_model(ts_data.iloc[:origin], model, horizon)
+        except Exception:
+            return {"folds": len(origins), "mape": math.inf, "rmse": math.inf}
+        actual = ts_data.iloc[origin : origin + horizon].to_numpy(dtype=float)
+        predicted = np.array(
+            [d["predicted_demand"] for d in forecast_data], dtype=float
+        )
+        errors.append(predicted - actual)
+        actuals.append(actual)
+
+    errors = np.concatenate(errors)
+    actuals = np.concatenate(actuals)
+    sold = actuals > 0
+    return {
+        "folds": len(origins),
+        "mape": (
+            float(np.mean(np.abs(errors[sold]) / actuals[sold]) * 100)
+            if sold.any()
+            else None
+        ),
+        "rmse": float(np.sqrt(np.mean(errors**2))),
+    }
+
+
+def best_model(scores):
+    """The model with the lowest SELECTION_METRIC in ``{model: backtest()}``.
+
+    Ties, and SKUs without a MAPE, are settled by RMSE. Without any folds
+    to compare on, the default ARIMA model is used.
+    """
+    metric = app.config["SELECTION_METRIC"]
+    scored = {model: score for model, score in scores.items() if score["folds"]}
+    if not scored:
+        return MODEL_TYPES["arima"]
+
+    def rank(model):
+        score = scored[model]
+        value = score[metric]
+        return (math.inf if value is None else value, score["rmse"])
+
+    return min(scored, key=rank)
+
+
+def save_backtests(user_id, horizon, backtests, selected):
+    """Replace the stored backtest scores of every SKU in ``backtests``.
+
+    ``backtests`` maps each SKU to its ``{model: backtest()}`` scores and
+    ``selected`` to the model chosen from them.
+    """
+    delete_for_skus(BacktestResult, user_id, list(backtests))
+    rows = [
+        (
+            user_id,
+            product_sku,
+            model,
+            horizon,
+            score["folds"],
+            score["mape"],
+            score["rmse"],
+            model == selected[product_sku],
+            # bulk_insert skips the ORM, so column defaults are set here
+            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f"),
+        )
+        for product_sku, scores in backtests.items()
+        for model, score in scores.items()
+    ]
+    if rows:
+        bulk_insert(
+            BacktestResult,
+            pd.DataFrame(
+                rows,
+                columns=[
+                    "user_id",
+                    "product_sku",
+                    "model_used",
+                    "horizon",
+                    "folds",
+                    "mape",
+                    "rmse",
+                    "selected",
+                    "created_at",
+                ],
+                dtype=object,
+            ),
+        )
 
-        return forecast_data
 
+def delete_for_skus(model, user_id, skus):
+    """Delete a user's ``model`` rows for many SKUs."""
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(skus), 500):
+        model.query.filter(
+            model.user_id == user_id,
+            model.product_sku.in_(skus[start : start + 500]),
+        ).delete(synchronize_session=False)
 
-def generate_exponential_smoothing_forecast(ts_data, forecast_days):
-    """Generate Exponential Smoothing forecast"""
-    try:
-        model = ExponentialSmoothing(ts_data, trend="add", seasonal=None)
-        fitted_model = model.fit()
 
-        forecast = fitted_model.forecast(steps=forecast_days)
-
-        start_date = ts_data.index[-1] + timedelta(days=1)
-        forecast_dates = [start_date + timedelta(days=i) for i in range(forecast_days)]
-
-        forecast_data = []
-        for i, date in enumerate(forecast_dates):
-            pred_val = max(0, forecast[i])
-            forecast_data.append(
-                {
-                    "date": date,
-                    "predicted_demand": pred_val,
-                    "confidence_lower": pred_val * 0.85,
-                    "confidence_upper": pred_val * 1.15,
-                }
+# Forecast cache
+
+FORECAST_FIELDS = ["predicted_demand", "confidence_lower", "confidence_upper"]
+
+
+def series_hash(ts_data):
+    """Fingerprint of a daily demand series: its first day and quantities."""
+    digest = hashlib.sha1(ts_data.index[0].strftime("%Y-%m-%d").encode())
+    digest.update(
+        np.ascontiguousarray(ts_data.to_numpy(), dtype=DEMAND_DTYPE).tobytes()
+    )
+    return digest.hexdigest()
+
+
+def encode_forecast(forecast_data):
+    encoded = {
+        field: [float(d[field]) for d in forecast_data] for field in FORECAST_FIELDS
+    }
+    encoded["start"] = (
+        forecast_data[0]["date"].strftime("%Y-%m-%d") if forecast_data else None
+    )
+    return json.dumps(encoded)
+
+
+def decode_forecast(encoded):
+    encoded = json.loads(encoded)
+    if encoded["start"] is None:
+        return []
+    start = datetime.strptime(encoded["start"], "%Y-%m-%d")
+    return [
+        {
+            "date": start + timedelta(days=i),
+            **{field: encoded[field][i] for field in FORECAST_FIELDS},
+        }
+        for i in range(len(encoded["predicted_demand"]))
+    ]
+
+
+def check_cache(entry, ts_data):
+    """Look a series up in its ForecastCache entry.
+
+    Returns ``(forecast_data, model_used, start_params)``: the cached
+    forecast if the series is unchanged, otherwise None and, if the series
+    only gained up to WARM_START_DAYS new days, the cached model and its
+    parameters to warm-start from.
+    """
+    if entry is None:
+        return None, None, None
+    if entry.series_hash == series_hash(ts_data):
+        return decode_forecast(entry.forecast), entry.model_used, None
+    added = len(ts_data) - entry.series_length
+    if (
+        entry.params
+        and 0 < added <= WARM_START_DAYS
+        and entry.series_hash == series_hash(ts_data.iloc[: entry.series_length])
+    ):
+        return None, entry.model_used, json.loads(entry.params)
+    return None, None, None
+
+
+def fit_forecast(ts_data, model_type, forecast_days, start_params=None):
+    """forecast_series, warm-started from ``start_params`` when given.
+
+    ``start_params`` must come from an earlier fit of the MODEL_GRID model
+    ``model_type``.
+    """
+    if start_params is not None:
+        try:
+            forecast_data, params = fit_model(
+                ts_data, model_type, forecast_days, start_params
             )
+            return forecast_data, model_type, params
+        except Exception:
+            # A failed warm start still deserves a cold fit before the fallback
+            pass
+    return forecast_series(ts_data, model_type, forecast_days)
 
-        return forecast_data
 
-    except Exception as e:
-        # Fallback to simple moving average
-        avg_demand = ts_data.tail(7).mean()
-        start_date = ts_data.index[-1] + timedelta(days=1)
-
-        forecast_data = []
-        for i in range(forecast_days):
-            date = start_date + timedelta(days=i)
-            forecast_data.append(
-                {
-                    "date": date,
-                    "predicted_demand": max(0, avg_demand),
-                    "confidence_lower": max(0, avg_demand * 0.8),
-                    "confidence_upper": max(0, avg_demand * 1.2),
-                }
+def save_cache_entries(user_id, model_type, forecast_days, fitted):
+    """Store ``{product_sku: (ts_data, forecast_data, model_used, params)}``."""
+    if not fitted:
+        return
+    bulk_insert(
+        ForecastCache,
+        pd.DataFrame(
+            [
+                (
+                    user_id,
+                    product_sku,
+                    model_type,
+                    forecast_days,
+                    series_hash(ts_data),
+                    len(ts_data),
+                    model_used,
+                    None if params is None else json.dumps(params),
+                    encode_forecast(forecast_data),
+                    datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f"),
+                )
+                for product_sku, (
+                    ts_data,
+                    forecast_data,
+                    model_used,
+                    params,
+                ) in fitted.items()
+            ],
+            columns=[
+                "user_id",
+                "product_sku",
+                "model_type",
+                "forecast_days",
+                "series_hash",
+                "series_length",
+                "model_used",
+                "params",
+                "forecast",
+                "created_at",
+            ],
+            dtype=object,
+        ),
+        replace=True,
+    )
+
+
+def cached_forecast(
+    user_id, product_sku, ts_data, model_type, forecast_days, candidates=None
+):
+    """Forecast one SKU through the cache, refitting only if its sales changed.
+
+    Returns ``(forecast_data, model_used)``. With model_type "auto", a refit
+    that cannot warm-start first backtests every model in ``candidates``
+    (default: all of MODEL_GRID) to choose the model.
+    """
+    entry = ForecastCache.query.get((user_id, product_sku, model_type, forecast_days))
+    forecast_data, model_used, start_params = check_cache(entry, ts_data)
+    if forecast_data is not None:
+        return forecast_data, model_used
+
+    if start_params is None:
+        model_used = model_type
+        if model_type == "auto":
+            scores = {
+                model: backtest(ts_data, model, forecast_days)
+                for model in candidates or MODEL_GRID
+            }
+            model_used = best_model(scores)
+            save_backtests(
+                user_id,
+                forecast_days,
+                {product_sku: scores},
+                {product_sku: model_used},
             )
+    forecast_data, model_used, params = fit_forecast(
+        ts_data, model_used, forecast_days, start_params
+    )
+    save_cache_entries(
+        user_id,
+        model_type,
+        forecast_days,
+        {product_sku: (ts_data, forecast_data, model_used, params)},
+    )
+    return forecast_data, model_used
 
-        return forecast_data
 
+def quick_candidates(user_id, product_sku):
+    """Models the web "auto" forecast backtests for a SKU.
+
+    Backtesting all of MODEL_GRID takes seconds per SKU, too long for a
+    request, so only the baselines and the model a previous selection chose
+    are scored. ``flask forecast-all --model auto`` runs the full selection.
+    """
+    selected = (
+        db.session.query(BacktestResult.model_used)
+        .filter_by(user_id=user_id, product_sku=product_sku, selected=True)
+        .scalar()
+    )
+    if selected in MODEL_GRID and selected not in BASELINE_MODELS:
+        return [*BASELINE_MODELS, selected]
+    return BASELINE_MODELS
 
-def save_forecast_to_db(product_sku, forecast_data, model_type):
-    """Save forecast results to database"""
-    # Delete existing forecasts for this product
-    Forecast.query.filter_by(user_id=current_user.id, product_sku=product_sku).delete()
 
-    # Save new forecasts
-    for data_point in forecast_data:
-        forecast_record = Forecast(
-            user_id=current_user.id,
-            product_sku=product_sku,
-            forecast_date=data_point["date"],
-            predicted_demand=data_point["predicted_demand"],
-            confidence_lower=data_point["confidence_lower"],
-            confidence_upper=data_point["confidence_upper"],
-            model_used=model_type,
+# Batch forecasting
+
+
+def load_daily_demand(user_id):
+    """Daily demand for every SKU with enough history, from DemandSeries.
+
+    Each series runs from the SKU's first to its last sale with missing days
+    as zero.
+    """
+    return {
+        series.product_sku: series.daily_quantities()
+        for series in DemandSeries.query.filter(
+            DemandSeries.user_id == user_id,
+            DemandSeries.records >= MIN_FORECAST_RECORDS,
         )
-        db.session.add(forecast_record)
+    }
+
+
+def _forecast_task(task):
+    # Runs in a worker process, so it has to be a picklable module-level
+    # function
+    product_sku, ts_data, model_type, forecast_days, start_params = task
+    return (
+        product_sku,
+        fit_forecast(ts_data, model_type, forecast_days, start_params),
+    )
+
 
+def _backtest_task(task):
+    # Runs in a worker process like _forecast_task
+    product_sku, ts_data, model, horizon = task
+    return product_sku, model, backtest(ts_data, model, horizon)
+
+
+def run_batch_forecast(
+    user_id,
+    model_type="arima",
+    forecast_days=30,
+    workers=None,
+    progress=None,
+    candidates=None,
+):
+    """Forecast every SKU of a user and save the results in bulk.
+
+    SKUs whose sales are unchanged since their cached fit reuse it; the rest
+    fan out over a process pool of ``workers`` processes (default: one per
+    core), warm-started where possible. With model_type "auto", SKUs that
+    cannot warm-start first backtest every model in ``candidates`` (default:
+    all of MODEL_GRID), one pool task per SKU and model, and are forecast
+    with the best. ``progress(done, total)`` is called as each SKU
+    finishes. Returns the number of SKUs forecast.
+    """
+    series = load_daily_demand(user_id)
+    latest_runs = dict(
+        db.session.query(Forecast.product_sku, db.func.max(Forecast.run_id))
+        .filter_by(user_id=user_id)
+        .group_by(Forecast.product_sku)
+        .all()
+    )
+    cache = {
+        entry.product_sku: entry
+        for entry in ForecastCache.query.filter_by(
+            user_id=user_id, model_type=model_type, forecast_days=forecast_days
+        )
+    }
+
+    forecasts = {}
+    models = {}
+    # SKUs whose latest run already holds their cached forecast
+    unchanged = set()
+    # (product_sku, model, start_params) still to fit
+    pending = []
+    cold = []
+    for product_sku, ts_data in series.items():
+        entry = cache.get(product_sku)
+        forecast_data, model_used, start_params = check_cache(entry, ts_data)
+        if forecast_data is not None:
+            forecasts[product_sku] = forecast_data
+            models[product_sku] = model_used
+            if entry.run_id is not None and entry.run_id == latest_runs.get(
+                product_sku
+            ):
+                unchanged.add(product_sku)
+        elif start_params is not None:
+            pending.append((product_sku, model_used, start_params))
+        else:
+            cold.append(product_sku)
+    if progress and forecasts:
+        progress(len(forecasts), len(series))
+    workers = workers or os.cpu_count() or 1
+
+    fitted = {}
+
+    def collect(results):
+        for product_sku, (forecast_data, model_used, params) in results:
+            forecasts[product_sku] = forecast_data
+            models[product_sku] = model_used
+            fitted[product_sku] = (
+                series[product_sku],
+                forecast_data,
+                model_used,
+                params,
+            )
+            if progress:
+                progress(len(forecasts), len(series))
+
+    with ExitStack() as stack:
+        executor = None
+        if workers > 1:
+            # Spawned workers start clean instead of inheriting the parent's
+            # open SQLite connections
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            )
+
+        def run(function, jobs):
+            if executor is None or len(jobs) < 2:
+                return map(function, jobs)
+            chunksize = max(1, len(jobs) // (workers * 4))
+            return executor.map(function, jobs, chunksize=chunksize)
+
+        chosen = dict.fromkeys(cold, model_type)
+        if model_type == "auto" and cold:
+            backtests = {product_sku: {} for product_sku in cold}
+            jobs = [
+                (product_sku, series[product_sku], model, forecast_days)
+                for product_sku in cold
+                for model in candidates or MODEL_GRID
+            ]
+            for product_sku, model, score in run(_backtest_task, jobs):
+                backtests[product_sku][model] = score
+            chosen = {
+                product_sku: best_model(scores)
+                for product_sku, scores in backtests.items()
+            }
+            save_backtests(user_id, forecast_days, backtests, chosen)
+
+        pending.extend(
+            (product_sku, model, None) for product_sku, model in chosen.items()
+        )
+
+        # Baselines forecast all their SKUs in one pass; the rest go to the pool
+        baselines = {}
+        tasks = []
+        for product_sku, model, start_params in pending:
+            if MODEL_GRID.get(model, ("",))[0] == "baseline":
+                baselines.setdefault(model, {})[product_sku] = series[product_sku]
+            else:
+                tasks.append(
+                    (
+                        product_sku,
+                        series[product_sku],
+                        model,
+                        forecast_days,
+                        start_params,
+                    )
+                )
+        for model, baseline_series in baselines.items():
+            collect(
+                (product_sku, (forecast_data, model, []))
+                for product_sku, forecast_data in baseline_forecasts(
+                    baseline_series, model, forecast_days
+                ).items()
+            )
+        collect(run(_forecast_task, tasks))
+
+    save_cache_entries(user_id, model_type, forecast_days, fitted)
+    record_forecasts(
+        user_id,
+        model_type,
+        forecast_days,
+        {
+            product_sku: forecast_data
+            for product_sku, forecast_data in forecasts.items()
+            if product_sku not in unchanged
+        },
+        models,
+    )
+    generate_reorder_alerts(user_id, forecasts)
     db.session.commit()
+    return len(forecasts)
+
+
+def record_forecasts(user_id, model_type, forecast_days, forecasts, models):
+    """Save ``{product_sku: forecast_data}`` as a new ForecastRun.
+
+    ``models`` maps each SKU to the model its forecast came from. The
+    ForecastCache entries behind the forecasts are pointed at the run, and
+    the SKUs' runs beyond FORECAST_RUNS_KEPT are dropped. Returns the run,
+    or None if there was nothing to save.
+    """
+    if not forecasts:
+        return None
+    run = ForecastRun(
+        user_id=user_id,
+        model_type=model_type,
+        forecast_days=forecast_days,
+        sku_count=len(forecasts),
+    )
+    db.session.add(run)
+    db.session.flush()
+
+    save_forecasts(user_id, run.id, forecasts, models)
+    db.session.connection().exec_driver_sql(
+        """
+        UPDATE forecast_cache SET run_id = ?
+        WHERE user_id = ? AND product_sku = ? AND model_type = ?
+            AND forecast_days = ?
+        """,
+        [
+            (run.id, user_id, product_sku, model_type, forecast_days)
+            for product_sku in forecasts
+        ],
+    )
+    prune_forecast_runs(user_id, next(iter(forecasts)) if len(forecasts) == 1 else None)
+    db.session.commit()
+    return run
+
+
+def save_forecasts(user_id, run_id, forecasts, models):
+    """Upsert a run's forecasts, committing every FORECAST_COMMIT_ROWS rows.
+
+    Rows are keyed by user, SKU, run, date and model, so saving the same
+    run again overwrites what it already wrote instead of failing part way.
+    """
+    # Skips the ORM, so column defaults are set here
+    created_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")
+    rows = (
+        (
+            user_id,
+            product_sku,
+            run_id,
+            d["date"].strftime("%Y-%m-%d"),
+            float(d["predicted_demand"]),
+            float(d["confidence_lower"]),
+            float(d["confidence_upper"]),
+            models[product_sku],
+            created_at,
+        )
+        for product_sku, forecast_data in forecasts.items()
+        for d in forecast_data
+    )
+    chunk_rows = app.config["FORECAST_COMMIT_ROWS"]
+    for chunk in iter(lambda: list(islice(rows, chunk_rows)), []):
+        db.session.connection().exec_driver_sql(
+            """
+            INSERT INTO forecast (
+                user_id, product_sku, run_id, forecast_date, predicted_demand,
+                confidence_lower, confidence_upper, model_used, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, product_sku, run_id, forecast_date, model_used)
+            DO UPDATE SET
+                predicted_demand = excluded.predicted_demand,
+                confidence_lower = excluded.confidence_lower,
+                confidence_upper = excluded.confidence_upper,
+                created_at = excluded.created_at
+            """,
+            chunk,
+        )
+        db.session.commit()
+
+
+def prune_forecast_runs(user_id, product_sku=None):
+    """Drop forecasts beyond each SKU's FORECAST_RUNS_KEPT latest runs.
+
+    Only ``product_sku`` is pruned if given, otherwise every SKU of the
+    user.
+    """
+    db.session.execute(
+        text(
+            """
+            DELETE FROM forecast WHERE id IN (
+                SELECT forecast.id FROM forecast JOIN (
+                    SELECT product_sku, run_id, DENSE_RANK() OVER (
+                        PARTITION BY product_sku ORDER BY run_id DESC
+                    ) AS age
+                    FROM (
+                        SELECT DISTINCT product_sku, run_id FROM forecast
+                        WHERE user_id = :user_id
+                            AND (:product_sku IS NULL OR product_sku = :product_sku)
+                    )
+                ) runs USING (product_sku, run_id)
+                WHERE forecast.user_id = :user_id AND runs.age > :kept
+            )
+        """
+        ),
+        {
+            "user_id": user_id,
+            "product_sku": product_sku,
+            "kept": app.config["FORECAST_RUNS_KEPT"],
+        },
+    )
+
+
+def latest_forecasts(user_id, product_sku):
+    """Query for the rows of a SKU's latest forecast run, by date."""
+    latest_run = (
+        db.session.query(db.func.max(Forecast.run_id))
+        .filter_by(user_id=user_id, product_sku=product_sku)
+        .scalar_subquery()
+    )
+    return (
+        Forecast.query.filter_by(user_id=user_id, product_sku=product_sku)
+        .filter(Forecast.run_id == latest_run)
+        .order_by(Forecast.forecast_date)
+    )
 
 
-def generate_reorder_alerts(product_sku, forecast_data):
-    """Generate reorder alerts based on forecast"""
-    # Get current inventory
-    current_inventory = (
-        db.session.query(InventoryData)
-        .filter_by(user_id=current_user.id, product_sku=product_sku)
-        .order_by(InventoryData.date.desc())
-        .first()
+# Inventory simulation
+#
+# Plans reorders from Monte Carlo demand paths drawn from the forecast
+# intervals, for every SKU of a forecast run in one NumPy pass per chunk.
+
+
+def simulate_inventory(
+    stock, predicted, upper, lead_time, reorder_point, max_stock, rng=None
+):
+    """Simulate the stock of many SKUs over their forecast horizon.
+
+    ``predicted`` and ``upper`` are SKUs x days forecasts and their 95%
+    upper bounds; the other arguments hold one value per SKU, NaN where a
+    reorder point or maximum stock is unknown. Each day's demand is drawn
+    SIMULATION_PATHS times from the normal distribution matching the
+    forecast interval, clipped at zero. SKUs in one chunk share their
+    standard normal draws, which leaves each SKU's own distribution intact.
+
+    Returns a dict of per-SKU arrays:
+
+    - ``stockout_probability``: of running out before an order placed now
+      would arrive
+    - ``days_of_cover``: median days until the stock runs out, at most the
+      horizon
+    - ``order_day``: days from now until an order must go out, so that the
+      chance of running out before it arrives stays within STOCKOUT_RISK,
+      or sooner if the stock is expected to hit its reorder point first
+    - ``order_quantity``: units covering ORDER_COVER_DAYS after arrival at
+      the same risk, without taking the expected stock over max_stock
+    """
+    paths = app.config["SIMULATION_PATHS"]
+    risk = app.config["STOCKOUT_RISK"]
+    cover_days = app.config["ORDER_COVER_DAYS"]
+    rng = np.random.default_rng() if rng is None else rng
+
+    count, horizon = predicted.shape
+    predicted = np.nan_to_num(np.maximum(predicted, 0))
+    spread = np.nan_to_num(np.maximum(upper - predicted, 0) / 1.96)
+    # SKU x day x path, so each day's cumulative sum is one vector add
+    mean_cells = predicted.astype(np.float32)[:, :, None]
+    spread_cells = spread.astype(np.float32)[:, :, None]
+    lead_time = np.clip(lead_time, 0, horizon).astype(int)
+    expected_use = np.cumsum(predicted, axis=1)
+    # Days until the expected stock falls to the reorder point
+    reorder_day = np.where(
+        np.isnan(reorder_point),
+        horizon,
+        np.count_nonzero(
+            stock[:, None] - expected_use > np.nan_to_num(reorder_point)[:, None],
+            axis=1,
+        ),
     )
 
-    if not current_inventory:
+    stockout_probability = np.empty(count)
+    days_of_cover = np.empty(count)
+    order_day = np.empty(count, dtype=int)
+    order_quantity = np.empty(count)
+    chunk = max(1, SIMULATION_CHUNK_CELLS // (paths * horizon))
+    for start in range(0, count, chunk):
+        rows = slice(start, start + chunk)
+        normal = rng.standard_normal((horizon, paths), dtype=np.float32)
+        used = spread_cells[rows] * normal
+        used += mean_cells[rows]
+        np.maximum(used, 0, out=used)
+        # Much faster than np.cumsum along the day axis
+        for day in range(1, horizon):
+            used[:, day] += used[:, day - 1]
+        # Demand is never negative, so the days the stock lasts are the
+        # days whose cumulative demand it still covers
+        cover = (used <= stock[rows, None, None]).sum(axis=1, dtype=np.int32)
+
+        stockout_probability[rows] = np.mean(cover < lead_time[rows, None], axis=1)
+        days_of_cover[rows] = np.median(cover, axis=1)
+        # Days the stock lasts on all but the unluckiest STOCKOUT_RISK paths
+        safe_cover = np.quantile(cover, risk, axis=1, method="lower")
+        due = np.minimum(np.maximum(safe_cover - lead_time[rows], 0), reorder_day[rows])
+        order_day[rows] = due
+        covered_until = np.minimum(due + lead_time[rows] + cover_days, horizon)
+        need = np.quantile(
+            used[np.arange(len(due)), covered_until - 1], 1 - risk, axis=1
+        )
+        order_quantity[rows] = np.maximum(need - stock[rows], 0)
+
+    arrival = order_day + lead_time
+    stock_on_arrival = np.maximum(
+        stock
+        - np.where(
+            arrival > 0,
+            expected_use[np.arange(count), np.clip(arrival, 1, horizon) - 1],
+            0,
+        ),
+        0,
+    )
+    room = np.where(np.isnan(max_stock), np.inf, max_stock - stock_on_arrival)
+    order_quantity = np.ceil(np.clip(order_quantity, 0, np.maximum(room, 0)))
+    return {
+        "stockout_probability": stockout_probability,
+        "days_of_cover": days_of_cover,
+        "order_day": order_day,
+        "order_quantity": order_quantity.astype(int),
+    }
+
+
+def generate_reorder_alerts(user_id, forecasts):
+    """Simulate the stock of the forecast SKUs and alert on stockout risk,
+    orders falling due within REORDER_ALERT_DAYS and overstock.
+
+    ``forecasts`` is ``{product_sku: forecast_data}``; SKUs without
+    inventory data are skipped.
+    """
+    inventory = pd.read_sql_query(
+        text(
+            """
+            SELECT product_sku, current_stock, reorder_point, max_stock,
+                   lead_time_days
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY product_sku ORDER BY date DESC, id DESC
+                ) AS latest
+                FROM inventory_data
+                WHERE user_id = :user_id
+                    AND (:product_sku IS NULL OR product_sku = :product_sku)
+            )
+            WHERE latest = 1
+        """
+        ),
+        db.session.connection(),
+        params={
+            "user_id": user_id,
+            "product_sku": next(iter(forecasts)) if len(forecasts) == 1 else None,
+        },
+        index_col="product_sku",
+    )
+    skus = [product_sku for product_sku in forecasts if product_sku in inventory.index]
+    if not skus:
         return
+    inventory = inventory.loc[skus].astype(float)
+    horizon = min(len(forecasts[product_sku]) for product_sku in skus)
+    predicted, upper = (
+        np.array(
+            [
+                [d[field] for d in forecasts[product_sku][:horizon]]
+                for product_sku in skus
+            ],
+            dtype=float,
+        )
+        for field in ("predicted_demand", "confidence_upper")
+    )
+    stock = inventory["current_stock"].to_numpy()
+    lead_time = (
+        inventory["lead_time_days"].fillna(app.config["LEAD_TIME_DAYS"]).to_numpy()
+    )
+    # Uploads without a max_stock column store 0
+    max_stock = inventory["max_stock"].where(inventory["max_stock"] > 0).to_numpy()
+    plan = simulate_inventory(
+        stock,
+        predicted,
+        upper,
+        lead_time,
+        inventory["reorder_point"].to_numpy(),
+        max_stock,
+    )
 
-    # Calculate cumulative demand for next 7 days
-    week_demand = sum([d["predicted_demand"] for d in forecast_data[:7]])
+    risk = app.config["STOCKOUT_RISK"]
+    stockout = plan["stockout_probability"] > risk
+    due = ~stockout & (plan["order_day"] <= app.config["REORDER_ALERT_DAYS"])
+    overstock = stock > np.nan_to_num(max_stock, nan=np.inf)
+    alerts = []
+    for row in np.flatnonzero(stockout | due | overstock):
+        product_sku = skus[row]
+        cover = plan["days_of_cover"][row]
+        quantity = plan["order_quantity"][row]
+        if stockout[row]:
+            alert_type = "stockout"
+            message = (
+                f"Stockout risk for {product_sku}: "
+                f"{plan['stockout_probability'][row]:.0%} chance of running out "
+                f"within the {lead_time[row]:.0f}-day lead time "
+                f"({stock[row]:.0f} in stock, {cover:.0f} days of cover). "
+                f"Order {quantity} units now."
+            )
+        elif due[row]:
+            # Day 1 of the forecast is the first day after the stock count
+            order_by = forecasts[product_sku][0]["date"] + timedelta(
+                days=int(plan["order_day"][row]) - 1
+            )
+            alert_type = "reorder"
+            message = (
+                f"Reorder {quantity} units of {product_sku} by "
+                f"{order_by:%Y-%m-%d}: {cover:.0f} days of cover, "
+                f"{lead_time[row]:.0f}-day lead time."
+            )
+        else:
+            alert_type = "overstock"
+            message = (
+                f"Overstock of {product_sku}: {stock[row]:.0f} in stock against "
+                f"a maximum of {max_stock[row]:.0f} ({cover:.0f} days of cover)."
+            )
+        alerts.append((product_sku, alert_type, message))
+    if alerts:
+        bulk_insert(
+            Alert,
+            pd.DataFrame(
+                alerts, columns=["product_sku", "alert_type", "message"]
+            ).assign(
+                user_id=user_id,
+                is_read=False,
+                created_at=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f"),
+            ),
+        )
 
-    # Check if reorder is needed
-    if current_inventory.current_stock < week_demand:
-        alert = Alert(
-            user_id=current_user.id,
-            product_sku=product_sku,
-            alert_type="reorder",
-            message=f"Reorder needed for {product_sku}. Current stock: {current_inventory.current_stock}, 7-day forecast demand: {week_demand:.0f}",
+
+# Hierarchical forecasting
+#
+# Forecasts the total, each category, each SKU and each SKU x channel with
+# one baseline pass over the stacked series, then reconciles them so every
+# level adds up. Aggregation is a sparse matrix A from the bottom level
+# (SKU x channel) to the nodes above it.
+
+HIERARCHY_LEVELS = ["total", "category", "sku", "channel"]
+RECONCILIATION_METHODS = ["bottom_up", "top_down", "mint"]
+# Category of products uploaded without one
+UNCATEGORIZED = "Uncategorized"
+
+
+def load_channel_demand(user_id, days):
+    """Daily units per SKU and channel over a user's last ``days`` days.
+
+    Returns ``(keys, matrix, last_day)``: a DataFrame with the category,
+    product_sku and channel of each series, sorted by them, and a series x
+    day matrix ending on the user's last sale, with days without sales as
+    zero. None if the user has no sales.
+    """
+    summary = SalesSummary.query.get(user_id)
+    if summary is None or summary.last_sale is None:
+        return None
+    last_day = np.datetime64(summary.last_sale, "D")
+    first_day = last_day - days + 1
+    daily = pd.read_sql_query(
+        text(
+            """
+            SELECT sales_data.product_sku, data_source.source_name AS channel,
+                   CAST(
+                       julianday(sales_data.date) - julianday(:first_day) AS INTEGER
+                   ) AS day,
+                   SUM(sales_data.quantity_sold) AS quantity
+            FROM sales_data
+            JOIN data_source ON data_source.id = sales_data.source_id
+            WHERE sales_data.user_id = :user_id AND sales_data.date >= :first_day
+            GROUP BY sales_data.product_sku, data_source.source_name,
+                     sales_data.date
+        """
+        ),
+        db.session.connection(),
+        params={"user_id": user_id, "first_day": str(first_day)},
+    )
+    if daily.empty:
+        return None
+    categories = dict(
+        db.session.query(Product.product_sku, Product.category).filter_by(
+            user_id=user_id
         )
-        db.session.add(alert)
+    )
+
+    pairs = daily.groupby(["product_sku", "channel"])
+    codes = pairs.ngroup().to_numpy()
+    matrix = np.zeros((pairs.ngroups, days))
+    matrix[codes, daily["day"].to_numpy()] = daily["quantity"].to_numpy()
+
+    keys = pairs.size().index.to_frame(index=False)
+    keys.insert(
+        0,
+        "category",
+        keys["product_sku"].map(categories).fillna(UNCATEGORIZED),
+    )
+    keys = keys.sort_values(["category", "product_sku", "channel"])
+    return keys.reset_index(drop=True), matrix[keys.index], last_day
+
+
+def aggregation_matrix(keys):
+    """Sparse matrix summing the bottom-level series into each aggregate.
+
+    Returns ``(A, nodes)``. The rows of A are the total, then each category,
+    then each SKU, labelled by ``nodes``; its columns are the rows of
+    ``keys``, which must be sorted as load_channel_demand sorts them.
+    """
+    category_codes, categories = pd.factorize(keys["category"])
+    sku_codes, skus = pd.factorize(keys["product_sku"])
+    sku_categories = keys.drop_duplicates("product_sku")["category"].tolist()
+    count = len(keys)
+    rows = np.concatenate(
+        [
+            np.zeros(count, dtype=int),
+            1 + category_codes,
+            1 + len(categories) + sku_codes,
+        ]
+    )
+    A = sparse.csr_matrix(
+        (np.ones(3 * count), (rows, np.tile(np.arange(count), 3))),
+        shape=(1 + len(categories) + len(skus), count),
+    )
+    nodes = pd.DataFrame(
+        {
+            "level": ["total"] + ["category"] * len(categories) + ["sku"] * len(skus),
+            "category": [None, *categories, *sku_categories],
+            "product_sku": [None] * (1 + len(categories)) + list(skus),
+            "channel": None,
+        }
+    )
+    return A, nodes
+
+
+def holdout_variance(series, horizon, options):
+    """Mean squared error of forecasting each series' last ``horizon`` days
+    from the days before them."""
+    predicted, _, _ = baseline_forecast(series[:, :-horizon], horizon, **options)
+    variance = np.mean((predicted - series[:, -horizon:]) ** 2, axis=1)
+    # A series forecast perfectly would get infinite weight
+    return np.maximum(variance, variance[variance > 0].min(initial=1.0))
+
+
+def reconcile(A, base, method, history=None, variance=None):
+    """Bottom-level forecasts that make the base forecasts add up.
+
+    ``base`` holds the base forecasts of the aggregate nodes (the rows of
+    ``A``) followed by the bottom level. ``top_down`` needs the bottom-level
+    ``history`` and ``mint`` each node's base-forecast error ``variance``.
+    Every level is then ``A @ bottom`` over ``bottom``.
+    """
+    base_aggregate, base_bottom = base[: A.shape[0]], base[A.shape[0] :]
+    if method == "bottom_up":
+        return base_bottom
+    if method == "top_down":
+        # Split the total by each series' share of historical demand
+        shares = history.sum(axis=1) / max(history.sum(), 1)
+        return shares[:, None] * base_aggregate[0]
+
+    # MinT with a diagonal error covariance W (WLS):
+    #   bottom = base_b + W_b A' (W_a + A W_b A')^-1 (base_a - A base_b)
+    # W_a + A W_b A' only links a node to its ancestors and descendants, so
+    # it stays sparse and factorizes cheaply however many SKUs there are.
+    variance_aggregate, variance_bottom = (
+        variance[: A.shape[0]],
+        variance[A.shape[0] :],
+    )
+    gram = sparse.diags(variance_aggregate) + A @ sparse.diags(variance_bottom) @ A.T
+    correction = splu(gram.tocsc()).solve(base_aggregate - A @ base_bottom)
+    return base_bottom + variance_bottom[:, None] * (A.T @ correction)
+
+
+def run_hierarchy_forecast(user_id, method="mint", model="ses(0.2)", forecast_days=30):
+    """Forecast and reconcile every level of a user's product hierarchy.
+
+    ``model`` is a baseline MODEL_GRID model, fitted to each node's last
+    BASELINE_HISTORY_DAYS days. The result replaces the user's previous
+    HierarchyForecast run. Returns the ForecastRun, or None without sales.
+    """
+    loaded = load_channel_demand(user_id, BASELINE_HISTORY_DAYS)
+    if loaded is None:
+        return None
+    keys, bottom, last_day = loaded
+    A, nodes = aggregation_matrix(keys)
+    series = np.vstack([A @ bottom, bottom])
+    _, options = MODEL_GRID[model]
+    base, _, _ = baseline_forecast(series, forecast_days, **options)
+
+    variance = None
+    if method == "mint":
+        horizon = min(forecast_days, BASELINE_HISTORY_DAYS // 4)
+        variance = holdout_variance(series, horizon, options)
+    reconciled = reconcile(A, base, method, bottom, variance)
+    # MinT can push barely selling series below zero; clipping the bottom
+    # level before aggregating keeps the levels adding up
+    reconciled = np.maximum(reconciled, 0)
+    reconciled = np.vstack([A @ reconciled, reconciled])
+
+    run = ForecastRun(
+        user_id=user_id,
+        model_type=f"hierarchy:{method}",
+        forecast_days=forecast_days,
+        sku_count=int((nodes["level"] == "sku").sum()),
+    )
+    db.session.add(run)
+    db.session.flush()
+    save_hierarchy_forecasts(
+        user_id,
+        run.id,
+        pd.concat([nodes, keys.assign(level="channel")], ignore_index=True),
+        last_day,
+        base,
+        reconciled,
+    )
+    # Dropped only once the new run is saved, so there is always one to read
+    HierarchyForecast.query.filter(
+        HierarchyForecast.user_id == user_id, HierarchyForecast.run_id != run.id
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return run
+
+
+def save_hierarchy_forecasts(user_id, run_id, nodes, last_day, base, reconciled):
+    """Insert node x day forecasts, committing every FORECAST_COMMIT_ROWS rows."""
+    horizon = base.shape[1]
+    nodes = nodes[["level", "category", "product_sku", "channel"]].astype(object)
+    nodes = nodes.where(nodes.notna(), None)
+    dates = (last_day + np.arange(1, horizon + 1)).astype(str)
+    frame = pd.DataFrame(
+        {
+            "user_id": user_id,
+            "run_id": run_id,
+            **{
+                column: np.repeat(nodes[column].to_numpy(), horizon)
+                for column in nodes.columns
+            },
+            "forecast_date": np.tile(dates, len(nodes)),
+            "base_demand": base.ravel(),
+            "predicted_demand": reconciled.ravel(),
+        },
+        # Plain Python values insert faster than pandas' string arrays
+        dtype=object,
+    )
+    chunk_rows = app.config["FORECAST_COMMIT_ROWS"]
+    for start in range(0, len(frame), chunk_rows):
+        bulk_insert(HierarchyForecast, frame.iloc[start : start + chunk_rows])
         db.session.commit()
 
 
+@app.cli.command("forecast-all")
+@click.option("--user", "username", required=True, help="Account to forecast for")
+@click.option(
+    "--model",
+    "model_type",
+    type=click.Choice(["auto", *MODEL_TYPES, *MODEL_GRID]),
+    default="arima",
+    show_default=True,
+)
+@click.option("--days", "forecast_days", default=30, show_default=True)
+@click.option("--workers", type=int, help="Worker processes  [default: one per core]")
+def forecast_all_command(username, model_type, forecast_days, workers):
+    """Forecast every SKU of a user in one batch."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"No such user: {username}")
+
+    started = time.perf_counter()
+
+    def report(done, total):
+        # Roughly twenty progress lines however large the catalogue
+        if done == total or done % max(1, total // 20) == 0:
+            click.echo(f"  {done}/{total} SKUs ({time.perf_counter() - started:.1f}s)")
+
+    count = run_batch_forecast(user.id, model_type, forecast_days, workers, report)
+    elapsed = time.perf_counter() - started
+    click.echo(f"Forecast {count} SKUs in {elapsed:.1f}s")
+
+
+@app.cli.command("rebuild-demand")
+@click.option("--user", "username", help="Only this account  [default: all]")
+def rebuild_demand_command(username):
+    """Rebuild the daily demand store and product catalog from SalesData."""
+    users = User.query.filter_by(username=username) if username else User.query
+    for user in users:
+        rebuild_demand_series(user.id)
+        db.session.commit()
+        click.echo(f"Rebuilt daily demand for {user.username}")
+
+
+@app.cli.command("forecast-hierarchy")
+@click.option("--user", "username", required=True, help="Account to forecast for")
+@click.option(
+    "--method",
+    type=click.Choice(RECONCILIATION_METHODS),
+    default="mint",
+    show_default=True,
+)
+@click.option(
+    "--model",
+    type=click.Choice(BASELINE_MODELS),
+    default="ses(0.2)",
+    show_default=True,
+)
+@click.option("--days", "forecast_days", default=30, show_default=True)
+def forecast_hierarchy_command(username, method, model, forecast_days):
+    """Forecast the total, categories, SKUs and SKU x channel so they agree."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"No such user: {username}")
+
+    started = time.perf_counter()
+    run = run_hierarchy_forecast(user.id, method, model, forecast_days)
+    if run is None:
+        raise click.ClickException(f"No sales data for {username}")
+    elapsed = time.perf_counter() - started
+    click.echo(f"Reconciled forecasts for {run.sku_count} SKUs in {elapsed:.1f}s")
+
+
+@app.cli.command("upgrade-db")
+def upgrade_db_command():
+    """Create missing tables and apply pending schema migrations."""
+    applied = upgrade_database()
+    click.echo(f"Applied {', '.join(applied)}" if applied else "Already up to date")
+
+
 @app.route("/forecast_results/<product_sku>")
 @login_required
 def forecast_results(product_sku):
     # Get forecast data
-    forecasts = (
-        Forecast.query.filter_by(user_id=current_user.id, product_sku=product_sku)
-        .order_by(Forecast.forecast_date)
-        .all()
-    )
+    forecasts = latest_forecasts(current_user.id, product_sku).all()
 
-    # Get historical data
-    historical = (
-        db.session.query(SalesData)
-        .filter_by(user_id=current_user.id, product_sku=product_sku)
-        .order_by(SalesData.date.desc())
-        .limit(30)
-        .all()
-    )
+    # Get the last 30 days of daily demand
+    series = DemandSeries.query.get((current_user.id, product_sku))
 
     # Create plot
     fig = go.Figure()
 
     # Historical data
-    if historical:
-        hist_dates = [record.date for record in reversed(historical)]
-        hist_values = [record.quantity_sold for record in reversed(historical)]
+    if series is not None:
+        historical = series.daily_quantities().iloc[-30:]
 
         fig.add_trace(
             go.Scatter(
-                x=hist_dates,
-                y=hist_values,
+                x=historical.index,
+                y=historical.to_numpy(),
                 mode="lines+markers",
                 name="Historical Sales",
                 line=dict(color="blue"),
@@ -604,9 +2524,9 @@ def mark_alert_read(alert_id):
 @login_required
 def scenario_planning():
     products = (
-        db.session.query(SalesData.product_sku)
+        db.session.query(Product.product_sku)
         .filter_by(user_id=current_user.id)
-        .distinct()
+        .order_by(Product.product_sku)
         .all()
     )
     return render_template("scenario_planning.html", products=[p[0] for p in products])
@@ -620,11 +2540,7 @@ def run_scenario():
     adjustment_factor = float(request.form.get("adjustment_factor", 1.0))
 
     # Get base forecast
-    base_forecasts = (
-        Forecast.query.filter_by(user_id=current_user.id, product_sku=product_sku)
-        .order_by(Forecast.forecast_date)
-        .all()
-    )
+    base_forecasts = latest_forecasts(current_user.id, product_sku).all()
 
     if not base_forecasts:
         flash("Please generate a base forecast first")
@@ -654,38 +2570,177 @@ def run_scenario():
 @app.route("/export_forecast/<product_sku>")
 @login_required
 def export_forecast(product_sku):
-    forecasts = (
-        Forecast.query.filter_by(user_id=current_user.id, product_sku=product_sku)
-        .order_by(Forecast.forecast_date)
-        .all()
+    return export_response(product_sku)
+
+
+@app.route("/export_forecasts")
+@login_required
+def export_all_forecasts():
+    return export_response()
+
+
+def export_response(product_sku=None):
+    """Stream the latest forecast of one SKU, or of every SKU, as a download.
+
+    The format comes from ``?format=`` (csv, parquet or xlsx). Rows go from
+    the database cursor to the response in EXPORT_CHUNK_ROWS chunks, so
+    nothing is written to disk and memory does not grow with the export.
+    """
+    export_format = request.args.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        flash(f"Unknown export format: {export_format}")
+        return redirect(url_for("dashboard"))
+    writer, mimetype, package = EXPORT_FORMATS[export_format]
+    if package and importlib.util.find_spec(package) is None:
+        flash(f"{export_format.upper()} export needs the {package} package")
+        return redirect(url_for("dashboard"))
+    if export_format == "xlsx" and (
+        export_query(current_user.id, product_sku).count() >= XLSX_MAX_ROWS
+    ):
+        flash("Too many forecast rows for one Excel sheet; export CSV instead")
+        return redirect(url_for("dashboard"))
+
+    chunks = export_chunks(export_query(current_user.id, product_sku))
+    name = f"forecast_{product_sku}" if product_sku else "forecasts"
+    filename = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(writer(chunks)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
-    # Create DataFrame
-    data = []
-    for f in forecasts:
-        data.append(
-            {
-                "Product SKU": f.product_sku,
-                "Forecast Date": f.forecast_date,
-                "Predicted Demand": f.predicted_demand,
-                "Confidence Lower": f.confidence_lower,
-                "Confidence Upper": f.confidence_upper,
-                "Model Used": f.model_used,
-                "Generated At": f.created_at,
-            }
+
+EXPORT_COLUMNS = [
+    "Product SKU",
+    "Forecast Date",
+    "Predicted Demand",
+    "Confidence Lower",
+    "Confidence Upper",
+    "Model Used",
+    "Generated At",
+]
+# Header row included
+XLSX_MAX_ROWS = 1_048_576
+
+
+def export_query(user_id, product_sku=None):
+    """Rows of the latest forecast run of each SKU, in EXPORT_COLUMNS order."""
+    latest = db.session.query(
+        Forecast.product_sku, db.func.max(Forecast.run_id).label("run_id")
+    ).filter(Forecast.user_id == user_id)
+    if product_sku is not None:
+        latest = latest.filter(Forecast.product_sku == product_sku)
+    latest = latest.group_by(Forecast.product_sku).subquery()
+    return (
+        db.session.query(
+            Forecast.product_sku,
+            Forecast.forecast_date,
+            Forecast.predicted_demand,
+            Forecast.confidence_lower,
+            Forecast.confidence_upper,
+            Forecast.model_used,
+            Forecast.created_at,
+        )
+        .join(
+            latest,
+            db.and_(
+                Forecast.product_sku == latest.c.product_sku,
+                Forecast.run_id == latest.c.run_id,
+            ),
         )
+        .filter(Forecast.user_id == user_id)
+        .order_by(Forecast.product_sku, Forecast.forecast_date)
+    )
+
+
+def export_chunks(query):
+    """Lists of up to EXPORT_CHUNK_ROWS rows, read off the cursor as needed."""
+    chunk_rows = app.config["EXPORT_CHUNK_ROWS"]
+    rows = iter(query.yield_per(chunk_rows))
+    return iter(lambda: list(islice(rows, chunk_rows)), [])
+
+
+def csv_export(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for rows in chain([[EXPORT_COLUMNS]], chunks):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def parquet_export(chunks):
+    """One Parquet row group per chunk, sent as soon as it is written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("Product SKU", pa.string()),
+            ("Forecast Date", pa.date32()),
+            ("Predicted Demand", pa.float64()),
+            ("Confidence Lower", pa.float64()),
+            ("Confidence Upper", pa.float64()),
+            ("Model Used", pa.string()),
+            ("Generated At", pa.timestamp("us")),
+        ]
+    )
+    buffer = io.BytesIO()
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for rows in chunks:
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(column, type=field.type)
+                        for column, field in zip(zip(*rows), schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield drain()
+    yield drain()
+
+
+def xlsx_export(chunks):
+    """A workbook is a zip archive, so it is sent once complete.
+
+    openpyxl's write-only mode keeps the rows in a temporary file that it
+    removes again, rather than in memory.
+    """
+    from openpyxl import Workbook
 
-    df = pd.DataFrame(data)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Forecasts")
+    sheet.append(EXPORT_COLUMNS)
+    for rows in chunks:
+        for row in rows:
+            sheet.append(list(row))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    yield buffer.getvalue()
 
-    # Save to CSV
-    filename = f"forecast_{product_sku}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    df.to_csv(filepath, index=False)
 
-    return send_file(filepath, as_attachment=True, download_name=filename)
+# Format: (writer, mimetype, optional package it needs)
+EXPORT_FORMATS = {
+    "csv": (csv_export, "text/csv", None),
+    "parquet": (parquet_export, "application/vnd.apache.parquet", "pyarrow"),
+    "xlsx": (
+        xlsx_export,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "openpyxl",
+    ),
+}
 
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        upgrade_database()
     app.run(debug=True)
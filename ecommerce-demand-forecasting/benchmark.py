@@ -0,0 +1,897 @@
+"""Benchmarks for the demand forecasting app.
+
+Each benchmark runs against a scratch SQLite database in a temporary
+directory, so the app's own forecasting.db is never touched.
+
+    python benchmark.py ingest                        # 100k, 1M and 10M rows
+    python benchmark.py ingest --rows 100000 --legacy-rows 20000
+    python benchmark.py batch --skus 500 --workers 1 2 4 8
+    python benchmark.py series --skus 1000 --history-days 730
+    python benchmark.py cache --skus 200 --new-days 7
+    python benchmark.py select --skus 50 --grid-sizes 1 3 5 9 --workers 4
+    python benchmark.py baselines --skus 100000
+    python benchmark.py save --skus 20000 --legacy-skus 500
+    python benchmark.py export --skus 34000 --format csv
+    python benchmark.py pages --rows 100000 1000000
+    python benchmark.py plans --rows 100000 1000000   # exits 1 on a table scan
+    python benchmark.py hierarchy --skus 5000 --channels 3
+    python benchmark.py simulate --skus 10000 --paths 1000 --days 90
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+WORKDIR = tempfile.mkdtemp(prefix="forecast-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'benchmark.db')}"
+)
+os.chdir(WORKDIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (  # noqa: E402
+    app,
+    db,
+    baseline_forecast,
+    bulk_insert,
+    export_query,
+    generate_reorder_alerts,
+    ingest_csv,
+    latest_forecasts,
+    load_daily_demand,
+    process_sales_data,
+    run_hierarchy_forecast,
+    simulate_inventory,
+    record_forecasts,
+    run_batch_forecast,
+    update_demand_series,
+    upgrade_database,
+    Alert,
+    BacktestResult,
+    BASELINE_HISTORY_DAYS,
+    DataSource,
+    HierarchyForecast,
+    Forecast,
+    ForecastCache,
+    ForecastRun,
+    InventoryData,
+    MODEL_GRID,
+    RECONCILIATION_METHODS,
+    SalesData,
+    User,
+)
+
+
+def bench_user():
+    user = User.query.filter_by(username="benchmark").first()
+    if user is None:
+        user = User(username="benchmark", email="bench@example.com", password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+    return user
+
+
+def write_sales_csv(path, rows, skus=5000, chunk=1_000_000):
+    """Write a synthetic sales CSV without holding it all in memory."""
+    rng = np.random.default_rng(0)
+    names = np.array([f"SKU{i:06d}" for i in range(skus)])
+    start = np.datetime64("2023-01-01")
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        quantity = rng.poisson(5, n)
+        pd.DataFrame(
+            {
+                "date": (start + rng.integers(0, 730, n)).astype(str),
+                "product_sku": names[rng.integers(0, skus, n)],
+                "product_name": "Household item",
+                "quantity_sold": quantity,
+                "revenue": np.round(quantity * 9.99, 2),
+                "cost": np.round(quantity * 6.0, 2),
+            }
+        ).to_csv(path, mode="a" if offset else "w", header=not offset, index=False)
+
+
+def seed_daily_sales(user_id, skus, days, end=None):
+    """One sales row per SKU per day with weekly seasonality and noise.
+
+    The days run up to ``end`` (default today).
+    """
+    rng = np.random.default_rng(1)
+    source = DataSource(user_id=user_id, source_name="Shopify", filename="seed.csv")
+    db.session.add(source)
+    db.session.flush()
+    if end is None:
+        end = pd.Timestamp.today().normalize()
+    dates = pd.date_range(end=end, periods=days)
+    level = rng.uniform(5, 50, skus)
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * dates.dayofweek.to_numpy() / 7)
+    demand = rng.poisson(np.outer(level, weekly))
+    daily = process_sales_data(
+        pd.DataFrame(
+            {
+                "date": np.tile(dates.strftime("%Y-%m-%d"), skus),
+                "product_sku": np.repeat([f"SKU{i:06d}" for i in range(skus)], days),
+                "quantity_sold": demand.ravel(),
+            }
+        ),
+        source.id,
+        user_id,
+    )
+    update_demand_series(user_id, daily)
+    db.session.commit()
+
+
+def legacy_ingest(df, source_id, user_id):
+    """The previous row-at-a-time ORM ingest, kept for comparison."""
+    for _, row in df.iterrows():
+        db.session.add(
+            SalesData(
+                user_id=user_id,
+                source_id=source_id,
+                date=pd.to_datetime(row["date"]).date(),
+                product_sku=row["product_sku"],
+                product_name=row.get("product_name", ""),
+                quantity_sold=int(row["quantity_sold"]),
+                revenue=float(row.get("revenue", 0)),
+                cost=float(row.get("cost", 0)),
+            )
+        )
+
+
+def bench_ingest(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+
+        if args.legacy_rows:
+            path = os.path.join(WORKDIR, "legacy.csv")
+            write_sales_csv(path, args.legacy_rows)
+            started = time.perf_counter()
+            df = pd.read_csv(path)
+            source = DataSource(
+                user_id=user_id, source_name="Amazon", filename="legacy.csv"
+            )
+            db.session.add(source)
+            db.session.flush()
+            legacy_ingest(df, source.id, user_id)
+            db.session.commit()
+            elapsed = time.perf_counter() - started
+            print(
+                f"legacy     rows={args.legacy_rows:<10,} seconds={elapsed:<8.2f} "
+                f"rows/s={args.legacy_rows / elapsed:,.0f}"
+            )
+            SalesData.query.delete()
+            db.session.commit()
+
+        for rows in args.rows:
+            path = os.path.join(WORKDIR, f"sales_{rows}.csv")
+            write_sales_csv(path, rows)
+            started = time.perf_counter()
+            ingest_csv(path, user_id, "Amazon", "sales", os.path.basename(path))
+            db.session.commit()
+            elapsed = time.perf_counter() - started
+            print(
+                f"vectorized rows={rows:<10,} seconds={elapsed:<8.2f} "
+                f"rows/s={rows / elapsed:,.0f}"
+            )
+            os.remove(path)
+            SalesData.query.delete()
+            db.session.commit()
+
+
+def bench_batch(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        seed_daily_sales(user_id, args.skus, args.history_days)
+        print(
+            f"skus={args.skus} history_days={args.history_days} "
+            f"model={args.model} cores={os.cpu_count()}"
+        )
+        for workers in args.workers:
+            # Every run fits from scratch
+            ForecastCache.query.delete()
+            db.session.commit()
+            started = time.perf_counter()
+            count = run_batch_forecast(user_id, args.model, 30, workers)
+            elapsed = time.perf_counter() - started
+            print(
+                f"workers={workers:<3} seconds={elapsed:<8.2f} "
+                f"skus/minute={count / elapsed * 60:,.0f}"
+            )
+
+
+def orm_daily_demand(user_id, product_sku):
+    """The previous per-SKU read: ORM rows, a DataFrame and a resample."""
+    sales_data = (
+        db.session.query(SalesData)
+        .filter_by(user_id=user_id, product_sku=product_sku)
+        .order_by(SalesData.date)
+        .all()
+    )
+    df = pd.DataFrame(
+        [
+            {"date": record.date, "quantity": record.quantity_sold}
+            for record in sales_data
+        ]
+    )
+    df["date"] = pd.to_datetime(df["date"])
+    return df.set_index("date").resample("D").sum().fillna(0)["quantity"]
+
+
+def bench_series(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        seed_daily_sales(user_id, args.skus, args.history_days)
+        print(f"skus={args.skus} history_days={args.history_days}")
+
+        started = time.perf_counter()
+        series = load_daily_demand(user_id)
+        store = time.perf_counter() - started
+
+        sample = list(series)[: args.orm_skus]
+        started = time.perf_counter()
+        for product_sku in sample:
+            orm_daily_demand(user_id, product_sku)
+        orm = (time.perf_counter() - started) / len(sample) * len(series)
+
+        print(f"orm path   seconds={orm:<8.2f} (extrapolated from {len(sample)} SKUs)")
+        print(f"store      seconds={store:<8.2f} speedup={orm / store:,.0f}x")
+
+
+def bench_cache(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        today = pd.Timestamp.today().normalize()
+        seed_daily_sales(
+            user_id,
+            args.skus,
+            args.history_days,
+            end=today - pd.Timedelta(days=args.new_days),
+        )
+        print(
+            f"skus={args.skus} history_days={args.history_days} "
+            f"new_days={args.new_days} model={args.model}"
+        )
+
+        def timed(label):
+            started = time.perf_counter()
+            count = run_batch_forecast(user_id, args.model, 30, args.workers)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:<10} seconds={elapsed:<8.2f} "
+                f"skus/minute={count / elapsed * 60:,.0f}"
+            )
+            return elapsed
+
+        timed("cold")
+        timed("cached")
+        seed_daily_sales(user_id, args.skus, args.new_days, end=today)
+        warm = timed("warm")
+        ForecastCache.query.delete()
+        db.session.commit()
+        cold = timed("refit")
+        print(f"warm start speedup={cold / warm:.2f}x")
+
+
+def bench_select(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        seed_daily_sales(user_id, args.skus, args.history_days)
+        print(
+            f"skus={args.skus} history_days={args.history_days} "
+            f"workers={args.workers} cores={os.cpu_count()}"
+        )
+        for size in args.grid_sizes:
+            candidates = list(MODEL_GRID)[:size]
+            ForecastCache.query.delete()
+            db.session.commit()
+            started = time.perf_counter()
+            count = run_batch_forecast(
+                user_id, "auto", 30, args.workers, candidates=candidates
+            )
+            elapsed = time.perf_counter() - started
+            chosen = (
+                db.session.query(BacktestResult.model_used, db.func.count())
+                .filter_by(user_id=user_id, selected=True)
+                .group_by(BacktestResult.model_used)
+                .all()
+            )
+            print(
+                f"grid={size:<3} seconds={elapsed:<8.2f} "
+                f"skus/minute={count / elapsed * 60:,.0f} "
+                f"chosen={dict(chosen)}"
+            )
+
+
+def bench_baselines(args):
+    rng = np.random.default_rng(2)
+    # Slow movers: most SKUs sell on only a few days a week
+    rate = rng.gamma(0.5, 1.0, (args.skus, 1))
+    matrix = rng.poisson(rate, (args.skus, BASELINE_HISTORY_DAYS)).astype(float)
+    print(
+        f"skus={args.skus} history_days={BASELINE_HISTORY_DAYS} "
+        f"horizon={args.days} zero_days={np.mean(matrix == 0):.0%}"
+    )
+    for model, (family, options) in MODEL_GRID.items():
+        if family != "baseline":
+            continue
+        started = time.perf_counter()
+        baseline_forecast(matrix, args.days, **options)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{model:<20} seconds={elapsed:<8.3f} "
+            f"forecasts/s={args.skus / elapsed:,.0f}"
+        )
+
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        seed_daily_sales(user_id, args.batch_skus, args.history_days)
+        for model in [args.model, "arima"]:
+            ForecastCache.query.delete()
+            db.session.commit()
+            started = time.perf_counter()
+            count = run_batch_forecast(user_id, model, args.days, 1)
+            elapsed = time.perf_counter() - started
+            print(
+                f"forecast-all {model:<20} skus={count} seconds={elapsed:<8.2f} "
+                f"forecasts/s={count / elapsed:,.0f}"
+            )
+
+
+def legacy_save(user_id, product_sku, forecast_data, model_type):
+    """The previous per-SKU save: delete, one ORM object per day, commit."""
+    Forecast.query.filter_by(user_id=user_id, product_sku=product_sku).delete()
+    for data_point in forecast_data:
+        db.session.add(
+            Forecast(
+                user_id=user_id,
+                product_sku=product_sku,
+                run_id=0,
+                forecast_date=data_point["date"],
+                predicted_demand=data_point["predicted_demand"],
+                confidence_lower=data_point["confidence_lower"],
+                confidence_upper=data_point["confidence_upper"],
+                model_used=model_type,
+            )
+        )
+    db.session.commit()
+
+
+def bench_save(args):
+    start = datetime(2025, 1, 1)
+    forecast_data = [
+        {
+            "date": start + timedelta(days=i),
+            "predicted_demand": 10.0,
+            "confidence_lower": 8.0,
+            "confidence_upper": 12.0,
+        }
+        for i in range(args.days)
+    ]
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        print(f"days={args.days} commit_rows={app.config['FORECAST_COMMIT_ROWS']}")
+
+        if args.legacy_skus:
+            started = time.perf_counter()
+            for i in range(args.legacy_skus):
+                legacy_save(user_id, f"SKU{i:06d}", forecast_data, "arima")
+            elapsed = time.perf_counter() - started
+            rows = args.legacy_skus * args.days
+            print(
+                f"legacy     skus={args.legacy_skus:<8,} seconds={elapsed:<8.2f} "
+                f"rows/s={rows / elapsed:,.0f}"
+            )
+            Forecast.query.delete()
+            db.session.commit()
+
+        skus = [f"SKU{i:06d}" for i in range(args.skus)]
+        for label in ["first run", "second run"]:
+            started = time.perf_counter()
+            record_forecasts(
+                user_id,
+                "arima",
+                args.days,
+                dict.fromkeys(skus, forecast_data),
+                dict.fromkeys(skus, "arima(1,1,1)"),
+            )
+            elapsed = time.perf_counter() - started
+            rows = args.skus * args.days
+            print(
+                f"{label:<10} skus={args.skus:<8,} seconds={elapsed:<8.2f} "
+                f"rows/s={rows / elapsed:,.0f}"
+            )
+        print(
+            f"stored rows={Forecast.query.count():,} runs={ForecastRun.query.count()}"
+        )
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_export(args):
+    start = datetime(2025, 1, 1)
+    forecast_data = [
+        {
+            "date": start + timedelta(days=i),
+            "predicted_demand": 10.0,
+            "confidence_lower": 8.0,
+            "confidence_upper": 12.0,
+        }
+        for i in range(args.days)
+    ]
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+        skus = [f"SKU{i:06d}" for i in range(args.skus)]
+        record_forecasts(
+            user_id,
+            "arima",
+            args.days,
+            dict.fromkeys(skus, forecast_data),
+            dict.fromkeys(skus, "arima(1,1,1)"),
+        )
+        rows = args.skus * args.days
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+    before = peak_rss_mb()
+    started = time.perf_counter()
+    response = client.get(f"/export_forecasts?format={args.format}", buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    elapsed = time.perf_counter() - started
+    print(
+        f"format={args.format} rows={rows:,} bytes={size:,} "
+        f"seconds={elapsed:.2f} rows/s={rows / elapsed:,.0f} "
+        f"peak_rss_growth_mb={peak_rss_mb() - before:.0f}"
+    )
+
+
+def bench_pages(args):
+    with app.app_context():
+        db.create_all()
+        user_id = bench_user().id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+
+    loaded = 0
+    for rows in args.rows:
+        path = os.path.join(WORKDIR, "pages.csv")
+        write_sales_csv(path, rows - loaded)
+        with app.app_context():
+            ingest_csv(path, user_id, "Amazon", "sales", "pages.csv")
+            db.session.commit()
+        os.remove(path)
+        loaded = rows
+
+        timings = []
+        for page in ["/dashboard", "/forecast", "/scenario_planning"]:
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                client.get(page)
+            elapsed = (time.perf_counter() - started) / args.iterations
+            timings.append(f"{page}={elapsed * 1000:.1f}ms")
+        with app.app_context():
+            # The DISTINCT scan the pages used to run on every visit
+            started = time.perf_counter()
+            db.session.query(SalesData.product_sku).filter_by(
+                user_id=user_id
+            ).distinct().count()
+            scan = time.perf_counter() - started
+        print(
+            f"sales_rows={rows:<10,} {' '.join(timings)} "
+            f"old_distinct_scan={scan * 1000:.1f}ms"
+        )
+
+
+def access_path_queries(user_id, product_sku):
+    """The per-user lookups the pages run, by name."""
+    return {
+        "sales history": SalesData.query.filter_by(
+            user_id=user_id, product_sku=product_sku
+        ).order_by(SalesData.date),
+        "latest stock": InventoryData.query.filter_by(
+            user_id=user_id, product_sku=product_sku
+        )
+        .order_by(InventoryData.date.desc())
+        .limit(1),
+        "latest forecast": latest_forecasts(user_id, product_sku),
+        "recent forecasts": Forecast.query.filter_by(user_id=user_id)
+        .order_by(Forecast.created_at.desc())
+        .limit(10),
+        "unread alerts": Alert.query.filter_by(user_id=user_id, is_read=False)
+        .order_by(Alert.created_at.desc())
+        .limit(5),
+        "alerts page": Alert.query.filter_by(user_id=user_id).order_by(
+            Alert.created_at.desc()
+        ),
+        "export": export_query(user_id),
+    }
+
+
+def query_plan(query):
+    sql = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    return [
+        row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    ]
+
+
+def bench_plans(args):
+    """Time the access paths with and without indexes as history grows.
+
+    Fails if any of them still scans a whole table with the indexes in place.
+    """
+    indexed = (SalesData, InventoryData, Forecast, Alert)
+    with app.app_context():
+        upgrade_database()
+        user_id = bench_user().id
+        # Another account's rows, which the indexes should let queries skip
+        other = User(username="other", email="other@example.com", password_hash="-")
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+
+    rng = np.random.default_rng(2)
+    loaded = 0
+    for rows in args.rows:
+        path = os.path.join(WORKDIR, "plans.csv")
+        write_sales_csv(path, rows - loaded)
+        added = rows - loaded
+        with app.app_context():
+            for owner in (user_id, other_id):
+                source_id = ingest_csv(path, owner, "Amazon", "sales", "plans.csv").id
+            skus = np.array([f"SKU{i:06d}" for i in range(5000)])
+            dates = np.datetime64("2023-01-01") + rng.integers(0, 730, added // 10)
+            created = np.datetime64("2025-01-01T00:00:00") + np.arange(added // 20)
+            for owner in (user_id, other_id):
+                bulk_insert(
+                    InventoryData,
+                    pd.DataFrame(
+                        {
+                            "user_id": owner,
+                            "source_id": source_id,
+                            "date": dates.astype(str),
+                            "product_sku": skus[rng.integers(0, 5000, len(dates))],
+                            "current_stock": rng.integers(0, 500, len(dates)),
+                        }
+                    ),
+                )
+                bulk_insert(
+                    Alert,
+                    pd.DataFrame(
+                        {
+                            "user_id": owner,
+                            "product_sku": skus[rng.integers(0, 5000, len(created))],
+                            "alert_type": "reorder",
+                            "message": "Reorder needed",
+                            "is_read": rng.random(len(created)) < 0.9,
+                            "created_at": created.astype(str),
+                        }
+                    ),
+                )
+            start = datetime(2025, 1, 1)
+            forecast_data = [
+                {
+                    "date": start + timedelta(days=i),
+                    "predicted_demand": 10.0,
+                    "confidence_lower": 8.0,
+                    "confidence_upper": 12.0,
+                }
+                for i in range(30)
+            ]
+            for owner in (user_id, other_id):
+                record_forecasts(
+                    owner,
+                    "arima",
+                    30,
+                    dict.fromkeys(skus[: added // 200], forecast_data),
+                    dict.fromkeys(skus[: added // 200], "arima(1,1,1)"),
+                )
+            db.session.commit()
+        os.remove(path)
+        loaded = rows
+
+        with app.app_context():
+            queries = access_path_queries(user_id, "SKU000042")
+            timings = {}
+            for label in ("indexed", "unindexed"):
+                for name, query in queries.items():
+                    started = time.perf_counter()
+                    for _ in range(args.iterations):
+                        query.all()
+                    elapsed = (time.perf_counter() - started) / args.iterations
+                    timings.setdefault(name, []).append(elapsed)
+                if label == "indexed":
+                    plans = {name: query_plan(q) for name, q in queries.items()}
+                    for model in indexed:
+                        for index in model.__table__.indexes:
+                            index.drop(db.session.connection())
+            for model in indexed:
+                for index in model.__table__.indexes:
+                    index.create(db.session.connection())
+            db.session.commit()
+
+        print(f"sales_rows={rows:,}")
+        for name, (fast, slow) in timings.items():
+            print(
+                f"  {name:<17} indexed={fast * 1000:7.2f}ms "
+                f"unindexed={slow * 1000:7.2f}ms"
+            )
+
+    tables = {model.__tablename__ for model in indexed}
+    scans = []
+    for name, plan in plans.items():
+        print(f"{name}:")
+        for detail in plan:
+            print(f"  {detail}")
+            words = detail.split()
+            if words[0] == "SCAN" and words[1] in tables:
+                scans.append(f"{name}: {detail}")
+    if scans:
+        print("Full table scans:", *scans, sep="\n  ")
+        sys.exit(1)
+
+
+def bench_hierarchy(args):
+    channels = ["Amazon", "FBA", "Walmart", "Shopify", "Internal"][: args.channels]
+    rng = np.random.default_rng(3)
+    with app.app_context():
+        upgrade_database()
+        user_id = bench_user().id
+        dates = pd.date_range(end="2025-06-30", periods=args.history_days)
+        skus = np.array([f"SKU{i:06d}" for i in range(args.skus)])
+        categories = np.array(
+            [f"Category {i % args.categories}" for i in range(args.skus)]
+        )
+        level = rng.uniform(0.5, 20, args.skus)
+        for channel in channels:
+            # Each SKU sells on about two thirds of the channels
+            listed = rng.random(args.skus) < 2 / 3
+            demand = rng.poisson(np.outer(level[listed], np.ones(len(dates))))
+            path = os.path.join(WORKDIR, "hierarchy.csv")
+            pd.DataFrame(
+                {
+                    "date": np.tile(dates.strftime("%Y-%m-%d"), listed.sum()),
+                    "product_sku": np.repeat(skus[listed], len(dates)),
+                    "category": np.repeat(categories[listed], len(dates)),
+                    "quantity_sold": demand.ravel(),
+                }
+            ).to_csv(path, index=False)
+            ingest_csv(path, user_id, channel, "sales", "hierarchy.csv")
+            db.session.commit()
+            os.remove(path)
+        rows = SalesData.query.count()
+
+        for method in RECONCILIATION_METHODS:
+            started = time.perf_counter()
+            run_hierarchy_forecast(user_id, method, args.model, args.days)
+            elapsed = time.perf_counter() - started
+            nodes = HierarchyForecast.query.count() // args.days
+            print(
+                f"method={method:<10} sales_rows={rows:,} nodes={nodes:,} "
+                f"seconds={elapsed:.2f}"
+            )
+
+
+def bench_simulate(args):
+    app.config["SIMULATION_PATHS"] = args.paths
+    rng = np.random.default_rng(4)
+    skus = [f"SKU{i:06d}" for i in range(args.skus)]
+    level = rng.uniform(0.5, 50, args.skus)
+    predicted = np.repeat(level[:, None], args.days, axis=1)
+    upper = predicted + 1.96 * np.sqrt(predicted)
+    stock = np.round(level * rng.uniform(0, 60, args.skus))
+
+    started = time.perf_counter()
+    plan = simulate_inventory(
+        stock,
+        predicted,
+        upper,
+        np.full(args.skus, 7.0),
+        np.full(args.skus, np.nan),
+        np.full(args.skus, np.nan),
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"simulate skus={args.skus:,} paths={args.paths:,} days={args.days} "
+        f"seconds={elapsed:.2f} "
+        f"mean_stockout_probability={plan['stockout_probability'].mean():.3f}"
+    )
+
+    start = datetime(2025, 1, 1)
+    forecasts = {
+        product_sku: [
+            {
+                "date": start + timedelta(days=day),
+                "predicted_demand": predicted[row, day],
+                "confidence_lower": max(2 * predicted[row, day] - upper[row, day], 0),
+                "confidence_upper": upper[row, day],
+            }
+            for day in range(args.days)
+        ]
+        for row, product_sku in enumerate(skus)
+    }
+    with app.app_context():
+        upgrade_database()
+        user_id = bench_user().id
+        source = DataSource(user_id=user_id, source_name="Internal", filename="-")
+        db.session.add(source)
+        db.session.flush()
+        bulk_insert(
+            InventoryData,
+            pd.DataFrame(
+                {
+                    "user_id": user_id,
+                    "source_id": source.id,
+                    "date": "2024-12-31",
+                    "product_sku": skus,
+                    "current_stock": stock,
+                    "reorder_point": np.round(level * 10),
+                    "max_stock": np.round(level * 90),
+                }
+            ),
+        )
+        db.session.commit()
+        started = time.perf_counter()
+        generate_reorder_alerts(user_id, forecasts)
+        db.session.commit()
+        elapsed = time.perf_counter() - started
+        counts = dict(
+            db.session.query(Alert.alert_type, db.func.count()).group_by(
+                Alert.alert_type
+            )
+        )
+    print(f"alerts seconds={elapsed:.2f} {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="CSV upload throughput")
+    ingest.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[100_000, 1_000_000, 10_000_000],
+    )
+    ingest.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=20_000,
+        help="rows for the old per-row ORM path (0 to skip)",
+    )
+    ingest.set_defaults(run=bench_ingest)
+
+    batch = commands.add_parser("batch", help="catalogue-wide forecasting")
+    batch.add_argument("--skus", type=int, default=500)
+    batch.add_argument("--history-days", type=int, default=365)
+    batch.add_argument(
+        "--model", choices=["arima", "exponential_smoothing"], default="arima"
+    )
+    batch.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    batch.set_defaults(run=bench_batch)
+
+    series = commands.add_parser("series", help="reading daily demand for all SKUs")
+    series.add_argument("--skus", type=int, default=1000)
+    series.add_argument("--history-days", type=int, default=730)
+    series.add_argument(
+        "--orm-skus", type=int, default=100, help="SKUs timed on the old ORM path"
+    )
+    series.set_defaults(run=bench_series)
+
+    cache = commands.add_parser("cache", help="forecast cache hits and warm starts")
+    cache.add_argument("--skus", type=int, default=200)
+    cache.add_argument("--history-days", type=int, default=365)
+    cache.add_argument(
+        "--new-days", type=int, default=7, help="days of sales added before refitting"
+    )
+    cache.add_argument(
+        "--model", choices=["arima", "exponential_smoothing"], default="arima"
+    )
+    cache.add_argument("--workers", type=int, default=1)
+    cache.set_defaults(run=bench_cache)
+
+    select = commands.add_parser("select", help="auto model selection by grid size")
+    select.add_argument("--skus", type=int, default=50)
+    select.add_argument("--history-days", type=int, default=365)
+    select.add_argument(
+        "--grid-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 3, 5, len(MODEL_GRID)],
+        help="first N models of MODEL_GRID to backtest",
+    )
+    select.add_argument("--workers", type=int, default=None)
+    select.set_defaults(run=bench_select)
+
+    baselines = commands.add_parser("baselines", help="vectorized baseline forecasters")
+    baselines.add_argument("--skus", type=int, default=100_000)
+    baselines.add_argument("--days", type=int, default=30)
+    baselines.add_argument(
+        "--batch-skus",
+        type=int,
+        default=200,
+        help="SKUs for the end-to-end forecast-all comparison with ARIMA",
+    )
+    baselines.add_argument("--history-days", type=int, default=365)
+    baselines.add_argument(
+        "--model",
+        choices=[m for m, (family, _) in MODEL_GRID.items() if family == "baseline"],
+        default="croston(0.1)",
+    )
+    baselines.set_defaults(run=bench_baselines)
+
+    save = commands.add_parser("save", help="writing forecast runs")
+    save.add_argument("--skus", type=int, default=20_000)
+    save.add_argument("--days", type=int, default=30)
+    save.add_argument(
+        "--legacy-skus",
+        type=int,
+        default=500,
+        help="SKUs for the old per-SKU ORM save (0 to skip)",
+    )
+    save.set_defaults(run=bench_save)
+
+    export = commands.add_parser("export", help="streaming forecast export")
+    export.add_argument("--skus", type=int, default=34_000)
+    export.add_argument("--days", type=int, default=30)
+    export.add_argument("--format", choices=["csv", "parquet", "xlsx"], default="csv")
+    export.set_defaults(run=bench_export)
+
+    pages = commands.add_parser("pages", help="page times as sales history grows")
+    pages.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    pages.add_argument("--iterations", type=int, default=20)
+    pages.set_defaults(run=bench_pages)
+
+    plans = commands.add_parser("plans", help="query plans of the indexed lookups")
+    plans.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    plans.add_argument("--iterations", type=int, default=20)
+    plans.set_defaults(run=bench_plans)
+
+    hierarchy = commands.add_parser(
+        "hierarchy", help="forecasting and reconciling the product hierarchy"
+    )
+    hierarchy.add_argument("--skus", type=int, default=5000)
+    hierarchy.add_argument("--categories", type=int, default=20)
+    hierarchy.add_argument("--channels", type=int, choices=range(1, 6), default=3)
+    hierarchy.add_argument("--history-days", type=int, default=BASELINE_HISTORY_DAYS)
+    hierarchy.add_argument("--days", type=int, default=30)
+    hierarchy.add_argument(
+        "--model",
+        choices=[m for m, (family, _) in MODEL_GRID.items() if family == "baseline"],
+        default="ses(0.2)",
+    )
+    hierarchy.set_defaults(run=bench_hierarchy)
+
+    simulate = commands.add_parser("simulate", help="inventory simulation and alerts")
+    simulate.add_argument("--skus", type=int, default=10_000)
+    simulate.add_argument("--paths", type=int, default=1000)
+    simulate.add_argument("--days", type=int, default=90)
+    simulate.set_defaults(run=bench_simulate)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,10 +19,13 @@ def generate_sample_sales_data():
         "Dish Soap",
         "Sponges",
     ]
+    categories = ["Kitchen", "Cleaning", "Storage", "Kitchen", "Kitchen"]
 
     data = []
 
-    for i, (sku, name) in enumerate(zip(products, product_names)):
+    for i, (sku, name, category) in enumerate(
+        zip(products, product_names, categories)
+    ):
         base_demand = 20 + i * 5  # Different base demands per product
 
         for day in range(90):
@@ -44,6 +47,7 @@ def generate_sample_sales_data():
                     "date": date.strftime("%Y-%m-%d"),
                     "product_sku": sku,
                     "product_name": name,
+                    "category": category,
                     "quantity_sold": demand,
                     "revenue": round(revenue, 2),
                     "cost": round(cost, 2),
@@ -74,6 +78,7 @@ def generate_sample_inventory_data():
                 "current_stock": base_stock,
                 "reorder_point": int(reorder_point),
                 "max_stock": int(max_stock),
+                "lead_time_days": np.random.choice([5, 7, 14]),
             }
         )
 
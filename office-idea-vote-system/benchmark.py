@@ -0,0 +1,563 @@
+"""Concurrent bidding benchmark for the lunch auction app.
+
+Starts the app in-process on a throwaway database, logs in one client per
+user and has every worker alternate between the dashboard and a bid for a
+fixed duration. One extra user never bids, so the auction stays open.
+
+With --load it instead simulates the whole team bidding in the same minute
+before the cutoff: every user logs in, checks the dashboard, bids once and
+refreshes. The last bid settles the auction, and the run fails unless every
+user's points were deducted exactly once. Throughput and latency
+percentiles per request type help size workers and DB_POOL_SIZE for the
+Docker deployment.
+
+    python benchmark.py                   # compare DB_POOL_SIZE=0 vs 8
+    python benchmark.py --pool-sizes 8 --workers 32 --duration 20
+    python benchmark.py --pages           # page bytes and render time
+    python benchmark.py --load --users 500 --workers 32
+    python benchmark.py --race --users 200 --finalists 50   # exits 1 on a failure
+
+--race is the settlement concurrency check: everyone but the finalists
+bids, then the finalists' final bids, rebids from as many earlier bidders
+and direct settlement calls all fire at once. It fails unless the auction
+settled exactly once, every accepted bid was stored and each bidder paid
+exactly once.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import queue
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+RESTAURANTS = ["Pizza Palace", "Burger Bar", "Sushi Express", "Thai Garden"]
+
+
+def seed_users(db_path, count):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO users (name, password) VALUES (?, ?)",
+        [(f"bench{i}", "bench") for i in range(count)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def start_server():
+    from werkzeug.serving import make_server
+    import main
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def client_for(base_url, username, password):
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+    )
+    data = urllib.parse.urlencode({"username": username, "password": password})
+    opener.open(f"{base_url}/login", data.encode()).read()
+    return opener
+
+
+def run_workers(base_url, workers, duration):
+    clients = [client_for(base_url, f"bench{i}", "bench") for i in range(workers)]
+    counts = [0] * workers
+    errors = [0] * workers
+    deadline = time.perf_counter() + duration
+
+    def work(index):
+        opener = clients[index]
+        bid = urllib.parse.urlencode(
+            {"restaurant": "Pizza Palace", "bid_amount": 1}
+        ).encode()
+        while time.perf_counter() < deadline:
+            try:
+                opener.open(f"{base_url}/dashboard").read()
+                opener.open(f"{base_url}/bid", bid).read()
+                counts[index] += 2
+            except Exception:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts), sum(errors), time.perf_counter() - started
+
+
+def run_single(args):
+    workdir = tempfile.mkdtemp(prefix="lunch-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+
+    from setup import setup_database
+
+    setup_database()
+    # One more user than workers keeps the auction from settling mid-run
+    seed_users("lunch_auction.db", args.workers + 1)
+
+    server, base_url = start_server()
+    # Keep bidding open whatever the time of day
+    sys.modules["main"].app.config["AUCTION_CUTOFF"] = ""
+    try:
+        requests, errors, elapsed = run_workers(base_url, args.workers, args.duration)
+    finally:
+        server.shutdown()
+
+    print(
+        f"pool_size={os.environ.get('DB_POOL_SIZE')} workers={args.workers} "
+        f"requests={requests} errors={errors} "
+        f"rps={requests / elapsed:.1f}"
+    )
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Time each request on its own instead of following the redirect."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def expected_points(bids, initial):
+    """Points each bidder should have after settlement.
+
+    Mirrors the settlement rules: tied top bidders split the top bid, and
+    everyone else pays their full bid.
+    """
+    top = max(bids.values())
+    winners = sum(1 for amount in bids.values() if amount == top)
+    return {
+        user_id: initial - (top // winners if amount == top else amount)
+        for user_id, amount in bids.items()
+    }
+
+
+def run_load(args):
+    workdir = tempfile.mkdtemp(prefix="lunch-load-")
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+
+    from setup import setup_database
+
+    setup_database()
+    db = sqlite3.connect("lunch_auction.db")
+    # The sample users would keep the auction open; the load run is the team
+    db.execute("DELETE FROM users WHERE is_admin = 0")
+    db.commit()
+    seed_users("lunch_auction.db", args.users)
+    initial = db.execute(
+        "SELECT current_points FROM users WHERE name = 'bench0'"
+    ).fetchone()[0]
+
+    server, base_url = start_server()
+    main = sys.modules["main"]
+    # Keep bidding open whatever the time of day
+    main.app.config["AUCTION_CUTOFF"] = ""
+
+    users = queue.Queue()
+    for i in range(args.users):
+        users.put(f"bench{i}")
+    latencies = {"login": [], "dashboard": [], "bid": []}
+    errors = []
+    placed = {}
+
+    def request(opener, kind, path, data=None):
+        started = time.perf_counter()
+        try:
+            opener.open(f"{base_url}{path}", data).read()
+        except urllib.error.HTTPError as e:
+            # Redirects surface as errors with NoRedirect installed
+            if e.code >= 400:
+                errors.append(f"{kind} {path}: HTTP {e.code}")
+                return
+        except Exception as e:
+            errors.append(f"{kind} {path}: {e}")
+            return
+        latencies[kind].append(time.perf_counter() - started)
+
+    def work():
+        while True:
+            try:
+                name = users.get_nowait()
+            except queue.Empty:
+                return
+            opener = urllib.request.build_opener(
+                NoRedirect,
+                urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            )
+            credentials = urllib.parse.urlencode(
+                {"username": name, "password": "bench"}
+            ).encode()
+            request(opener, "login", "/login", credentials)
+            request(opener, "dashboard", "/dashboard")
+            # Nobody goes all in, so settlement never triggers a points reset
+            amount = random.randint(1, initial - 1)
+            placed[name] = amount
+            bid = urllib.parse.urlencode(
+                {"restaurant": random.choice(RESTAURANTS), "bid_amount": amount}
+            ).encode()
+            request(opener, "bid", "/bid", bid)
+            for _ in range(args.refreshes):
+                request(opener, "dashboard", "/dashboard")
+
+    threads = [threading.Thread(target=work) for _ in range(args.workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # The final bid wakes the scheduler; give it a moment to settle
+    deadline = time.perf_counter() + 10
+    status = None
+    while time.perf_counter() < deadline:
+        status = db.execute(
+            "SELECT status FROM auctions WHERE date = ?",
+            (main.auction_today().isoformat(),),
+        ).fetchone()[0]
+        if status == "completed":
+            break
+        time.sleep(0.05)
+    server.shutdown()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(
+        f"users={args.users} workers={args.workers} "
+        f"pool_size={main.app.config['DB_POOL_SIZE']} requests={total} "
+        f"errors={len(errors)} elapsed={elapsed:.2f}s rps={total / elapsed:.1f}"
+    )
+    for kind, samples in latencies.items():
+        if samples:
+            print(
+                f"{kind:<10} n={len(samples):<6} "
+                + " ".join(
+                    f"p{int(fraction * 100)}={percentile(samples, fraction) * 1000:.1f}ms"
+                    for fraction in (0.5, 0.95, 0.99)
+                )
+            )
+    for error in errors[:10]:
+        print(f"error: {error}")
+
+    # Settlement check: exactly one bid per user, each paid exactly once
+    problems = []
+    bids = dict(
+        db.execute(
+            """
+            SELECT u.name, b.bid_amount FROM bids b JOIN users u ON u.id = b.user_id
+            JOIN auctions a ON a.id = b.auction_id
+            WHERE a.date = ?
+        """,
+            (main.auction_today().isoformat(),),
+        ).fetchall()
+    )
+    if status != "completed":
+        problems.append(f"auction not settled (status={status})")
+    if bids != placed:
+        problems.append(f"{len(bids)} bids stored for {len(placed)} placed")
+    if bids:
+        points = dict(
+            db.execute(
+                "SELECT name, current_points FROM users WHERE is_admin = 0"
+            ).fetchall()
+        )
+        wrong = {
+            name: (points[name], expected)
+            for name, expected in expected_points(bids, initial).items()
+            if points[name] != expected
+        }
+        if wrong:
+            problems.append(f"{len(wrong)} users with wrong points, e.g. {wrong}")
+    entered = db.execute(
+        "SELECT COUNT(*), COALESCE(MAX(auctions_entered), 0) FROM user_stats"
+    ).fetchone()
+    if entered != (len(bids), 1 if bids else 0):
+        problems.append(f"user_stats recorded {entered}, expected one entry per bidder")
+    db.close()
+
+    if problems:
+        for problem in problems:
+            print(f"settlement FAILED: {problem}")
+        sys.exit(1)
+    print(f"settlement ok: {len(bids)} bids, points deducted exactly once")
+
+
+def run_race(args):
+    workdir = tempfile.mkdtemp(prefix="lunch-race-")
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+
+    from setup import setup_database
+
+    setup_database()
+    db = sqlite3.connect("lunch_auction.db")
+    db.execute("DELETE FROM users WHERE is_admin = 0")
+    db.commit()
+    seed_users("lunch_auction.db", args.users)
+    initial = db.execute(
+        "SELECT current_points FROM users WHERE name = 'bench0'"
+    ).fetchone()[0]
+
+    server, base_url = start_server()
+    main = sys.modules["main"]
+    # Keep bidding open whatever the time of day
+    main.app.config["AUCTION_CUTOFF"] = ""
+    engine = main.get_engine()
+
+    def client(name):
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        credentials = urllib.parse.urlencode({"username": name, "password": "bench"})
+        opener.open(f"{base_url}/login", credentials.encode()).read()
+        return opener
+
+    def bid(opener, amount):
+        """Place a bid through the JSON API; True if it was accepted."""
+        body = json.dumps(
+            {"restaurant": random.choice(RESTAURANTS), "bid_amount": amount}
+        ).encode()
+        req = urllib.request.Request(
+            f"{base_url}/api/bid", body, {"Content-Type": "application/json"}
+        )
+        try:
+            opener.open(req).read()
+            return True
+        except urllib.error.HTTPError as e:
+            if e.code != 400:
+                errors.append(f"bid: HTTP {e.code}")
+            return False
+
+    names = [f"bench{i}" for i in range(args.users)]
+    finalists = names[: args.finalists]
+    early = names[args.finalists :]
+    clients = {name: client(name) for name in names}
+    # Last accepted amount per user; a rebid rejected after closing keeps
+    # the earlier one
+    accepted = {}
+    errors = []
+    for name in early:
+        amount = random.randint(1, initial - 1)
+        if bid(clients[name], amount):
+            accepted[name] = amount
+
+    lock = threading.Lock()
+
+    def final_bid(name):
+        amount = random.randint(1, initial - 1)
+        barrier.wait()
+        if bid(clients[name], amount):
+            with lock:
+                accepted[name] = amount
+
+    def settle():
+        barrier.wait()
+        try:
+            main.settle_if_due(engine)
+        except Exception as e:
+            errors.append(f"settle: {e}")
+
+    threads = [threading.Thread(target=final_bid, args=(n,)) for n in finalists]
+    threads += [
+        threading.Thread(target=final_bid, args=(n,))
+        for n in random.sample(early, min(len(early), len(finalists)))
+    ]
+    threads += [threading.Thread(target=settle) for _ in range(args.settlers)]
+    # Everything fires together once the last thread is ready
+    barrier = threading.Barrier(len(threads))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    deadline = time.perf_counter() + 10
+    status = None
+    while time.perf_counter() < deadline:
+        status = db.execute(
+            "SELECT status FROM auctions WHERE date = ?",
+            (main.auction_today().isoformat(),),
+        ).fetchone()[0]
+        if status == "completed":
+            break
+        time.sleep(0.05)
+    # Let the settling thread finish reloading before reading its results
+    engine.writer.flush()
+    server.shutdown()
+
+    problems = list(errors)
+    bids = dict(
+        db.execute(
+            """
+            SELECT u.name, b.bid_amount FROM bids b JOIN users u ON u.id = b.user_id
+            JOIN auctions a ON a.id = b.auction_id
+            WHERE a.date = ?
+        """,
+            (main.auction_today().isoformat(),),
+        ).fetchall()
+    )
+    if status != "completed":
+        problems.append(f"auction not settled (status={status})")
+    if bids != accepted:
+        lost = {n: a for n, a in accepted.items() if bids.get(n) != a}
+        problems.append(f"{len(lost)} accepted bids not stored, e.g. {lost}")
+    settled = db.execute(
+        "SELECT COUNT(*) FROM auctions WHERE status = 'completed'"
+    ).fetchone()[0]
+    if settled != 1:
+        problems.append(f"{settled} auctions completed, expected 1")
+    if bids:
+        points = dict(
+            db.execute(
+                "SELECT name, current_points FROM users WHERE is_admin = 0"
+            ).fetchall()
+        )
+        wrong = {
+            name: (points[name], expected)
+            for name, expected in expected_points(bids, initial).items()
+            if points[name] != expected
+        }
+        if wrong:
+            problems.append(f"{len(wrong)} users with wrong points, e.g. {dict(list(wrong.items())[:5])}")
+    entered = db.execute(
+        "SELECT COUNT(*), COALESCE(MAX(auctions_entered), 0) FROM user_stats"
+    ).fetchone()
+    if entered != (len(bids), 1 if bids else 0):
+        problems.append(f"user_stats recorded {entered}, expected one entry per bidder")
+    db.close()
+
+    print(
+        f"users={args.users} finalists={args.finalists} settlers={args.settlers} "
+        f"bids={len(bids)} accepted={len(accepted)}"
+    )
+    if problems:
+        for problem in problems:
+            print(f"race FAILED: {problem}")
+        sys.exit(1)
+    print("race ok: settled once, no lost bids, points deducted exactly once")
+
+
+def measure_pages(args):
+    workdir = tempfile.mkdtemp(prefix="lunch-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+
+    from setup import setup_database
+    import main
+
+    setup_database()
+    client = main.app.test_client()
+    pages = [
+        ("login", None, "/login"),
+        ("dashboard", ("Alice", "alice123"), "/dashboard"),
+        ("admin", ("Admin", "admin123"), "/admin"),
+        ("ideas", ("Admin", "admin123"), "/ideas"),
+    ]
+    for label, credentials, path in pages:
+        client.get("/logout")
+        if credentials:
+            client.post(
+                "/login", data={"username": credentials[0], "password": credentials[1]}
+            )
+        size = len(client.get(path).data)
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            client.get(path)
+        elapsed = (time.perf_counter() - started) / args.iterations
+        print(f"{label:<10} bytes={size:<6} ms/request={elapsed * 1000:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--pool-sizes",
+        default="0,8",
+        help="comma separated DB_POOL_SIZE values to compare (0 = no pooling)",
+    )
+    parser.add_argument(
+        "--pages", action="store_true", help="measure page bytes and render time"
+    )
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="every user logs in, bids once and refreshes; verify settlement",
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument(
+        "--refreshes", type=int, default=2, help="dashboard loads after each bid"
+    )
+    parser.add_argument(
+        "--race",
+        action="store_true",
+        help="fire the final bids and settlements at once; verify one settlement",
+    )
+    parser.add_argument(
+        "--finalists", type=int, default=50, help="users whose bids fire at once"
+    )
+    parser.add_argument(
+        "--settlers", type=int, default=8, help="direct settlement calls in the race"
+    )
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.pages:
+        measure_pages(args)
+        return
+
+    if args.load:
+        run_load(args)
+        return
+
+    if args.race:
+        run_race(args)
+        return
+
+    if args.single:
+        run_single(args)
+        return
+
+    # Each configuration runs in its own process so module-level pools and
+    # engines start from scratch
+    for size in args.pool_sizes.split(","):
+        env = dict(os.environ, DB_POOL_SIZE=size.strip())
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--single",
+                "--workers",
+                str(args.workers),
+                "--duration",
+                str(args.duration),
+            ],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,171 +1,886 @@
 # Restaurant list maintained by admin via dropdown
 from flask import (
     Flask,
-    render_template_string,
+    Response,
+    render_template,
     request,
     redirect,
     url_for,
     session,
     flash,
+    g,
+    jsonify,
+    has_request_context,
 )
 import sqlite3
-from datetime import datetime, date
+import threading
+import queue
+import json
+import gzip
+import hashlib
+import atexit
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from jinja2 import ChoiceLoader, DictLoader
+from setup import DEFAULT_TENANT, create_schema, tenant_db_path, tenants_dir
 import os
+import re
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"  # Change this in production
+# Idle connections kept for reuse; 0 opens a fresh connection per request
+app.config["DB_POOL_SIZE"] = int(os.environ.get("DB_POOL_SIZE", 8))
+# Idle SSE streams send a comment this often so dead clients are noticed
+app.config["SSE_HEARTBEAT_SECONDS"] = 15
+# Time (HH:MM) at which bidding closes and the auction settles with the bids
+# placed so far. Off by default: the auction waits for every user to bid
+app.config["AUCTION_CUTOFF"] = os.environ.get("AUCTION_CUTOFF", "")
+# IANA timezone, e.g. "Europe/London", that decides both the auction's day and
+# the cutoff; empty for the server's local time, which is UTC in the container
+app.config["AUCTION_TIMEZONE"] = os.environ.get("AUCTION_TIMEZONE", "")
+# The cutoff is compared as a string, so it must be zero-padded
+if not re.fullmatch(r"([01]\d|2[0-3]):[0-5]\d|", app.config["AUCTION_CUTOFF"]):
+    raise ValueError(
+        f"AUCTION_CUTOFF must be HH:MM or empty, not {app.config['AUCTION_CUTOFF']!r}"
+    )
+if app.config["AUCTION_TIMEZONE"]:
+    ZoneInfo(app.config["AUCTION_TIMEZONE"])  # Unknown zones fail here
+# How often the scheduler looks for auctions to close when no bid wakes it
+app.config["SCHEDULER_INTERVAL_SECONDS"] = 30
 
 
-def get_db():
-    # Use data directory for database persistence in Docker
-    db_path = (
-        os.path.join("data", "lunch_auction.db")
-        if os.path.exists("data")
-        else "lunch_auction.db"
-    )
-    conn = sqlite3.connect(db_path)
+def get_db_path(tenant=DEFAULT_TENANT):
+    return tenant_db_path(tenant)
+
+
+def connect_db(db_path, **kwargs):
+    # Pragmas are per connection, so pay for them once and reuse the connection
+    conn = sqlite3.connect(db_path, timeout=5, cached_statements=256, **kwargs)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA synchronous = NORMAL")
     return conn
 
 
-def get_today_auction():
-    conn = get_db()
-    today = date.today().isoformat()
-
-    # Get or create today's auction
-    auction = conn.execute("SELECT * FROM auctions WHERE date = ?", (today,)).fetchone()
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections shared by request handlers."""
 
-    if not auction:
-        conn.execute("INSERT INTO auctions (date) VALUES (?)", (today,))
-        conn.commit()
-        auction = conn.execute(
-            "SELECT * FROM auctions WHERE date = ?", (today,)
-        ).fetchone()
+    def __init__(self, db_path, size):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
 
-    conn.close()
-    return auction
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return connect_db(self.db_path, check_same_thread=False)
 
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._idle.qsize() < self.size:
+            self._idle.put(conn)
+        else:
+            conn.close()
 
-def check_auction_complete():
-    conn = get_db()
-    today = date.today().isoformat()
 
-    # Count total users and bids for today
-    total_users = conn.execute(
-        "SELECT COUNT(*) as count FROM users WHERE is_admin = 0"
-    ).fetchone()["count"]
-    total_bids = conn.execute(
-        """
-        SELECT COUNT(*) as count FROM bids b
-        JOIN auctions a ON b.auction_id = a.id
-        WHERE a.date = ?
-    """,
-        (today,),
-    ).fetchone()["count"]
-
-    if total_bids == total_users:
-        # All users have bid, find the highest bid amount
-        highest_bid = conn.execute(
-            """
-            SELECT b.bid_amount, COUNT(*) as winner_count
-            FROM bids b
-            JOIN auctions a ON b.auction_id = a.id
-            WHERE a.date = ?
-            GROUP BY b.bid_amount
-            ORDER BY b.bid_amount DESC
-            LIMIT 1
-        """,
-            (today,),
-        ).fetchone()
+def get_db():
+    """Connection for the current request, returned to the pool on teardown."""
+    if "db" not in g:
+        g.db_pool = get_shard().pool
+        g.db = g.db_pool.acquire()
+    return g.db
+
+
+@app.teardown_appcontext
+def release_db(exception):
+    conn = g.pop("db", None)
+    if conn is not None:
+        g.pop("db_pool").release(conn)
+
+
+class WriteBehindWriter:
+    """Runs queued writes on one long-lived connection in a background thread.
+
+    Every queued operation returns a Future that resolves once its batch has
+    committed. Writes queued while a commit is in flight are grouped into the
+    next ``BEGIN IMMEDIATE`` transaction, so concurrent bids share a single
+    commit and never have to upgrade a read lock mid-transaction.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._pending = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="auction-writer", daemon=True
+        )
+        self._thread.start()
+
+    def execute(self, sql, params=()):
+        return self.call(lambda conn: conn.execute(sql, params).rowcount)
+
+    def call(self, fn):
+        """Queue fn(conn) to run inside the next write transaction."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Writer has been closed")
+            self._pending.append((fn, future))
+            self._cond.notify()
+        return future
+
+    def flush(self):
+        self.call(lambda conn: None).result()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        # Autocommit mode; transactions are opened explicitly in _apply
+        conn = connect_db(self.db_path, isolation_level=None)
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                batch, self._pending = self._pending, []
+            self._apply(conn, batch)
+        conn.close()
 
-        if highest_bid:
-            # Get all winners (in case of a tie)
-            winners = conn.execute(
-                """
-                SELECT b.*, u.name 
-                FROM bids b
-                JOIN users u ON b.user_id = u.id
-                JOIN auctions a ON b.auction_id = a.id
-                WHERE a.date = ? AND b.bid_amount = ?
-                ORDER BY b.created_at ASC
-            """,
-                (today, highest_bid["bid_amount"]),
+    def _apply(self, conn, batch):
+        try:
+            results = self._transaction(conn, [fn for fn, _ in batch])
+        except Exception:
+            # One bad write must not sink the whole batch, so replay each
+            # operation in its own transaction
+            for fn, future in batch:
+                try:
+                    future.set_result(self._transaction(conn, [fn])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _transaction(self, conn, fns):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            results = [fn(conn) for fn in fns]
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return results
+
+
+class BidError(Exception):
+    """A rejected bid; ``index`` is its position in a batch, if any."""
+
+    def __init__(self, message, index=None):
+        super().__init__(message)
+        self.index = index
+
+
+class AuctionBroadcaster:
+    """Wakes every live-update stream when the auction changes.
+
+    Only the latest event is kept. A stream that falls behind skips straight
+    to the current state instead of queueing every bid, so one publish fans
+    out to any number of watchers with constant memory per watcher.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.event = None
+        self._cond = threading.Condition()
+
+    def publish(self, event):
+        with self._cond:
+            self.version += 1
+            self.event = event
+            self._cond.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past ``version`` or timeout expires."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version, self.event
+
+
+class AuctionEngine:
+    """Today's auction, its bids and every user's points, held in memory.
+
+    Reads and bid validation never touch SQLite. Changes are persisted via
+    the write-behind writer, and state is recovered from the database when
+    the engine starts, after settlement and when the day rolls over.
+
+    Completion is tracked incrementally: the bidder set is the keys of
+    ``bids`` and ``_by_amount`` buckets bidders by amount in placement
+    order, so the winner is the first bidder in the ``_top`` bucket.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.events = AuctionBroadcaster()
+        self.auction = None
+        self.users = {}
+        self.bids = {}
+        self.eligible = 0
+        self._by_amount = {}
+        self._top = None
+        # Set by the writer thread when a bid write fails; the next access
+        # reloads under the lock
+        self._stale = False
+        self._lock = threading.RLock()
+
+    def load(self):
+        today = auction_today().isoformat()
+
+        def fetch(conn):
+            auction = conn.execute(
+                "SELECT * FROM auctions WHERE date = ?", (today,)
+            ).fetchone()
+            if auction is None:
+                # Normally created the day before by the scheduler
+                conn.execute("INSERT OR IGNORE INTO auctions (date) VALUES (?)", (today,))
+                auction = conn.execute(
+                    "SELECT * FROM auctions WHERE date = ?", (today,)
+                ).fetchone()
+            users = conn.execute(
+                "SELECT id, name, current_points, is_admin FROM users"
             ).fetchall()
+            bids = conn.execute(
+                "SELECT * FROM bids WHERE auction_id = ? ORDER BY created_at, id",
+                (auction["id"],),
+            ).fetchall()
+            return dict(auction), [dict(u) for u in users], [dict(b) for b in bids]
+
+        # Hold the lock while waiting so no bid lands between the snapshot
+        # and the swap
+        with self._lock:
+            # Cleared before the fetch so a write failing meanwhile still
+            # forces another reload
+            self._stale = False
+            auction, users, bids = self.writer.call(fetch).result()
+            self.auction = auction
+            self.users = {u["id"]: u for u in users}
+            self.eligible = sum(1 for u in users if not u["is_admin"])
+            self.bids = {}
+            self._by_amount = {}
+            self._top = None
+            for bid in bids:
+                self._record_bid(bid)
+
+    def _record_bid(self, bid):
+        # A rebid moves to the end, so ``bids`` stays in placement order
+        # like the bid ids REPLACE hands out
+        previous = self.bids.pop(bid["user_id"], None)
+        self.bids[bid["user_id"]] = bid
+
+        if previous is not None:
+            bidders = self._by_amount[previous["bid_amount"]]
+            del bidders[bid["user_id"]]
+            if not bidders:
+                del self._by_amount[previous["bid_amount"]]
+
+        amount = bid["bid_amount"]
+        self._by_amount.setdefault(amount, {})[bid["user_id"]] = None
+        if self._top is None or amount > self._top:
+            self._top = amount
+        elif self._top not in self._by_amount:
+            # The previous top bid was lowered; amounts are bounded by the
+            # points budget so this scan is tiny
+            self._top = max(self._by_amount)
+
+    def today_auction(self):
+        with self._lock:
+            if (
+                self._stale
+                or self.auction is None
+                or self.auction["date"] != auction_today().isoformat()
+            ):
+                self.load()
+            return dict(self.auction)
+
+    def _lookup_user(self, user_id):
+        # Callers hold the lock. Users can be added while the app runs
+        # (setup.py, direct inserts), so a miss rereads the roster
+        user = self.users.get(user_id)
+        if user is None:
+            self._reload_users()
+            user = self.users.get(user_id)
+        return user
+
+    def _reload_users(self):
+        users = self.writer.call(
+            lambda conn: [
+                dict(u)
+                for u in conn.execute(
+                    "SELECT id, name, current_points, is_admin FROM users"
+                ).fetchall()
+            ]
+        ).result()
+        self.users = {u["id"]: u for u in users}
+        self.eligible = sum(1 for u in users if not u["is_admin"])
+
+    def user(self, user_id):
+        with self._lock:
+            user = self._lookup_user(user_id)
+            return dict(user) if user else None
+
+    def bidders(self):
+        """Non-admin users ordered by name."""
+        with self._lock:
+            users = [dict(u) for u in self.users.values() if not u["is_admin"]]
+        return sorted(users, key=lambda u: u["name"])
+
+    def user_bid(self, user_id):
+        with self._lock:
+            self.today_auction()
+            bid = self.bids.get(user_id)
+            if not bid:
+                return None
+            return dict(bid, name=self.users[user_id]["name"])
+
+    def leaderboard(self):
+        """Today's bids with bidder names, highest first.
+
+        Ties are ordered as settlement breaks them: earliest bid first.
+        """
+        with self._lock:
+            self.today_auction()
+            bids = [
+                dict(bid, name=self.users[user_id]["name"])
+                for user_id, bid in self.bids.items()
+            ]
+        # Stable, so bids placed in the same second keep placement order
+        return sorted(bids, key=lambda b: (-b["bid_amount"], b["created_at"]))
+
+    def snapshot(self, include_bids=False):
+        """JSON-ready auction state for live updates; bids are admin-only."""
+        with self._lock:
+            auction = self.today_auction()
+            state = {
+                "date": auction["date"],
+                "status": auction["status"],
+                "bid_count": len(self.bids),
+                "bidder_count": self.eligible,
+                "winning_restaurant": auction["winning_restaurant"],
+                "winning_bid": auction["winning_bid"],
+            }
+            if include_bids:
+                state["leaderboard"] = [
+                    {
+                        "name": bid["name"],
+                        "restaurant": bid["restaurant"],
+                        "bid_amount": bid["bid_amount"],
+                    }
+                    for bid in self.leaderboard()
+                ]
+        return state
+
+    def place_bid(self, user_id, restaurant, bid_amount):
+        """Record a bid in memory and return a Future for its durable write."""
+        return self.place_bids([(user_id, restaurant, bid_amount)])
+
+    def place_bids(self, bids):
+        """Record many ``(user_id, restaurant, bid_amount)`` bids at once.
+
+        Every bid is validated before any is recorded, so a BidError leaves
+        the auction untouched. All of them are written in one transaction;
+        the returned Future resolves once that has committed.
+        """
+        with self._lock:
+            auction = self.today_auction()
+            if auction["status"] != "active":
+                raise BidError("Today's auction is already closed!")
+            if cutoff_passed():
+                raise BidError(
+                    f"Bidding closed at {app.config['AUCTION_CUTOFF']}!"
+                )
 
-            if winners:
-                # In case of a tie, use the first person's restaurant choice
-                first_winner = winners[0]
-                winner_count = highest_bid["winner_count"]
-                points_to_deduct = (
-                    highest_bid["bid_amount"] // winner_count
-                )  # Split points among tied winners
+            for index, (user_id, restaurant, bid_amount) in enumerate(bids):
+                user = self._lookup_user(user_id)
+                if not user or user["is_admin"]:
+                    raise BidError("Invalid user selected!", index)
+                if bid_amount < 1:
+                    raise BidError("Bids must be at least 1 point!", index)
+                if user["current_points"] < bid_amount:
+                    raise BidError("Not enough points for this bid!", index)
+
+            created_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            rows = []
+            for user_id, restaurant, bid_amount in bids:
+                self._record_bid(
+                    {
+                        "auction_id": auction["id"],
+                        "user_id": user_id,
+                        "restaurant": restaurant,
+                        "bid_amount": bid_amount,
+                        "created_at": created_at,
+                    }
+                )
+                rows.append((auction["id"], user_id, restaurant, bid_amount))
 
-                # Update auction with winner info
-                conn.execute(
+            future = self.writer.call(
+                lambda conn: conn.executemany(
                     """
-                    UPDATE auctions 
-                    SET winner_id = ?, winning_restaurant = ?, winning_bid = ?, status = 'completed'
-                    WHERE date = ?
+                    INSERT OR REPLACE INTO bids (auction_id, user_id, restaurant, bid_amount)
+                    VALUES (?, ?, ?, ?)
                 """,
-                    (
-                        first_winner["user_id"],
-                        first_winner["restaurant"],
-                        points_to_deduct,
-                        today,
-                    ),
+                    rows,
+                ).rowcount
+            )
+            future.add_done_callback(self._after_bid_write)
+            return future
+
+    def close_if_due(self, at_cutoff=False):
+        """Close today's auction once every user has bid or, with
+        ``at_cutoff``, with whatever bids exist (possibly none).
+
+        Returns the outcome to settle, or None if the auction stays open.
+        Only the first caller gets an outcome, and later bids are rejected
+        because the auction is marked ``settling``. It only reads completed
+        once settlement has committed and the engine reloads.
+        """
+        with self._lock:
+            self.today_auction()
+            if self.auction["status"] != "active":
+                return None
+            complete = self.bids and len(self.bids) >= self.eligible
+            if complete and not at_cutoff:
+                # Someone added since the roster was loaded still has to bid
+                self._reload_users()
+                complete = len(self.bids) >= self.eligible
+            if not (complete or at_cutoff):
+                return None
+
+            self.auction["status"] = "settling"
+            outcome = {
+                "auction_id": self.auction["id"],
+                "winner_id": None,
+                "restaurant": None,
+                "bid_amount": None,
+                "winner_ids": [],
+            }
+            if self.bids:
+                winner_ids = list(self._by_amount[self._top])
+                first_winner = self.bids[winner_ids[0]]
+                outcome.update(
+                    winner_id=first_winner["user_id"],
+                    restaurant=first_winner["restaurant"],
+                    bid_amount=self._top,
+                    winner_ids=winner_ids,
                 )
+            return outcome
+
+    def _after_bid_write(self, future):
+        # Runs on the writer thread, so it must neither wait on the writer nor
+        # take the lock a caller may hold while waiting on it; flagging the
+        # state stale forces a reload on the next access
+        if future.exception() is not None:
+            self._stale = True
+        else:
+            self.events.publish("bid")
 
-                # For tied winners, deduct split points
-                winner_ids = [w["user_id"] for w in winners]
-                placeholders = ",".join("?" * len(winner_ids))
-                conn.execute(
-                    f"""
-                    UPDATE users 
-                    SET current_points = current_points - ?
-                    WHERE id IN ({placeholders})
-                """,
-                    [points_to_deduct] + winner_ids,
-                )
 
-                # For non-winners, deduct full bid amount
-                conn.execute(
-                    f"""
-                    UPDATE users 
-                    SET current_points = current_points - (
-                        SELECT bid_amount FROM bids b
-                        JOIN auctions a ON b.auction_id = a.id
-                        WHERE b.user_id = users.id AND a.date = ?
-                    )
-                    WHERE id IN (
-                        SELECT user_id FROM bids b
-                        JOIN auctions a ON b.auction_id = a.id
-                        WHERE a.date = ? AND b.user_id NOT IN ({placeholders})
-                    )
-                """,
-                    [today, today] + winner_ids,
+def prepare_database(conn):
+    create_schema(conn.cursor())
+
+    # One-off backfill of the summary tables for auctions settled before
+    # they existed
+    backfill = conn.execute(
+        "INSERT OR IGNORE INTO app_state (key, value) VALUES ('stats_backfilled', 1)"
+    ).rowcount
+    if backfill:
+        settled = conn.execute(
+            "SELECT id FROM auctions WHERE status = 'completed' ORDER BY date"
+        ).fetchall()
+        for auction in settled:
+            record_auction_stats(conn, auction["id"])
+
+
+class Shard:
+    """One tenant's database with its own pool, writer and auction engine.
+
+    Shards share nothing, so bids and settlement in one office never wait
+    on another office's locks.
+    """
+
+    def __init__(self, tenant):
+        self.tenant = tenant
+        self.db_path = get_db_path(tenant)
+        self.pool = ConnectionPool(self.db_path, app.config["DB_POOL_SIZE"])
+        writer = WriteBehindWriter(self.db_path)
+        atexit.register(writer.close)
+        writer.call(prepare_database).result()
+        self.engine = AuctionEngine(writer)
+        self.engine.load()
+
+
+_shards = {}
+_shards_lock = threading.Lock()
+
+
+def tenant_exists(tenant):
+    try:
+        return os.path.exists(get_db_path(tenant))
+    except ValueError:
+        return False
+
+
+def tenant_names():
+    """Every tenant with a database on disk."""
+    names = [DEFAULT_TENANT] if tenant_exists(DEFAULT_TENANT) else []
+    if os.path.isdir(tenants_dir()):
+        names += sorted(
+            name[: -len(".db")]
+            for name in os.listdir(tenants_dir())
+            if name.endswith(".db") and tenant_exists(name[: -len(".db")])
+        )
+    return names
+
+
+def current_tenant():
+    if has_request_context():
+        return session.get("tenant", DEFAULT_TENANT)
+    return DEFAULT_TENANT
+
+
+def get_shard(tenant=None):
+    """Route to the shard for ``tenant``, or the logged-in user's tenant."""
+    tenant = tenant or current_tenant()
+    with _shards_lock:
+        shard = _shards.get(tenant)
+        if shard is None:
+            shard = _shards[tenant] = Shard(tenant)
+    scheduler.start()
+    return shard
+
+
+def get_engine():
+    return get_shard().engine
+
+
+def get_today_auction():
+    return get_engine().today_auction()
+
+
+def office_now():
+    """The current time in AUCTION_TIMEZONE, or server local time."""
+    timezone = app.config["AUCTION_TIMEZONE"]
+    return datetime.now(ZoneInfo(timezone) if timezone else None)
+
+
+def auction_today():
+    """The date of today's auction, on the same clock as the cutoff."""
+    return office_now().date()
+
+
+def cutoff_passed():
+    cutoff = app.config["AUCTION_CUTOFF"]
+    # Zero-padded HH:MM strings compare in time order
+    return bool(cutoff) and office_now().strftime("%H:%M") >= cutoff
+
+
+def settle_if_due(engine):
+    """Settle today's auction once every user has bid or the cutoff passed."""
+    outcome = engine.close_if_due(at_cutoff=cutoff_passed())
+    if outcome is None:
+        return
+    engine.events.publish("settling")
+
+    # Settlement runs on the writer connection, after every queued bid
+    try:
+        engine.writer.call(
+            lambda conn: settle_auction(conn, outcome["auction_id"])
+        ).result()
+    finally:
+        engine.load()
+        engine.events.publish("completed")
+
+
+def prepare_auctions(conn, today):
+    """Create tomorrow's auction ahead of time and settle any auction left
+    open on an earlier day, e.g. while the app was down at the cutoff.
+
+    Returns the number of auctions settled.
+    """
+    tomorrow = (today + timedelta(days=1)).isoformat()
+    conn.execute("INSERT OR IGNORE INTO auctions (date) VALUES (?)", (tomorrow,))
+    stale = conn.execute(
+        "SELECT id FROM auctions WHERE status = 'active' AND date < ? ORDER BY date",
+        (today.isoformat(),),
+    ).fetchall()
+    return sum(settle_auction(conn, auction["id"]) for auction in stale)
+
+
+class AuctionScheduler:
+    """Background thread that closes and settles auctions off the request path.
+
+    Each pass visits every tenant: once a day it creates tomorrow's auction
+    and settles auctions left over from earlier days, then it settles today's
+    auction if every user has bid or the cutoff has passed. Bids wake it
+    early; otherwise it polls every ``SCHEDULER_INTERVAL_SECONDS``.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._prepared = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="auction-scheduler", daemon=True
                 )
+                self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(app.config["SCHEDULER_INTERVAL_SECONDS"])
+            # Clear before the pass so a bid arriving mid-pass triggers another
+            self._wake.clear()
+            self.run_pending()
+
+    def run_pending(self):
+        for tenant in tenant_names():
+            try:
+                self._run_shard(get_shard(tenant))
+            except Exception:
+                # One broken tenant must not stop the others from settling
+                app.logger.exception("Scheduled settlement failed for %s", tenant)
+
+    def _run_shard(self, shard):
+        engine = shard.engine
+        today = auction_today()
+        if self._prepared.get(shard.tenant) != today:
+            settled = engine.writer.call(
+                lambda conn: prepare_auctions(conn, today)
+            ).result()
+            self._prepared[shard.tenant] = today
+            if settled:
+                # Points changed under the engine
+                engine.load()
+        settle_if_due(engine)
+
+
+scheduler = AuctionScheduler()
+
+
+# Every bid in an auction with what its bidder pays: tied top bidders split
+# the top bid, everyone else pays their full bid
+SETTLED_BIDS = """
+    top AS (
+        SELECT bid_amount AS amount, COUNT(*) AS winners
+        FROM bids
+        WHERE auction_id = :auction_id
+        GROUP BY bid_amount
+        ORDER BY bid_amount DESC
+        LIMIT 1
+    ),
+    settled AS (
+        SELECT
+            b.user_id,
+            b.restaurant,
+            b.bid_amount,
+            a.date AS auction_date,
+            b.bid_amount = top.amount AS won,
+            CASE
+                WHEN b.bid_amount = top.amount THEN top.amount / top.winners
+                ELSE b.bid_amount
+            END AS paid
+        FROM bids b
+        JOIN auctions a ON a.id = b.auction_id, top
+        WHERE b.auction_id = :auction_id
+    )
+"""
+
+
+def settle_auction(conn, auction_id):
+    """Settle an auction with set-based statements.
+
+    Must run inside a write transaction (the writer opens BEGIN IMMEDIATE).
+    Claiming the auction by flipping its status first makes settlement
+    idempotent: a second settler sees no active row and changes nothing.
+    Returns True if this call settled the auction.
+    """
+    claimed = conn.execute(
+        "UPDATE auctions SET status = 'completed' WHERE id = ? AND status = 'active'",
+        (auction_id,),
+    ).rowcount
+    if not claimed:
+        return False
+
+    # Highest bid wins; on a tie the first bid placed picks the restaurant and
+    # the points are split among tied winners. REPLACE gives a rebid a new id,
+    # so id order is placement order.
+    conn.execute(
+        """
+        UPDATE auctions
+        SET (winner_id, winning_restaurant, winning_bid) = (
+            SELECT b.user_id, b.restaurant, b.bid_amount / (
+                SELECT COUNT(*) FROM bids t
+                WHERE t.auction_id = b.auction_id AND t.bid_amount = b.bid_amount
+            )
+            FROM bids b
+            WHERE b.auction_id = auctions.id
+            ORDER BY b.bid_amount DESC, b.created_at ASC, b.id ASC
+            LIMIT 1
+        )
+        WHERE id = ?
+    """,
+        (auction_id,),
+    )
+
+    # Winners pay their split of the top bid, everyone else their full bid
+    conn.execute(
+        f"""
+        WITH {SETTLED_BIDS}
+        UPDATE users
+        SET current_points = current_points - (
+            SELECT paid FROM settled WHERE settled.user_id = users.id
+        )
+        WHERE id IN (SELECT user_id FROM settled)
+    """,
+        {"auction_id": auction_id},
+    )
+
+    # Stats are charged to the cycle the points were spent in, so record
+    # them before a possible reset starts the next one
+    record_auction_stats(conn, auction_id)
+
+    # If no employee has points left, reset everyone to 15 (scaled with team size)
+    reset = conn.execute(
+        """
+        UPDATE users
+        SET current_points = 15 * MAX(
+            1, (SELECT COUNT(*) FROM users WHERE is_admin = 0) / 10
+        )
+        WHERE is_admin = 0
+        AND NOT EXISTS (
+            SELECT 1 FROM users WHERE is_admin = 0 AND current_points > 0
+        )
+    """
+    )
+    if reset.rowcount:
+        conn.execute("UPDATE app_state SET value = value + 1 WHERE key = 'points_cycle'")
+    return True
+
+
+def record_auction_stats(conn, auction_id):
+    """Fold one settled auction into the summary tables."""
+    cycle = conn.execute(
+        "SELECT value FROM app_state WHERE key = 'points_cycle'"
+    ).fetchone()["value"]
+    params = {"auction_id": auction_id, "cycle": cycle}
+
+    conn.execute(
+        f"""
+        WITH {SETTLED_BIDS}
+        INSERT INTO user_stats (
+            user_id, auctions_entered, wins, points_bid, points_spent,
+            winning_points, last_win_date
+        )
+        SELECT
+            user_id, 1, won, bid_amount, paid,
+            CASE WHEN won THEN bid_amount ELSE 0 END,
+            CASE WHEN won THEN auction_date END
+        FROM settled WHERE true
+        ON CONFLICT (user_id) DO UPDATE SET
+            auctions_entered = auctions_entered + 1,
+            wins = wins + excluded.wins,
+            points_bid = points_bid + excluded.points_bid,
+            points_spent = points_spent + excluded.points_spent,
+            winning_points = winning_points + excluded.winning_points,
+            last_win_date = COALESCE(excluded.last_win_date, last_win_date)
+    """,
+        params,
+    )
+
+    conn.execute(
+        f"""
+        WITH {SETTLED_BIDS}
+        INSERT INTO user_cycle_stats (cycle, user_id, points_spent, wins)
+        SELECT :cycle, user_id, paid, won FROM settled WHERE true
+        ON CONFLICT (cycle, user_id) DO UPDATE SET
+            points_spent = points_spent + excluded.points_spent,
+            wins = wins + excluded.wins
+    """,
+        params,
+    )
 
-                # Check if anyone has points left
-                users_with_points = conn.execute(
-                    "SELECT COUNT(*) as count FROM users WHERE current_points > 0"
-                ).fetchone()["count"]
+    conn.execute(
+        f"""
+        WITH {SETTLED_BIDS}
+        INSERT INTO restaurant_stats (restaurant, bids, points_bid)
+        SELECT restaurant, COUNT(*), SUM(bid_amount) FROM settled WHERE true
+        GROUP BY restaurant
+        ON CONFLICT (restaurant) DO UPDATE SET
+            bids = bids + excluded.bids,
+            points_bid = points_bid + excluded.points_bid
+    """,
+        params,
+    )
 
-                # If no one has points, reset everyone to 15
-                if users_with_points == 0:
-                    user_count = conn.execute(
-                        "SELECT COUNT(*) as count FROM users WHERE is_admin = 0"
-                    ).fetchone()["count"]
-                    initial_points = 15 * max(
-                        1, user_count // 10
-                    )  # Scale with team size
-                    conn.execute(
-                        "UPDATE users SET current_points = ? WHERE is_admin = 0",
-                        (initial_points,),
-                    )
+    conn.execute(
+        f"""
+        WITH {SETTLED_BIDS}
+        INSERT INTO restaurant_monthly_stats (month, restaurant, bids)
+        SELECT substr(auction_date, 1, 7), restaurant, COUNT(*) FROM settled WHERE true
+        GROUP BY restaurant
+        ON CONFLICT (month, restaurant) DO UPDATE SET bids = bids + excluded.bids
+    """,
+        params,
+    )
 
-                conn.commit()
+    # The winning restaurant; its winning bid is the top bid before any split
+    conn.execute(
+        """
+        INSERT INTO restaurant_stats (restaurant, wins, winning_points, last_won)
+        SELECT winning_restaurant, 1, (
+            SELECT MAX(bid_amount) FROM bids WHERE auction_id = :auction_id
+        ), date
+        FROM auctions
+        WHERE id = :auction_id AND winning_restaurant IS NOT NULL
+        ON CONFLICT (restaurant) DO UPDATE SET
+            wins = wins + 1,
+            winning_points = winning_points + excluded.winning_points,
+            last_won = excluded.last_won
+    """,
+        params,
+    )
 
-    conn.close()
+    conn.execute(
+        """
+        INSERT INTO restaurant_monthly_stats (month, restaurant, wins)
+        SELECT substr(date, 1, 7), winning_restaurant, 1
+        FROM auctions
+        WHERE id = :auction_id AND winning_restaurant IS NOT NULL
+        ON CONFLICT (month, restaurant) DO UPDATE SET wins = wins + 1
+    """,
+        params,
+    )
 
 
 def require_login():
@@ -178,11 +893,7 @@ def require_admin():
     if "user_id" not in session:
         return redirect(url_for("login"))
 
-    conn = get_db()
-    user = conn.execute(
-        "SELECT is_admin FROM users WHERE id = ?", (session["user_id"],)
-    ).fetchone()
-    conn.close()
+    user = get_engine().user(session["user_id"])
 
     if not user or not user["is_admin"]:
         flash("Admin access required")
@@ -202,12 +913,19 @@ def login():
     if request.method == "POST":
         username = request.form["username"]
         password = request.form["password"]
+        tenant = request.form.get("office", "").strip().lower() or DEFAULT_TENANT
+
+        if not tenant_exists(tenant):
+            flash("Unknown office")
+            return render_template("login.html")
 
+        # The session's tenant routes every later request to its shard
+        session.clear()
+        session["tenant"] = tenant
         conn = get_db()
         user = conn.execute(
             "SELECT * FROM users WHERE name = ? AND password = ?", (username, password)
         ).fetchone()
-        conn.close()
 
         if user:
             session["user_id"] = user["id"]
@@ -217,7 +935,7 @@ def login():
         else:
             flash("Invalid username or password")
 
-    return render_template_string(LOGIN_TEMPLATE)
+    return render_template("login.html")
 
 
 @app.route("/logout")
@@ -232,40 +950,35 @@ def dashboard():
     if redirect_response:
         return redirect_response
 
-    conn = get_db()
-    user = conn.execute(
-        "SELECT * FROM users WHERE id = ?", (session["user_id"],)
-    ).fetchone()
+    engine = get_engine()
+    user = engine.user(session["user_id"])
+    if user is None:
+        # Deleted since logging in
+        session.clear()
+        return redirect(url_for("login"))
 
     if user["is_admin"]:
         return redirect(url_for("admin"))
 
-    auction = get_today_auction()
+    auction = engine.today_auction()
 
     # Get user's current bid for today
-    user_bid = conn.execute(
-        """
-        SELECT b.*, u.name FROM bids b
-        JOIN users u ON b.user_id = u.id
-        WHERE b.auction_id = ? AND b.user_id = ?
-    """,
-        (auction["id"], session["user_id"]),
-    ).fetchone()
+    user_bid = engine.user_bid(session["user_id"])
 
     # Get active restaurants for the dropdown
+    conn = get_db()
     ideas = conn.execute(
         "SELECT name FROM ideas WHERE is_active = 1 ORDER BY name"
     ).fetchall()
 
-    conn.close()
-
-    return render_template_string(
-        USER_DASHBOARD_TEMPLATE,
+    return render_template(
+        "dashboard.html",
         user=user,
         user_bid=user_bid,
         auction=auction,
         restaurants=ideas,
-        today=date.today().isoformat(),
+        today=auction_today().isoformat(),
+        cutoff=app.config["AUCTION_CUTOFF"],
     )
 
 
@@ -275,24 +988,16 @@ def admin():
     if redirect_response:
         return redirect_response
 
-    auction = get_today_auction()
-    conn = get_db()
+    engine = get_engine()
+    auction = engine.today_auction()
 
     # Get users with their current points
-    users = conn.execute(
-        "SELECT * FROM users WHERE is_admin = 0 ORDER BY name"
-    ).fetchall()
+    users = engine.bidders()
 
     # Get today's bids
-    bids = conn.execute(
-        """
-        SELECT b.*, u.name FROM bids b
-        JOIN users u ON b.user_id = u.id
-        WHERE b.auction_id = ?
-        ORDER BY b.bid_amount DESC
-    """,
-        (auction["id"],),
-    ).fetchall()
+    bids = engine.leaderboard()
+
+    conn = get_db()
 
     # Get recent winners (last 7 days)
     recent_winners = conn.execute("""
@@ -309,16 +1014,105 @@ def admin():
         "SELECT name FROM ideas WHERE is_active = 1 ORDER BY name"
     ).fetchall()
 
-    conn.close()
-
-    return render_template_string(
-        ADMIN_TEMPLATE,
+    return render_template(
+        "admin.html",
         users=users,
         bids=bids,
         auction=auction,
         recent_winners=recent_winners,
         restaurants=ideas,
-        today=date.today().isoformat(),
+        today=auction_today().isoformat(),
+        cutoff=app.config["AUCTION_CUTOFF"],
+    )
+
+
+@app.route("/history")
+def history():
+    redirect_response = require_admin()
+    if redirect_response:
+        return redirect_response
+
+    conn = get_db()
+    cycle = conn.execute(
+        "SELECT value FROM app_state WHERE key = 'points_cycle'"
+    ).fetchone()["value"]
+
+    # Everything below reads the summary tables maintained at settlement
+    users = conn.execute(
+        """
+        SELECT
+            u.name, s.auctions_entered, s.wins, s.points_bid, s.points_spent,
+            s.winning_points, s.last_win_date,
+            COALESCE(c.points_spent, 0) AS cycle_spent,
+            (
+                SELECT AVG(points_spent) FROM user_cycle_stats p
+                WHERE p.user_id = s.user_id AND p.cycle < :cycle
+            ) AS avg_cycle_spent
+        FROM user_stats s
+        JOIN users u ON u.id = s.user_id
+        LEFT JOIN user_cycle_stats c ON c.user_id = s.user_id AND c.cycle = :cycle
+        ORDER BY s.wins DESC, u.name
+    """,
+        {"cycle": cycle},
+    ).fetchall()
+
+    restaurants = conn.execute(
+        "SELECT * FROM restaurant_stats ORDER BY wins DESC, bids DESC, restaurant"
+    ).fetchall()
+
+    # Popularity over the last six months
+    today = auction_today()
+    since = f"{today.year - (today.month <= 5)}-{(today.month - 6) % 12 + 1:02d}"
+    monthly = conn.execute(
+        """
+        SELECT * FROM restaurant_monthly_stats
+        WHERE month >= ?
+        ORDER BY month DESC, wins DESC, bids DESC
+    """,
+        (since,),
+    ).fetchall()
+
+    return render_template(
+        "history.html",
+        users=users,
+        restaurants=restaurants,
+        monthly=monthly,
+        cycle=cycle,
+    )
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/events")
+def auction_events():
+    """Server-Sent Events stream of bid counts, leaderboard and completion."""
+    redirect_response = require_login()
+    if redirect_response:
+        return redirect_response
+
+    engine = get_engine()
+    user = engine.user(session["user_id"])
+    include_bids = bool(user and user["is_admin"])
+    heartbeat = app.config["SSE_HEARTBEAT_SECONDS"]
+
+    def stream():
+        # Read the version before the first snapshot so no change is missed
+        version = engine.events.version
+        yield format_sse("state", engine.snapshot(include_bids))
+        while True:
+            latest, event = engine.events.wait(version, heartbeat)
+            if latest == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = latest
+            yield format_sse(event, engine.snapshot(include_bids))
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -330,9 +1124,8 @@ def manage_ideas():
 
     conn = get_db()
     ideas = conn.execute("SELECT * FROM ideas ORDER BY name").fetchall()
-    conn.close()
 
-    return render_template_string(IDEAS_TEMPLATE, restaurants=ideas)
+    return render_template("ideas.html", restaurants=ideas)
 
 
 @app.route("/ideas/add", methods=["POST"])
@@ -353,7 +1146,6 @@ def add_restaurant():
         flash(f"Idea '{name}' added successfully!")
     except sqlite3.IntegrityError:
         flash("Idea already exists!")
-    conn.close()
 
     return redirect(url_for("manage_ideas"))
 
@@ -376,7 +1168,6 @@ def toggle_idea(idea_id):
         conn.commit()
         status_text = "activated" if new_status else "deactivated"
         flash(f"Idea '{restaurant['name']}' {status_text}!")
-    conn.close()
 
     return redirect(url_for("manage_ideas"))
 
@@ -394,7 +1185,6 @@ def delete_idea(idea_id):
         conn.execute("DELETE FROM ideas WHERE id = ?", (idea_id,))
         conn.commit()
         flash(f"Idea '{idea['name']}' deleted!")
-    conn.close()
 
     return redirect(url_for("manage_ideas"))
 
@@ -409,30 +1199,15 @@ def place_bid():
     bid_amount = int(request.form["bid_amount"])
     user_id = session["user_id"]
 
-    auction = get_today_auction()
-    conn = get_db()
-
-    # Check if user has enough points
-    user = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-    if user["current_points"] < bid_amount:
-        flash("Not enough points for this bid!")
-        conn.close()
+    # Place or update bid; only acknowledge it once it is durable
+    try:
+        get_engine().place_bid(user_id, restaurant, bid_amount).result()
+    except BidError as e:
+        flash(str(e))
         return redirect(url_for("dashboard"))
 
-    # Place or update bid
-    conn.execute(
-        """
-        INSERT OR REPLACE INTO bids (auction_id, user_id, restaurant, bid_amount)
-        VALUES (?, ?, ?, ?)
-    """,
-        (auction["id"], user_id, restaurant, bid_amount),
-    )
-
-    conn.commit()
-    conn.close()
-
-    # Check if auction is complete
-    check_auction_complete()
+    # Settlement happens on the scheduler thread
+    scheduler.wake()
 
     flash("Bid placed successfully!")
     return redirect(url_for("dashboard"))
@@ -448,17 +1223,13 @@ def admin_place_bid():
     bid_amount = int(request.form["bid_amount"])
     target_user_id = int(request.form["user_id"])
 
-    auction = get_today_auction()
-    conn = get_db()
+    engine = get_engine()
 
     # Verify target user exists and is not an admin
-    target_user = conn.execute(
-        "SELECT * FROM users WHERE id = ? AND is_admin = 0", (target_user_id,)
-    ).fetchone()
+    target_user = engine.user(target_user_id)
 
-    if not target_user:
+    if not target_user or target_user["is_admin"]:
         flash("Invalid user selected!")
-        conn.close()
         return redirect(url_for("admin"))
 
     # Check if user has enough points
@@ -466,176 +1237,145 @@ def admin_place_bid():
         flash(
             f"Not enough points for this bid! {target_user['name']} only has {target_user['current_points']} points."
         )
-        conn.close()
         return redirect(url_for("admin"))
 
-    # Place or update bid
-    conn.execute(
-        """
-        INSERT OR REPLACE INTO bids (auction_id, user_id, restaurant, bid_amount)
-        VALUES (?, ?, ?, ?)
-    """,
-        (auction["id"], target_user_id, restaurant, bid_amount),
-    )
-
-    conn.commit()
-    conn.close()
+    # Place or update bid; only acknowledge it once it is durable
+    try:
+        engine.place_bid(target_user_id, restaurant, bid_amount).result()
+    except BidError as e:
+        flash(str(e))
+        return redirect(url_for("admin"))
 
-    # Check if auction is complete
-    check_auction_complete()
+    # Settlement happens on the scheduler thread
+    scheduler.wake()
 
     flash(f"Bid placed successfully on behalf of {target_user['name']}!")
     return redirect(url_for("admin"))
 
 
+# JSON API for integrations such as the chat bot. Clients authenticate with
+# the regular /login form post and send the session cookie; errors come back
+# as {"error": ...} instead of redirects and flashed messages.
+
+
+def api_error(message, status=400, **extra):
+    return jsonify(error=message, **extra), status
+
+
+def api_user():
+    """The logged-in user, or None."""
+    if "user_id" not in session:
+        return None
+    return get_engine().user(session["user_id"])
+
+
+def parse_bid(data):
+    """Validate a JSON bid object; returns (restaurant, bid_amount)."""
+    if not isinstance(data, dict):
+        raise BidError("Each bid must be a JSON object!")
+    restaurant = data.get("restaurant")
+    bid_amount = data.get("bid_amount")
+    if not isinstance(restaurant, str) or not restaurant.strip():
+        raise BidError("A restaurant is required!")
+    # bool is an int subclass, so rule it out explicitly
+    if not isinstance(bid_amount, int) or isinstance(bid_amount, bool):
+        raise BidError("bid_amount must be a whole number of points!")
+    return restaurant.strip(), bid_amount
+
+
+@app.route("/api/auction")
+def api_auction():
+    """Today's auction with the caller's points and bid."""
+    user = api_user()
+    if not user:
+        return api_error("Login required", 401)
+
+    engine = get_engine()
+    bid = engine.user_bid(user["id"])
+    if bid:
+        bid = {"restaurant": bid["restaurant"], "bid_amount": bid["bid_amount"]}
+    return jsonify(
+        auction=engine.snapshot(include_bids=bool(user["is_admin"])),
+        cutoff=app.config["AUCTION_CUTOFF"] or None,
+        user={
+            "id": user["id"],
+            "name": user["name"],
+            "current_points": user["current_points"],
+            "is_admin": bool(user["is_admin"]),
+        },
+        bid=bid,
+    )
+
+
+@app.route("/api/bid", methods=["POST"])
+def api_place_bid():
+    """Place or update the caller's bid: {"restaurant": ..., "bid_amount": ...}."""
+    user = api_user()
+    if not user:
+        return api_error("Login required", 401)
+
+    engine = get_engine()
+    try:
+        restaurant, bid_amount = parse_bid(request.get_json(silent=True))
+        engine.place_bid(user["id"], restaurant, bid_amount).result()
+    except BidError as e:
+        return api_error(str(e))
+
+    scheduler.wake()
+    return jsonify(
+        bid={"restaurant": restaurant, "bid_amount": bid_amount},
+        auction=engine.snapshot(),
+    )
+
+
+@app.route("/api/admin/bids", methods=["POST"])
+def api_admin_place_bids():
+    """Place proxy bids for many users at once.
+
+    Body: {"bids": [{"user_id": ..., "restaurant": ..., "bid_amount": ...}]}.
+    Either every bid is applied, in one transaction, or none is; a rejected
+    bid is reported with its index. Completion is checked once at the end.
+    """
+    user = api_user()
+    if not user:
+        return api_error("Login required", 401)
+    if not user["is_admin"]:
+        return api_error("Admin access required", 403)
+
+    data = request.get_json(silent=True)
+    items = data.get("bids") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return api_error('Expected {"bids": [...]} with at least one bid')
+
+    bids = []
+    for index, item in enumerate(items):
+        try:
+            restaurant, bid_amount = parse_bid(item)
+        except BidError as e:
+            return api_error(str(e), index=index)
+        user_id = item.get("user_id")
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            return api_error("user_id must be an integer!", index=index)
+        bids.append((user_id, restaurant, bid_amount))
+
+    engine = get_engine()
+    try:
+        engine.place_bids(bids).result()
+    except BidError as e:
+        return api_error(str(e), index=e.index)
+
+    scheduler.wake()
+    return jsonify(placed=len(bids), auction=engine.snapshot(include_bids=True))
+
+
 LOGIN_TEMPLATE = """
 <!DOCTYPE html>
-<html lang="en">
+<html lang="en" class="page-login">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🍽️ Team Lunch Auction - Login</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        :root {
-            --primary-50: #f8fafc;
-            --primary-100: #f1f5f9;
-            --primary-200: #e2e8f0;
-            --primary-300: #cbd5e1;
-            --primary-400: #94a3b8;
-            --primary-500: #64748b;
-            --primary-600: #475569;
-            --primary-700: #334155;
-            --primary-800: #1e293b;
-            --primary-900: #0f172a;
-            --accent-500: #3b82f6;
-            --success-500: #22c55e;
-            --error-500: #ef4444;
-        }
-        
-        body {
-            font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: var(--primary-800);
-        }
-        
-        .login-container {
-            background: white;
-            border-radius: 20px;
-            padding: 48px;
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.1);
-            border: 1px solid var(--primary-200);
-            width: 100%;
-            max-width: 400px;
-        }
-        
-        .login-header {
-            text-align: center;
-            margin-bottom: 32px;
-        }
-        
-        .login-header h1 {
-            font-size: 2rem;
-            font-weight: 600;
-            color: var(--primary-900);
-            margin-bottom: 8px;
-        }
-        
-        .login-header p {
-            color: var(--primary-600);
-            font-size: 15px;
-        }
-        
-        .login-form {
-            display: grid;
-            gap: 20px;
-        }
-        
-        .form-group {
-            display: grid;
-            gap: 8px;
-        }
-        
-        .form-group label {
-            font-weight: 500;
-            color: var(--primary-700);
-            font-size: 14px;
-        }
-        
-        .form-group input {
-            padding: 14px 16px;
-            border: 1.5px solid var(--primary-300);
-            border-radius: 12px;
-            font-size: 15px;
-            transition: all 0.2s ease;
-            background: white;
-            color: var(--primary-800);
-            font-family: inherit;
-        }
-        
-        .form-group input:focus {
-            outline: none;
-            border-color: var(--accent-500);
-            box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.08);
-        }
-        
-        .btn {
-            background: var(--primary-900);
-            color: white;
-            border: none;
-            padding: 16px 24px;
-            border-radius: 12px;
-            font-size: 15px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s ease;
-            font-family: inherit;
-        }
-        
-        .btn:hover {
-            background: var(--primary-800);
-            transform: translateY(-1px);
-        }
-        
-        .flash-messages {
-            margin-bottom: 20px;
-        }
-        
-        .flash-error {
-            background: rgba(239, 68, 68, 0.1);
-            color: var(--error-500);
-            padding: 12px;
-            border-radius: 8px;
-            border: 1px solid rgba(239, 68, 68, 0.2);
-            font-size: 14px;
-        }
-        
-        .demo-info {
-            margin-top: 24px;
-            padding: 16px;
-            background: var(--primary-50);
-            border-radius: 12px;
-            border: 1px solid var(--primary-200);
-        }
-        
-        .demo-info h3 {
-            font-size: 14px;
-            font-weight: 600;
-            color: var(--primary-800);
-            margin-bottom: 8px;
-        }
-        
-        .demo-info p {
-            font-size: 13px;
-            color: var(--primary-600);
-            margin-bottom: 4px;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ app_css_url }}">
 </head>
 <body>
     <div class="login-container">
@@ -665,6 +1405,11 @@ LOGIN_TEMPLATE = """
                 <input type="password" id="password" name="password" required>
             </div>
             
+            <div class="form-group">
+                <label for="office">Office</label>
+                <input type="text" id="office" name="office" placeholder="default">
+            </div>
+            
             <button type="submit" class="btn">Sign In</button>
         </form>
         
@@ -686,196 +1431,12 @@ LOGIN_TEMPLATE = """
 
 USER_DASHBOARD_TEMPLATE = """
 <!DOCTYPE html>
-<html lang="en">
+<html lang="en" class="page-dashboard">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🍽️ Team Lunch Auction</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        :root {
-            --primary-50: #f8fafc;
-            --primary-100: #f1f5f9;
-            --primary-200: #e2e8f0;
-            --primary-300: #cbd5e1;
-            --primary-400: #94a3b8;
-            --primary-500: #64748b;
-            --primary-600: #475569;
-            --primary-700: #334155;
-            --primary-800: #1e293b;
-            --primary-900: #0f172a;
-            --accent-500: #3b82f6;
-            --success-500: #22c55e;
-            --error-500: #ef4444;
-        }
-        
-        body {
-            font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
-            min-height: 100vh;
-            color: var(--primary-800);
-            line-height: 1.7;
-        }
-        
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 32px 24px;
-        }
-        
-        .header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 32px;
-            padding-bottom: 24px;
-            border-bottom: 1px solid var(--primary-200);
-        }
-        
-        .header h1 {
-            font-size: 2rem;
-            font-weight: 600;
-            color: var(--primary-900);
-        }
-        
-        .nav-links {
-            display: flex;
-            gap: 12px;
-        }
-        
-        .nav-links a {
-            background: var(--primary-200);
-            color: var(--primary-700);
-            padding: 8px 16px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.2s ease;
-        }
-        
-        .nav-links a:hover {
-            background: var(--primary-300);
-            color: var(--primary-800);
-        }
-        
-        .card {
-            background: white;
-            border-radius: 20px;
-            padding: 32px;
-            box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-            border: 1px solid var(--primary-200);
-            margin-bottom: 24px;
-        }
-        
-        .card h2 {
-            font-size: 1.25rem;
-            font-weight: 600;
-            color: var(--primary-900);
-            margin-bottom: 20px;
-        }
-        
-        .bid-form {
-            display: grid;
-            gap: 20px;
-        }
-        
-        select, input[type="number"] {
-            padding: 12px 16px;
-            border: 1.5px solid var(--primary-300);
-            border-radius: 8px;
-            font-size: 15px;
-        }
-        
-        .btn {
-            background: var(--primary-900);
-            color: white;
-            border: none;
-            padding: 12px 20px;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s ease;
-        }
-        
-        .btn:hover {
-            background: var(--primary-800);
-        }
-        
-        .points-badge {
-            background: var(--primary-800);
-            color: white;
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 13px;
-        }
-        
-        .status {
-            text-align: center;
-            padding: 24px;
-            margin: 32px 0;
-            border-radius: 16px;
-            font-size: 16px;
-            font-weight: 500;
-        }
-        
-        .status.completed {
-            background: var(--success-500);
-            color: white;
-        }
-        
-        .status.active {
-            background: rgba(59, 130, 246, 0.1);
-            color: var(--primary-800);
-            border: 1px solid var(--accent-500);
-        }
-        
-        .current-bid {
-            background: var(--primary-50);
-            padding: 20px;
-            border-radius: 16px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            border: 1px solid var(--primary-200);
-            margin-bottom: 20px;
-        }
-        
-        .current-bid .bid-details {
-            text-align: right;
-        }
-        
-        .current-bid .bid-amount {
-            font-size: 18px;
-            font-weight: 700;
-            color: var(--primary-900);
-        }
-        
-        .flash-messages {
-            margin-bottom: 20px;
-        }
-        
-        .flash-message {
-            padding: 12px 16px;
-            border-radius: 8px;
-            margin-bottom: 8px;
-        }
-        
-        .flash-success {
-            background: rgba(34, 197, 94, 0.1);
-            color: var(--success-500);
-            border: 1px solid rgba(34, 197, 94, 0.2);
-        }
-        
-        .flash-error {
-            background: rgba(239, 68, 68, 0.1);
-            color: var(--error-500);
-            border: 1px solid rgba(239, 68, 68, 0.2);
-        }
-    </style>
+    <link rel="stylesheet" href="{{ app_css_url }}">
 </head>
 <body>
     <div class="container">
@@ -901,11 +1462,20 @@ USER_DASHBOARD_TEMPLATE = """
         
         {% if auction.status == 'completed' %}
             <div class="status completed">
+                {% if auction.winning_restaurant %}
                 🎉 Today's winner: <strong>{{ auction.winning_restaurant }}</strong>
+                {% else %}
+                Today's auction closed with no bids
+                {% endif %}
+            </div>
+        {% elif auction.status == 'settling' %}
+            <div class="status active">
+                ⏳ Bidding closed with <span id="bid-count">…</span> bids - announcing the winner
             </div>
         {% else %}
             <div class="status active">
-                🔥 Auction in progress
+                🔥 Auction in progress - <span id="bid-count">…</span> bids placed
+                {% if cutoff %}· closes at {{ cutoff }}{% endif %}
             </div>
             
             <div class="card">
@@ -937,208 +1507,35 @@ USER_DASHBOARD_TEMPLATE = """
             </div>
         {% endif %}
     </div>
+    {% if auction.status != 'completed' %}
+    <script>
+        // Live progress; reload once the winner is announced
+        const events = new EventSource("{{ url_for('auction_events') }}");
+        const update = (e) => {
+            const state = JSON.parse(e.data);
+            if (state.status === "completed") {
+                events.close();
+                window.location.reload();
+                return;
+            }
+            document.getElementById("bid-count").textContent =
+                state.bid_count + "/" + state.bidder_count;
+        };
+        ["state", "bid", "settling", "completed"].forEach((name) => events.addEventListener(name, update));
+    </script>
+    {% endif %}
 </body>
 </html>
 """
 
 IDEAS_TEMPLATE = """
 <!DOCTYPE html>
-<html lang="en">
+<html lang="en" class="page-ideas">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🍽️ Restaurant Management</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        :root {
-            --primary-50: #f8fafc;
-            --primary-100: #f1f5f9;
-            --primary-200: #e2e8f0;
-            --primary-300: #cbd5e1;
-            --primary-400: #94a3b8;
-            --primary-500: #64748b;
-            --primary-600: #475569;
-            --primary-700: #334155;
-            --primary-800: #1e293b;
-            --primary-900: #0f172a;
-            --success-500: #22c55e;
-            --success-600: #16a34a;
-            --error-500: #ef4444;
-            --warning-500: #f59e0b;
-        }
-        
-        body {
-            font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-            background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
-            min-height: 100vh;
-            color: var(--primary-800);
-            line-height: 1.7;
-            font-size: 15px;
-        }
-        
-        .container {
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 32px 24px;
-        }
-        
-        .header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 32px;
-            padding-bottom: 24px;
-            border-bottom: 1px solid var(--primary-200);
-        }
-        
-        .header h1 {
-            font-size: 2rem;
-            font-weight: 600;
-            color: var(--primary-900);
-        }
-        
-        .nav-links {
-            display: flex;
-            gap: 12px;
-        }
-        
-        .nav-links a {
-            background: var(--primary-200);
-            color: var(--primary-700);
-            padding: 8px 16px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.2s ease;
-        }
-        
-        .nav-links a:hover {
-            background: var(--primary-300);
-            color: var(--primary-800);
-        }
-        
-        .card {
-            background: white;
-            border-radius: 20px;
-            padding: 32px;
-            box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-            border: 1px solid var(--primary-200);
-            margin-bottom: 24px;
-        }
-        
-        .card h2 {
-            font-size: 1.25rem;
-            font-weight: 600;
-            color: var(--primary-900);
-            margin-bottom: 20px;
-        }
-        
-        .add-form {
-            display: flex;
-            gap: 12px;
-            margin-bottom: 24px;
-        }
-        
-        .add-form input {
-            flex: 1;
-            padding: 12px 16px;
-            border: 1.5px solid var(--primary-300);
-            border-radius: 8px;
-            font-size: 15px;
-        }
-        
-        .btn {
-            background: var(--primary-900);
-            color: white;
-            border: none;
-            padding: 12px 20px;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s ease;
-        }
-        
-        .btn:hover {
-            background: var(--primary-800);
-        }
-        
-        .btn-small {
-            padding: 6px 12px;
-            font-size: 12px;
-            margin: 0 4px;
-        }
-        
-        .btn-success {
-            background: var(--success-500);
-        }
-        
-        .btn-success:hover {
-            background: var(--success-600);
-        }
-        
-        .btn-warning {
-            background: var(--warning-500);
-        }
-        
-        .btn-danger {
-            background: var(--error-500);
-        }
-        
-        .restaurants-list {
-            display: grid;
-            gap: 12px;
-        }
-        
-        .restaurant-item {
-            background: var(--primary-50);
-            padding: 16px;
-            border-radius: 12px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            border: 1px solid var(--primary-200);
-        }
-        
-        .restaurant-item.inactive {
-            opacity: 0.6;
-            background: var(--primary-100);
-        }
-        
-        .restaurant-name {
-            font-weight: 500;
-            color: var(--primary-900);
-        }
-        
-        .restaurant-actions {
-            display: flex;
-            gap: 8px;
-        }
-        
-        .flash-messages {
-            margin-bottom: 20px;
-        }
-        
-        .flash-message {
-            padding: 12px 16px;
-            border-radius: 8px;
-            margin-bottom: 8px;
-        }
-        
-        .flash-success {
-            background: rgba(34, 197, 94, 0.1);
-            color: var(--success-500);
-            border: 1px solid rgba(34, 197, 94, 0.2);
-        }
-        
-        .flash-error {
-            background: rgba(239, 68, 68, 0.1);
-            color: var(--error-500);
-            border: 1px solid rgba(239, 68, 68, 0.2);
-        }
-    </style>
+    <link rel="stylesheet" href="{{ app_css_url }}">
 </head>
 <body>
     <div class="container">
@@ -1200,365 +1597,12 @@ IDEAS_TEMPLATE = """
 
 ADMIN_TEMPLATE = """
 <!DOCTYPE html>
-<html lang="en">
+<html lang="en" class="page-admin">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🍽️ Team Lunch Auction</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        :root {
-            --primary-50: #f8fafc;
-            --primary-100: #f1f5f9;
-            --primary-200: #e2e8f0;
-            --primary-300: #cbd5e1;
-            --primary-400: #94a3b8;
-            --primary-500: #64748b;
-            --primary-600: #475569;
-            --primary-700: #334155;
-            --primary-800: #1e293b;
-            --primary-900: #0f172a;
-            
-            --accent-400: #60a5fa;
-            --accent-500: #3b82f6;
-            --accent-600: #2563eb;
-            
-            --success-400: #4ade80;
-            --success-500: #22c55e;
-            --success-600: #16a34a;
-            
-            --warning-400: #fbbf24;
-            --warning-500: #f59e0b;
-        }
-        
-        body {
-            font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
-            background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
-            min-height: 100vh;
-            color: var(--primary-800);
-            line-height: 1.7;
-            font-size: 15px;
-            letter-spacing: -0.025em;
-        }
-        
-        .container {
-            max-width: 1280px;
-            margin: 0 auto;
-            padding: 32px 24px;
-        }
-        
-        .header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 56px;
-            padding-bottom: 24px;
-            border-bottom: 1px solid var(--primary-200);
-        }
-        
-        .header > div:first-child {
-            text-align: left;
-        }
-        
-        .header h1 {
-            font-size: 2.75rem;
-            font-weight: 600;
-            margin-bottom: 16px;
-            color: var(--primary-900);
-            letter-spacing: -0.05em;
-        }
-        
-        .date-badge {
-            background: var(--primary-800);
-            color: white;
-            padding: 10px 20px;
-            border-radius: 24px;
-            display: inline-block;
-            font-weight: 500;
-            font-size: 14px;
-            letter-spacing: 0.025em;
-        }
-        
-        .grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 32px;
-            margin-bottom: 48px;
-        }
-        
-        .card {
-            background: white;
-            border-radius: 20px;
-            padding: 36px;
-            box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px -1px rgba(0, 0, 0, 0.1);
-            border: 1px solid var(--primary-200);
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }
-        
-        .card:hover {
-            box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .card h2 {
-            font-size: 1.375rem;
-            margin-bottom: 24px;
-            color: var(--primary-900);
-            font-weight: 600;
-            letter-spacing: -0.025em;
-        }
-        
-        .bid-form {
-            display: grid;
-            gap: 20px;
-        }
-        
-        select, input[type="text"], input[type="number"] {
-            padding: 14px 16px;
-            border: 1.5px solid var(--primary-300);
-            border-radius: 12px;
-            font-size: 15px;
-            transition: all 0.2s ease;
-            background: white;
-            color: var(--primary-800);
-            font-family: inherit;
-        }
-        
-        select:focus, input:focus {
-            outline: none;
-            border-color: var(--accent-500);
-            box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.08);
-        }
-        
-        .btn {
-            background: var(--primary-900);
-            color: white;
-            border: none;
-            padding: 16px 24px;
-            border-radius: 12px;
-            font-size: 15px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s ease;
-            font-family: inherit;
-            letter-spacing: -0.025em;
-        }
-        
-        .btn:hover {
-            background: var(--primary-800);
-            transform: translateY(-1px);
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -2px rgba(0, 0, 0, 0.1);
-        }
-        
-        .btn:active {
-            transform: translateY(0);
-        }
-        
-        .user-points {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-            gap: 16px;
-            margin-bottom: 20px;
-        }
-        
-        .user-card {
-            background: var(--primary-50);
-            padding: 18px 20px;
-            border-radius: 16px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            border: 1px solid var(--primary-200);
-            transition: all 0.2s ease;
-        }
-        
-        .user-card:hover {
-            background: var(--primary-100);
-            border-color: var(--primary-300);
-        }
-        
-        .user-card span:first-child {
-            font-weight: 500;
-            color: var(--primary-800);
-        }
-        
-        .points-badge {
-            background: var(--primary-800);
-            color: white;
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-weight: 600;
-            font-size: 13px;
-            letter-spacing: 0.025em;
-        }
-        
-        .bids-list {
-            display: grid;
-            gap: 12px;
-        }
-        
-        .bid-item {
-            background: var(--primary-50);
-            padding: 20px;
-            border-radius: 16px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            border: 1px solid var(--primary-200);
-            transition: all 0.2s ease;
-        }
-        
-        .bid-item:hover {
-            background: var(--primary-100);
-            border-color: var(--primary-300);
-        }
-        
-        .bid-item.winner {
-            background: var(--success-500);
-            color: white;
-            border-color: var(--success-600);
-        }
-        
-        .bid-item.winner:hover {
-            background: var(--success-600);
-        }
-        
-        .bid-restaurant {
-            font-weight: 600;
-            font-size: 16px;
-            color: var(--primary-900);
-            margin-bottom: 2px;
-        }
-        
-        .bid-item.winner .bid-restaurant {
-            color: white;
-        }
-        
-        .bid-user {
-            color: var(--primary-600);
-            font-size: 14px;
-        }
-        
-        .bid-item.winner .bid-user {
-            color: rgba(255, 255, 255, 0.9);
-        }
-        
-        .bid-details {
-            text-align: right;
-        }
-        
-        .bid-amount {
-            font-size: 18px;
-            font-weight: 700;
-            color: var(--primary-900);
-            margin-bottom: 2px;
-        }
-        
-        .bid-item.winner .bid-amount {
-            color: white;
-        }
-        
-        .status {
-            text-align: center;
-            padding: 24px;
-            margin: 32px 0;
-            border-radius: 16px;
-            font-size: 16px;
-            font-weight: 500;
-            letter-spacing: -0.025em;
-        }
-        
-        .status.completed {
-            background: var(--success-500);
-            color: white;
-            border: 1px solid var(--success-600);
-        }
-        
-        .status.active {
-            background: rgba(251, 191, 36, 0.1);
-            color: var(--primary-800);
-            border: 1px solid var(--warning-400);
-        }
-        
-        .winners-history {
-            margin-top: 48px;
-        }
-        
-        .winner-item {
-            background: white;
-            padding: 20px;
-            border-radius: 16px;
-            margin-bottom: 12px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            border: 1px solid var(--primary-200);
-            transition: all 0.2s ease;
-        }
-        
-        .winner-item:hover {
-            background: var(--primary-50);
-            border-color: var(--primary-300);
-        }
-        
-        .winner-item strong {
-            color: var(--primary-900);
-            font-weight: 600;
-        }
-        
-        .winner-item div:first-child {
-            color: var(--primary-700);
-        }
-        
-        .winner-item div:last-child {
-            color: var(--primary-600);
-            font-weight: 500;
-        }
-        
-        .admin-bid-form {
-            margin-top: 32px;
-            padding-top: 32px;
-            border-top: 1px solid var(--primary-200);
-        }
-        
-        .admin-bid-form h3 {
-            font-size: 1.25rem;
-            margin-bottom: 20px;
-            color: var(--primary-900);
-            font-weight: 600;
-        }
-        
-        .form-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr 1fr auto;
-            gap: 16px;
-            align-items: end;
-        }
-        
-        .form-group {
-            display: grid;
-            gap: 8px;
-        }
-        
-        .form-group label {
-            font-size: 14px;
-            font-weight: 500;
-            color: var(--primary-700);
-        }
-        
-        @media (max-width: 768px) {
-            .container { padding: 24px 16px; }
-            .grid { grid-template-columns: 1fr; gap: 24px; }
-            .user-points { grid-template-columns: 1fr; }
-            .header h1 { font-size: 2.25rem; }
-            .card { padding: 24px; }
-        }
-        
-        @media (max-width: 480px) {
-            .header h1 { font-size: 2rem; }
-            .card { padding: 20px; }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ app_css_url }}">
 </head>
 <body>
     <div class="container">
@@ -1569,18 +1613,28 @@ ADMIN_TEMPLATE = """
             </div>
             <div style="display: flex; gap: 12px;">
                 <a href="{{ url_for('manage_ideas') }}" style="background: var(--primary-200); color: var(--primary-700); padding: 8px 16px; border-radius: 8px; text-decoration: none; font-size: 14px; font-weight: 500;">Manage Ideas</a>
+                <a href="{{ url_for('history') }}" style="background: var(--primary-200); color: var(--primary-700); padding: 8px 16px; border-radius: 8px; text-decoration: none; font-size: 14px; font-weight: 500;">History</a>
                 <a href="{{ url_for('logout') }}" style="background: var(--primary-200); color: var(--primary-700); padding: 8px 16px; border-radius: 8px; text-decoration: none; font-size: 14px; font-weight: 500;">Logout</a>
             </div>
         </div>
         
         {% if auction.status == 'completed' %}
             <div class="status completed">
+                {% if bids %}
                 🎉 Today's winner: <strong>{{ auction.winning_restaurant }}</strong> 
                 ({{ bids[0].name }} - {{ auction.winning_bid }} points)
+                {% else %}
+                Today's auction closed with no bids
+                {% endif %}
+            </div>
+        {% elif auction.status == 'settling' %}
+            <div class="status active">
+                ⏳ Bidding closed with <span id="bid-count">{{ bids|length }}/{{ users|length }}</span> bids - announcing the winner
             </div>
         {% else %}
             <div class="status active">
-                🔥 Auction in progress - {{ bids|length }}/{{ users|length }} bids placed
+                🔥 Auction in progress - <span id="bid-count">{{ bids|length }}/{{ users|length }}</span> bids placed
+                {% if cutoff %}· closes at {{ cutoff }}{% endif %}
             </div>
         {% endif %}
         
@@ -1598,7 +1652,7 @@ ADMIN_TEMPLATE = """
                 
                 <div class="admin-bid-form">
                     <h3>🎯 Place Bid for User</h3>
-                    {% if auction.status != 'completed' %}
+                    {% if auction.status == 'active' %}
                     <form method="POST" action="/admin/bid" class="form-grid">
                         <div class="form-group">
                             <label for="user_id">Select User</label>
@@ -1669,17 +1723,1005 @@ ADMIN_TEMPLATE = """
         </div>
         {% endif %}
     </div>
+    {% if auction.status != 'completed' %}
+    <script>
+        // Live leaderboard; reload once the auction settles
+        const events = new EventSource("{{ url_for('auction_events') }}");
+        const renderBid = (bid) => {
+            const item = document.createElement("div");
+            item.className = "bid-item";
+            item.innerHTML =
+                '<div><div class="bid-restaurant"></div><div class="bid-user"></div></div>' +
+                '<div class="bid-details"><div class="bid-amount"></div></div>';
+            item.querySelector(".bid-restaurant").textContent = bid.restaurant;
+            item.querySelector(".bid-user").textContent = bid.name;
+            item.querySelector(".bid-amount").textContent = bid.bid_amount + " pts";
+            return item;
+        };
+        const update = (e) => {
+            const state = JSON.parse(e.data);
+            if (state.status === "completed") {
+                events.close();
+                window.location.reload();
+                return;
+            }
+            document.getElementById("bid-count").textContent =
+                state.bid_count + "/" + state.bidder_count;
+            document.querySelector(".bids-list").replaceChildren(...state.leaderboard.map(renderBid));
+        };
+        ["state", "bid", "settling", "completed"].forEach((name) => events.addEventListener(name, update));
+    </script>
+    {% endif %}
 </body>
 </html>
 """
 
+HISTORY_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en" class="page-admin page-history">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>🍽️ Team Lunch Auction - History</title>
+    <link rel="stylesheet" href="{{ app_css_url }}">
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <div>
+                <h1>🍽️ Auction History</h1>
+                <div class="date-badge">Points cycle {{ cycle }}</div>
+            </div>
+            <div style="display: flex; gap: 12px;">
+                <a href="{{ url_for('admin') }}" style="background: var(--primary-200); color: var(--primary-700); padding: 8px 16px; border-radius: 8px; text-decoration: none; font-size: 14px; font-weight: 500;">← Back to Admin</a>
+                <a href="{{ url_for('logout') }}" style="background: var(--primary-200); color: var(--primary-700); padding: 8px 16px; border-radius: 8px; text-decoration: none; font-size: 14px; font-weight: 500;">Logout</a>
+            </div>
+        </div>
+
+        <div class="card">
+            <h2>👥 Bidders</h2>
+            <table class="stats-table">
+                <thead>
+                    <tr>
+                        <th>Name</th>
+                        <th>Auctions</th>
+                        <th>Wins</th>
+                        <th>Win rate</th>
+                        <th>Avg winning bid</th>
+                        <th>Points spent</th>
+                        <th>This cycle</th>
+                        <th>Avg / cycle</th>
+                        <th>Last win</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for user in users %}
+                    <tr>
+                        <td>{{ user.name }}</td>
+                        <td>{{ user.auctions_entered }}</td>
+                        <td>{{ user.wins }}</td>
+                        <td>{{ "%.0f%%"|format(100 * user.wins / user.auctions_entered) }}</td>
+                        <td>{{ "%.1f"|format(user.winning_points / user.wins) if user.wins else "-" }}</td>
+                        <td>{{ user.points_spent }}</td>
+                        <td>{{ user.cycle_spent }}</td>
+                        <td>{{ "%.1f"|format(user.avg_cycle_spent) if user.avg_cycle_spent is not none else "-" }}</td>
+                        <td>{{ user.last_win_date or "-" }}</td>
+                    </tr>
+                    {% else %}
+                    <tr><td colspan="9">No auctions settled yet.</td></tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+
+        <div class="grid">
+            <div class="card">
+                <h2>🍕 Restaurants</h2>
+                <table class="stats-table">
+                    <thead>
+                        <tr>
+                            <th>Restaurant</th>
+                            <th>Bids</th>
+                            <th>Wins</th>
+                            <th>Avg winning bid</th>
+                            <th>Last won</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for r in restaurants %}
+                        <tr>
+                            <td>{{ r.restaurant }}</td>
+                            <td>{{ r.bids }}</td>
+                            <td>{{ r.wins }}</td>
+                            <td>{{ "%.1f"|format(r.winning_points / r.wins) if r.wins else "-" }}</td>
+                            <td>{{ r.last_won or "-" }}</td>
+                        </tr>
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+
+            <div class="card">
+                <h2>📈 Popularity by Month</h2>
+                <table class="stats-table">
+                    <thead>
+                        <tr>
+                            <th>Month</th>
+                            <th>Restaurant</th>
+                            <th>Bids</th>
+                            <th>Wins</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {% for month, rows in monthly|groupby("month")|reverse %}
+                        {% for r in rows %}
+                        <tr>
+                            <td>{{ month if loop.first }}</td>
+                            <td>{{ r.restaurant }}</td>
+                            <td>{{ r.bids }}</td>
+                            <td>{{ r.wins }}</td>
+                        </tr>
+                        {% endfor %}
+                        {% endfor %}
+                    </tbody>
+                </table>
+            </div>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+# Shared stylesheet for every page. Each page's rules are scoped with the
+# zero-specificity :where(.page-*) selector, so the cascade on each page is
+# exactly what it was when the styles were inlined.
+APP_CSS = """
+* { margin: 0; padding: 0; box-sizing: border-box; }
+
+/* login */
+:root:where(.page-login) {
+    --primary-50: #f8fafc;
+    --primary-100: #f1f5f9;
+    --primary-200: #e2e8f0;
+    --primary-300: #cbd5e1;
+    --primary-400: #94a3b8;
+    --primary-500: #64748b;
+    --primary-600: #475569;
+    --primary-700: #334155;
+    --primary-800: #1e293b;
+    --primary-900: #0f172a;
+    --accent-500: #3b82f6;
+    --success-500: #22c55e;
+    --error-500: #ef4444;
+}
+:where(.page-login) body {
+    font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+    background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
+    min-height: 100vh;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: var(--primary-800);
+}
+:where(.page-login) .login-container {
+    background: white;
+    border-radius: 20px;
+    padding: 48px;
+    box-shadow: 0 10px 25px rgba(0, 0, 0, 0.1);
+    border: 1px solid var(--primary-200);
+    width: 100%;
+    max-width: 400px;
+}
+:where(.page-login) .login-header {
+    text-align: center;
+    margin-bottom: 32px;
+}
+:where(.page-login) .login-header h1 {
+    font-size: 2rem;
+    font-weight: 600;
+    color: var(--primary-900);
+    margin-bottom: 8px;
+}
+:where(.page-login) .login-header p {
+    color: var(--primary-600);
+    font-size: 15px;
+}
+:where(.page-login) .login-form {
+    display: grid;
+    gap: 20px;
+}
+:where(.page-login) .form-group {
+    display: grid;
+    gap: 8px;
+}
+:where(.page-login) .form-group label {
+    font-weight: 500;
+    color: var(--primary-700);
+    font-size: 14px;
+}
+:where(.page-login) .form-group input {
+    padding: 14px 16px;
+    border: 1.5px solid var(--primary-300);
+    border-radius: 12px;
+    font-size: 15px;
+    transition: all 0.2s ease;
+    background: white;
+    color: var(--primary-800);
+    font-family: inherit;
+}
+:where(.page-login) .form-group input:focus {
+    outline: none;
+    border-color: var(--accent-500);
+    box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.08);
+}
+:where(.page-login) .btn {
+    background: var(--primary-900);
+    color: white;
+    border: none;
+    padding: 16px 24px;
+    border-radius: 12px;
+    font-size: 15px;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.2s ease;
+    font-family: inherit;
+}
+:where(.page-login) .btn:hover {
+    background: var(--primary-800);
+    transform: translateY(-1px);
+}
+:where(.page-login) .flash-messages {
+    margin-bottom: 20px;
+}
+:where(.page-login) .flash-error {
+    background: rgba(239, 68, 68, 0.1);
+    color: var(--error-500);
+    padding: 12px;
+    border-radius: 8px;
+    border: 1px solid rgba(239, 68, 68, 0.2);
+    font-size: 14px;
+}
+:where(.page-login) .demo-info {
+    margin-top: 24px;
+    padding: 16px;
+    background: var(--primary-50);
+    border-radius: 12px;
+    border: 1px solid var(--primary-200);
+}
+:where(.page-login) .demo-info h3 {
+    font-size: 14px;
+    font-weight: 600;
+    color: var(--primary-800);
+    margin-bottom: 8px;
+}
+:where(.page-login) .demo-info p {
+    font-size: 13px;
+    color: var(--primary-600);
+    margin-bottom: 4px;
+}
+
+/* dashboard */
+:root:where(.page-dashboard) {
+    --primary-50: #f8fafc;
+    --primary-100: #f1f5f9;
+    --primary-200: #e2e8f0;
+    --primary-300: #cbd5e1;
+    --primary-400: #94a3b8;
+    --primary-500: #64748b;
+    --primary-600: #475569;
+    --primary-700: #334155;
+    --primary-800: #1e293b;
+    --primary-900: #0f172a;
+    --accent-500: #3b82f6;
+    --success-500: #22c55e;
+    --error-500: #ef4444;
+}
+:where(.page-dashboard) body {
+    font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+    background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
+    min-height: 100vh;
+    color: var(--primary-800);
+    line-height: 1.7;
+}
+:where(.page-dashboard) .container {
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 32px 24px;
+}
+:where(.page-dashboard) .header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 32px;
+    padding-bottom: 24px;
+    border-bottom: 1px solid var(--primary-200);
+}
+:where(.page-dashboard) .header h1 {
+    font-size: 2rem;
+    font-weight: 600;
+    color: var(--primary-900);
+}
+:where(.page-dashboard) .nav-links {
+    display: flex;
+    gap: 12px;
+}
+:where(.page-dashboard) .nav-links a {
+    background: var(--primary-200);
+    color: var(--primary-700);
+    padding: 8px 16px;
+    border-radius: 8px;
+    text-decoration: none;
+    font-size: 14px;
+    font-weight: 500;
+    transition: all 0.2s ease;
+}
+:where(.page-dashboard) .nav-links a:hover {
+    background: var(--primary-300);
+    color: var(--primary-800);
+}
+:where(.page-dashboard) .card {
+    background: white;
+    border-radius: 20px;
+    padding: 32px;
+    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    border: 1px solid var(--primary-200);
+    margin-bottom: 24px;
+}
+:where(.page-dashboard) .card h2 {
+    font-size: 1.25rem;
+    font-weight: 600;
+    color: var(--primary-900);
+    margin-bottom: 20px;
+}
+:where(.page-dashboard) .bid-form {
+    display: grid;
+    gap: 20px;
+}
+:where(.page-dashboard) select, :where(.page-dashboard) input[type="number"] {
+    padding: 12px 16px;
+    border: 1.5px solid var(--primary-300);
+    border-radius: 8px;
+    font-size: 15px;
+}
+:where(.page-dashboard) .btn {
+    background: var(--primary-900);
+    color: white;
+    border: none;
+    padding: 12px 20px;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.2s ease;
+}
+:where(.page-dashboard) .btn:hover {
+    background: var(--primary-800);
+}
+:where(.page-dashboard) .points-badge {
+    background: var(--primary-800);
+    color: white;
+    padding: 6px 14px;
+    border-radius: 20px;
+    font-weight: 600;
+    font-size: 13px;
+}
+:where(.page-dashboard) .status {
+    text-align: center;
+    padding: 24px;
+    margin: 32px 0;
+    border-radius: 16px;
+    font-size: 16px;
+    font-weight: 500;
+}
+:where(.page-dashboard) .status.completed {
+    background: var(--success-500);
+    color: white;
+}
+:where(.page-dashboard) .status.active {
+    background: rgba(59, 130, 246, 0.1);
+    color: var(--primary-800);
+    border: 1px solid var(--accent-500);
+}
+:where(.page-dashboard) .current-bid {
+    background: var(--primary-50);
+    padding: 20px;
+    border-radius: 16px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border: 1px solid var(--primary-200);
+    margin-bottom: 20px;
+}
+:where(.page-dashboard) .current-bid .bid-details {
+    text-align: right;
+}
+:where(.page-dashboard) .current-bid .bid-amount {
+    font-size: 18px;
+    font-weight: 700;
+    color: var(--primary-900);
+}
+:where(.page-dashboard) .flash-messages {
+    margin-bottom: 20px;
+}
+:where(.page-dashboard) .flash-message {
+    padding: 12px 16px;
+    border-radius: 8px;
+    margin-bottom: 8px;
+}
+:where(.page-dashboard) .flash-success {
+    background: rgba(34, 197, 94, 0.1);
+    color: var(--success-500);
+    border: 1px solid rgba(34, 197, 94, 0.2);
+}
+:where(.page-dashboard) .flash-error {
+    background: rgba(239, 68, 68, 0.1);
+    color: var(--error-500);
+    border: 1px solid rgba(239, 68, 68, 0.2);
+}
+
+/* ideas */
+:root:where(.page-ideas) {
+    --primary-50: #f8fafc;
+    --primary-100: #f1f5f9;
+    --primary-200: #e2e8f0;
+    --primary-300: #cbd5e1;
+    --primary-400: #94a3b8;
+    --primary-500: #64748b;
+    --primary-600: #475569;
+    --primary-700: #334155;
+    --primary-800: #1e293b;
+    --primary-900: #0f172a;
+    --success-500: #22c55e;
+    --success-600: #16a34a;
+    --error-500: #ef4444;
+    --warning-500: #f59e0b;
+}
+:where(.page-ideas) body {
+    font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
+    background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
+    min-height: 100vh;
+    color: var(--primary-800);
+    line-height: 1.7;
+    font-size: 15px;
+}
+:where(.page-ideas) .container {
+    max-width: 800px;
+    margin: 0 auto;
+    padding: 32px 24px;
+}
+:where(.page-ideas) .header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 32px;
+    padding-bottom: 24px;
+    border-bottom: 1px solid var(--primary-200);
+}
+:where(.page-ideas) .header h1 {
+    font-size: 2rem;
+    font-weight: 600;
+    color: var(--primary-900);
+}
+:where(.page-ideas) .nav-links {
+    display: flex;
+    gap: 12px;
+}
+:where(.page-ideas) .nav-links a {
+    background: var(--primary-200);
+    color: var(--primary-700);
+    padding: 8px 16px;
+    border-radius: 8px;
+    text-decoration: none;
+    font-size: 14px;
+    font-weight: 500;
+    transition: all 0.2s ease;
+}
+:where(.page-ideas) .nav-links a:hover {
+    background: var(--primary-300);
+    color: var(--primary-800);
+}
+:where(.page-ideas) .card {
+    background: white;
+    border-radius: 20px;
+    padding: 32px;
+    box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
+    border: 1px solid var(--primary-200);
+    margin-bottom: 24px;
+}
+:where(.page-ideas) .card h2 {
+    font-size: 1.25rem;
+    font-weight: 600;
+    color: var(--primary-900);
+    margin-bottom: 20px;
+}
+:where(.page-ideas) .add-form {
+    display: flex;
+    gap: 12px;
+    margin-bottom: 24px;
+}
+:where(.page-ideas) .add-form input {
+    flex: 1;
+    padding: 12px 16px;
+    border: 1.5px solid var(--primary-300);
+    border-radius: 8px;
+    font-size: 15px;
+}
+:where(.page-ideas) .btn {
+    background: var(--primary-900);
+    color: white;
+    border: none;
+    padding: 12px 20px;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.2s ease;
+}
+:where(.page-ideas) .btn:hover {
+    background: var(--primary-800);
+}
+:where(.page-ideas) .btn-small {
+    padding: 6px 12px;
+    font-size: 12px;
+    margin: 0 4px;
+}
+:where(.page-ideas) .btn-success {
+    background: var(--success-500);
+}
+:where(.page-ideas) .btn-success:hover {
+    background: var(--success-600);
+}
+:where(.page-ideas) .btn-warning {
+    background: var(--warning-500);
+}
+:where(.page-ideas) .btn-danger {
+    background: var(--error-500);
+}
+:where(.page-ideas) .restaurants-list {
+    display: grid;
+    gap: 12px;
+}
+:where(.page-ideas) .restaurant-item {
+    background: var(--primary-50);
+    padding: 16px;
+    border-radius: 12px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border: 1px solid var(--primary-200);
+}
+:where(.page-ideas) .restaurant-item.inactive {
+    opacity: 0.6;
+    background: var(--primary-100);
+}
+:where(.page-ideas) .restaurant-name {
+    font-weight: 500;
+    color: var(--primary-900);
+}
+:where(.page-ideas) .restaurant-actions {
+    display: flex;
+    gap: 8px;
+}
+:where(.page-ideas) .flash-messages {
+    margin-bottom: 20px;
+}
+:where(.page-ideas) .flash-message {
+    padding: 12px 16px;
+    border-radius: 8px;
+    margin-bottom: 8px;
+}
+:where(.page-ideas) .flash-success {
+    background: rgba(34, 197, 94, 0.1);
+    color: var(--success-500);
+    border: 1px solid rgba(34, 197, 94, 0.2);
+}
+:where(.page-ideas) .flash-error {
+    background: rgba(239, 68, 68, 0.1);
+    color: var(--error-500);
+    border: 1px solid rgba(239, 68, 68, 0.2);
+}
+
+/* admin */
+:root:where(.page-admin) {
+    --primary-50: #f8fafc;
+    --primary-100: #f1f5f9;
+    --primary-200: #e2e8f0;
+    --primary-300: #cbd5e1;
+    --primary-400: #94a3b8;
+    --primary-500: #64748b;
+    --primary-600: #475569;
+    --primary-700: #334155;
+    --primary-800: #1e293b;
+    --primary-900: #0f172a;
+    --accent-400: #60a5fa;
+    --accent-500: #3b82f6;
+    --accent-600: #2563eb;
+    --success-400: #4ade80;
+    --success-500: #22c55e;
+    --success-600: #16a34a;
+    --warning-400: #fbbf24;
+    --warning-500: #f59e0b;
+}
+:where(.page-admin) body {
+    font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji";
+    background: linear-gradient(to bottom right, var(--primary-50), var(--primary-100));
+    min-height: 100vh;
+    color: var(--primary-800);
+    line-height: 1.7;
+    font-size: 15px;
+    letter-spacing: -0.025em;
+}
+:where(.page-admin) .container {
+    max-width: 1280px;
+    margin: 0 auto;
+    padding: 32px 24px;
+}
+:where(.page-admin) .header {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    margin-bottom: 56px;
+    padding-bottom: 24px;
+    border-bottom: 1px solid var(--primary-200);
+}
+:where(.page-admin) .header > div:first-child {
+    text-align: left;
+}
+:where(.page-admin) .header h1 {
+    font-size: 2.75rem;
+    font-weight: 600;
+    margin-bottom: 16px;
+    color: var(--primary-900);
+    letter-spacing: -0.05em;
+}
+:where(.page-admin) .date-badge {
+    background: var(--primary-800);
+    color: white;
+    padding: 10px 20px;
+    border-radius: 24px;
+    display: inline-block;
+    font-weight: 500;
+    font-size: 14px;
+    letter-spacing: 0.025em;
+}
+:where(.page-admin) .grid {
+    display: grid;
+    grid-template-columns: 1fr 1fr;
+    gap: 32px;
+    margin-bottom: 48px;
+}
+:where(.page-admin) .card {
+    background: white;
+    border-radius: 20px;
+    padding: 36px;
+    box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.1), 0 1px 2px -1px rgba(0, 0, 0, 0.1);
+    border: 1px solid var(--primary-200);
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+}
+:where(.page-admin) .card:hover {
+    box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -4px rgba(0, 0, 0, 0.1);
+}
+:where(.page-admin) .card h2 {
+    font-size: 1.375rem;
+    margin-bottom: 24px;
+    color: var(--primary-900);
+    font-weight: 600;
+    letter-spacing: -0.025em;
+}
+:where(.page-admin) .bid-form {
+    display: grid;
+    gap: 20px;
+}
+:where(.page-admin) select, :where(.page-admin) input[type="text"], :where(.page-admin) input[type="number"] {
+    padding: 14px 16px;
+    border: 1.5px solid var(--primary-300);
+    border-radius: 12px;
+    font-size: 15px;
+    transition: all 0.2s ease;
+    background: white;
+    color: var(--primary-800);
+    font-family: inherit;
+}
+:where(.page-admin) select:focus, :where(.page-admin) input:focus {
+    outline: none;
+    border-color: var(--accent-500);
+    box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.08);
+}
+:where(.page-admin) .btn {
+    background: var(--primary-900);
+    color: white;
+    border: none;
+    padding: 16px 24px;
+    border-radius: 12px;
+    font-size: 15px;
+    font-weight: 600;
+    cursor: pointer;
+    transition: all 0.2s ease;
+    font-family: inherit;
+    letter-spacing: -0.025em;
+}
+:where(.page-admin) .btn:hover {
+    background: var(--primary-800);
+    transform: translateY(-1px);
+    box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -2px rgba(0, 0, 0, 0.1);
+}
+:where(.page-admin) .btn:active {
+    transform: translateY(0);
+}
+:where(.page-admin) .user-points {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+    gap: 16px;
+    margin-bottom: 20px;
+}
+:where(.page-admin) .user-card {
+    background: var(--primary-50);
+    padding: 18px 20px;
+    border-radius: 16px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border: 1px solid var(--primary-200);
+    transition: all 0.2s ease;
+}
+:where(.page-admin) .user-card:hover {
+    background: var(--primary-100);
+    border-color: var(--primary-300);
+}
+:where(.page-admin) .user-card span:first-child {
+    font-weight: 500;
+    color: var(--primary-800);
+}
+:where(.page-admin) .points-badge {
+    background: var(--primary-800);
+    color: white;
+    padding: 6px 14px;
+    border-radius: 20px;
+    font-weight: 600;
+    font-size: 13px;
+    letter-spacing: 0.025em;
+}
+:where(.page-admin) .bids-list {
+    display: grid;
+    gap: 12px;
+}
+:where(.page-admin) .bid-item {
+    background: var(--primary-50);
+    padding: 20px;
+    border-radius: 16px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border: 1px solid var(--primary-200);
+    transition: all 0.2s ease;
+}
+:where(.page-admin) .bid-item:hover {
+    background: var(--primary-100);
+    border-color: var(--primary-300);
+}
+:where(.page-admin) .bid-item.winner {
+    background: var(--success-500);
+    color: white;
+    border-color: var(--success-600);
+}
+:where(.page-admin) .bid-item.winner:hover {
+    background: var(--success-600);
+}
+:where(.page-admin) .bid-restaurant {
+    font-weight: 600;
+    font-size: 16px;
+    color: var(--primary-900);
+    margin-bottom: 2px;
+}
+:where(.page-admin) .bid-item.winner .bid-restaurant {
+    color: white;
+}
+:where(.page-admin) .bid-user {
+    color: var(--primary-600);
+    font-size: 14px;
+}
+:where(.page-admin) .bid-item.winner .bid-user {
+    color: rgba(255, 255, 255, 0.9);
+}
+:where(.page-admin) .bid-details {
+    text-align: right;
+}
+:where(.page-admin) .bid-amount {
+    font-size: 18px;
+    font-weight: 700;
+    color: var(--primary-900);
+    margin-bottom: 2px;
+}
+:where(.page-admin) .bid-item.winner .bid-amount {
+    color: white;
+}
+:where(.page-admin) .status {
+    text-align: center;
+    padding: 24px;
+    margin: 32px 0;
+    border-radius: 16px;
+    font-size: 16px;
+    font-weight: 500;
+    letter-spacing: -0.025em;
+}
+:where(.page-admin) .status.completed {
+    background: var(--success-500);
+    color: white;
+    border: 1px solid var(--success-600);
+}
+:where(.page-admin) .status.active {
+    background: rgba(251, 191, 36, 0.1);
+    color: var(--primary-800);
+    border: 1px solid var(--warning-400);
+}
+:where(.page-admin) .winners-history {
+    margin-top: 48px;
+}
+:where(.page-admin) .winner-item {
+    background: white;
+    padding: 20px;
+    border-radius: 16px;
+    margin-bottom: 12px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    border: 1px solid var(--primary-200);
+    transition: all 0.2s ease;
+}
+:where(.page-admin) .winner-item:hover {
+    background: var(--primary-50);
+    border-color: var(--primary-300);
+}
+:where(.page-admin) .winner-item strong {
+    color: var(--primary-900);
+    font-weight: 600;
+}
+:where(.page-admin) .winner-item div:first-child {
+    color: var(--primary-700);
+}
+:where(.page-admin) .winner-item div:last-child {
+    color: var(--primary-600);
+    font-weight: 500;
+}
+:where(.page-admin) .admin-bid-form {
+    margin-top: 32px;
+    padding-top: 32px;
+    border-top: 1px solid var(--primary-200);
+}
+:where(.page-admin) .admin-bid-form h3 {
+    font-size: 1.25rem;
+    margin-bottom: 20px;
+    color: var(--primary-900);
+    font-weight: 600;
+}
+:where(.page-admin) .form-grid {
+    display: grid;
+    grid-template-columns: 1fr 1fr 1fr auto;
+    gap: 16px;
+    align-items: end;
+}
+:where(.page-admin) .form-group {
+    display: grid;
+    gap: 8px;
+}
+:where(.page-admin) .form-group label {
+    font-size: 14px;
+    font-weight: 500;
+    color: var(--primary-700);
+}
+@media (max-width: 768px) {
+    :where(.page-admin) .container {
+        padding: 24px 16px;
+    }
+    :where(.page-admin) .grid {
+        grid-template-columns: 1fr;
+        gap: 24px;
+    }
+    :where(.page-admin) .user-points {
+        grid-template-columns: 1fr;
+    }
+    :where(.page-admin) .header h1 {
+        font-size: 2.25rem;
+    }
+    :where(.page-admin) .card {
+        padding: 24px;
+    }
+}
+@media (max-width: 480px) {
+    :where(.page-admin) .header h1 {
+        font-size: 2rem;
+    }
+    :where(.page-admin) .card {
+        padding: 20px;
+    }
+}
+
+/* history (also uses the admin rules) */
+:where(.page-history) .stats-table {
+    width: 100%;
+    border-collapse: collapse;
+    font-size: 14px;
+}
+:where(.page-history) .stats-table th {
+    text-align: left;
+    color: var(--primary-600);
+    font-weight: 500;
+    padding: 8px 12px;
+    border-bottom: 1px solid var(--primary-200);
+}
+:where(.page-history) .stats-table td {
+    padding: 10px 12px;
+    border-bottom: 1px solid var(--primary-100);
+}
+:where(.page-history) .stats-table tbody tr:hover {
+    background: var(--primary-50);
+}
+"""
+
+
+class StaticAsset:
+    """Content-hashed asset with precompressed variants, built once at startup."""
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.variants = {"gzip": gzip.compress(body, 9, mtime=0), None: body}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body)
+
+    def response(self):
+        accepted = request.accept_encodings
+        encoding = next(
+            (name for name in ("br", "gzip") if name in self.variants and accepted[name]),
+            None,
+        )
+        response = Response(self.variants[encoding], mimetype=self.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        response.set_etag(self.digest)
+        return response.make_conditional(request)
+
+
+app_css = StaticAsset(APP_CSS.encode(), "text/css")
+
+
+@app.route("/assets/app.<digest>.css")
+def app_stylesheet(digest):
+    # Old hashes redirect so stale cached pages still get styled
+    if digest != app_css.digest:
+        return redirect(url_for("app_stylesheet", digest=app_css.digest))
+    return app_css.response()
+
+
+@app.context_processor
+def inject_assets():
+    return {"app_css_url": url_for("app_stylesheet", digest=app_css.digest)}
+
+
+# Compile every page once at startup; render_template then reuses the
+# compiled templates from the environment's cache
+app.jinja_env.loader = ChoiceLoader(
+    [
+        DictLoader(
+            {
+                "login.html": LOGIN_TEMPLATE,
+                "dashboard.html": USER_DASHBOARD_TEMPLATE,
+                "ideas.html": IDEAS_TEMPLATE,
+                "admin.html": ADMIN_TEMPLATE,
+                "history.html": HISTORY_TEMPLATE,
+            }
+        ),
+        app.jinja_env.loader,
+    ]
+)
+for template_name in app.jinja_env.loader.loaders[0].list_templates():
+    app.jinja_env.get_template(template_name)
+
 if __name__ == "__main__":
     # Check for database in data directory or current directory
-    db_path = (
-        os.path.join("data", "lunch_auction.db")
-        if os.path.exists("data")
-        else "lunch_auction.db"
-    )
+    db_path = get_db_path()
 
     if not os.path.exists(db_path):
         print("Database not found. Running setup...")
@@ -1688,4 +2730,9 @@ if __name__ == "__main__":
         setup_database()
         print("Database initialized successfully!")
 
+    # The reloader's parent process only watches files; the serving child
+    # runs the scheduler so auctions close at the cutoff without any traffic
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        scheduler.start()
+
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -1,19 +1,33 @@
+import argparse
+import os
+import re
 import sqlite3
+import tempfile
 from datetime import datetime
 
+DEFAULT_TENANT = "default"
+TENANT_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
 
-def setup_database():
+
+def data_dir():
     # Use data directory for database persistence in Docker
-    import os
+    return "data" if os.path.exists("data") else ""
 
-    db_path = (
-        os.path.join("data", "lunch_auction.db")
-        if os.path.exists("data")
-        else "lunch_auction.db"
-    )
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
 
+def tenants_dir():
+    return os.path.join(data_dir(), "tenants")
+
+
+def tenant_db_path(tenant=DEFAULT_TENANT):
+    """SQLite file for a tenant; each office or team gets its own shard."""
+    if tenant == DEFAULT_TENANT:
+        return os.path.join(data_dir(), "lunch_auction.db")
+    if not TENANT_NAME.match(tenant):
+        raise ValueError(f"Invalid tenant name: {tenant!r}")
+    return os.path.join(tenants_dir(), f"{tenant}.db")
+
+
+def create_schema(cursor):
     # Check if users table exists and get its schema
     cursor.execute("PRAGMA table_info(users)")
     columns = [row[1] for row in cursor.fetchall()]
@@ -80,6 +94,121 @@ def setup_database():
         )
     """)
 
+    # Summary tables maintained at settlement so history pages never scan bids
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            auctions_entered INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            points_bid INTEGER NOT NULL DEFAULT 0,
+            points_spent INTEGER NOT NULL DEFAULT 0,
+            winning_points INTEGER NOT NULL DEFAULT 0,
+            last_win_date DATE,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_cycle_stats (
+            cycle INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            points_spent INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (cycle, user_id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS restaurant_stats (
+            restaurant TEXT PRIMARY KEY,
+            bids INTEGER NOT NULL DEFAULT 0,
+            points_bid INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            winning_points INTEGER NOT NULL DEFAULT 0,
+            last_won DATE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS restaurant_monthly_stats (
+            month TEXT NOT NULL,
+            restaurant TEXT NOT NULL,
+            bids INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, restaurant)
+        )
+    """)
+
+    # Small key/value store; points_cycle counts point resets
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS app_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO app_state (key, value) VALUES ('points_cycle', 1)")
+
+    migrate(cursor)
+
+
+# Schema changes applied in order after the base tables exist. PRAGMA
+# user_version records the last one applied, so append new entries and never
+# edit shipped ones.
+MIGRATIONS = [
+    (
+        1,
+        "Indexes for the hot auction queries",
+        [
+            # Settlement and the reset check filter non-admins by balance
+            "CREATE INDEX IF NOT EXISTS idx_users_admin_points"
+            " ON users (is_admin, current_points)",
+            # Recent winners and the stats backfill: completed auctions by date
+            "CREATE INDEX IF NOT EXISTS idx_auctions_status_date"
+            " ON auctions (status, date)",
+            # Winner selection walks an auction's bids highest first
+            "CREATE INDEX IF NOT EXISTS idx_bids_auction_amount"
+            " ON bids (auction_id, bid_amount DESC, created_at, id)",
+            # Restaurant dropdowns list active ideas by name
+            "CREATE INDEX IF NOT EXISTS idx_ideas_active_name"
+            " ON ideas (is_active, name)",
+            # History averages a user's spend over earlier cycles
+            "CREATE INDEX IF NOT EXISTS idx_user_cycle_stats_user"
+            " ON user_cycle_stats (user_id, cycle, points_spent)",
+        ],
+    ),
+]
+
+
+def migrate(cursor):
+    """Apply pending MIGRATIONS; safe to run on every start."""
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for number, _description, statements in MIGRATIONS:
+        if number <= version:
+            continue
+        # A savepoint keeps each migration atomic whether or not the caller
+        # already opened a transaction
+        cursor.execute(f"SAVEPOINT migration_{number}")
+        try:
+            for sql in statements:
+                cursor.execute(sql)
+            cursor.execute(f"PRAGMA user_version = {number}")
+        except Exception:
+            cursor.execute(f"ROLLBACK TO migration_{number}")
+            cursor.execute(f"RELEASE migration_{number}")
+            raise
+        cursor.execute(f"RELEASE migration_{number}")
+
+
+def setup_database(tenant=DEFAULT_TENANT):
+    db_path = tenant_db_path(tenant)
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    create_schema(cursor)
+
     # Insert sample users with passwords (you can modify these)
     sample_users = [
         ("Alice", "alice123", False),
@@ -135,5 +264,114 @@ def setup_database():
     print("Database setup complete!")
 
 
-if __name__ == "__main__":
+# Statements that read a whole table on purpose, matched by prefix
+FULL_SCANS = (
+    # The auction engine loads the roster once per day
+    "SELECT id, name, current_points, is_admin FROM users",
+    # The history page and the ideas admin list every row
+    "SELECT u.name, s.auctions_entered",
+    "SELECT * FROM restaurant_stats",
+    "SELECT * FROM ideas ORDER BY name",
+)
+
+
+def check_query_plans():
+    """Run every page and action of main.py against a scratch database and
+    report statements whose EXPLAIN QUERY PLAN scans a table without an index.
+    """
+    os.chdir(tempfile.mkdtemp(prefix="lunch-plans-"))
     setup_database()
+    import main
+
+    statements = []
+    connect_db = main.connect_db
+
+    def traced_connect(*args, **kwargs):
+        conn = connect_db(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    main.connect_db = traced_connect
+    # Accept bids whatever the time of day
+    main.app.config["AUCTION_CUTOFF"] = ""
+    client = main.app.test_client()
+
+    def login(name, password):
+        client.get("/logout")
+        client.post("/login", data={"username": name, "password": password})
+
+    login("Admin", "admin123")
+    for path in ("/admin", "/history", "/ideas"):
+        client.get(path)
+    client.post("/ideas/add", data={"name": "Plan Check Cafe"})
+    conn = sqlite3.connect(main.get_db_path())
+    idea_id = conn.execute(
+        "SELECT id FROM ideas WHERE name = 'Plan Check Cafe'"
+    ).fetchone()[0]
+    client.post(f"/ideas/toggle/{idea_id}")
+    client.post(f"/ideas/delete/{idea_id}")
+    client.post(
+        "/admin/bid",
+        data={"user_id": 1, "restaurant": "Pizza Palace", "bid_amount": 3},
+    )
+    # Every remaining user bids, which settles the auction
+    bidders = [("Bob", "bob123"), ("Charlie", "charlie123"), ("Diana", "diana123")]
+    for name, password in bidders:
+        login(name, password)
+        client.get("/dashboard")
+        client.post("/bid", data={"restaurant": "Burger Bar", "bid_amount": 2})
+    main.scheduler.run_pending()
+    login("Admin", "admin123")
+    client.get("/admin")
+    client.get("/history")
+    main.get_engine().writer.flush()
+
+    checked = 0
+    failures = []
+    for sql in dict.fromkeys(" ".join(s.split()) for s in statements):
+        if sql.split()[0].upper() not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            continue
+        checked += 1
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+        # Scans of CTEs are fine; only base tables need an index
+        ctes = {
+            line.split()[1]
+            for line in plan
+            if line.startswith(("MATERIALIZE", "CO-ROUTINE"))
+        }
+        scans = [
+            line
+            for line in plan
+            if line.startswith("SCAN ")
+            and line.split()[1] not in ctes
+            and line != "SCAN CONSTANT ROW"
+        ]
+        if scans and not sql.startswith(FULL_SCANS):
+            failures.append((sql, scans))
+    conn.close()
+
+    for sql, scans in failures:
+        print(f"FULL SCAN: {sql}")
+        for line in scans:
+            print(f"    {line}")
+    print(f"{checked} statements checked, {len(failures)} without an index")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or update an auction database")
+    parser.add_argument(
+        "--tenant",
+        default=DEFAULT_TENANT,
+        help="office/team shard to set up (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--check-query-plans",
+        action="store_true",
+        help="run the app on a scratch database and fail if a query scans "
+        "a table without an index",
+    )
+    args = parser.parse_args()
+    if args.check_query_plans:
+        raise SystemExit(0 if check_query_plans() else 1)
+    setup_database(args.tenant)